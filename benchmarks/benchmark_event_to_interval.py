@@ -0,0 +1,51 @@
+"""
+Compares the native (vectorized) and the pm4py engine of the EventToIntervalLog adapter on generated atomic event logs.
+
+Usage (from the repository root): python benchmarks/benchmark_event_to_interval.py [number of operations ...]
+"""
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import logging
+import time
+import numpy as np
+import pandas as pd
+from event_log_analyzer.adapter import EventToIntervalLog
+from event_log_analyzer.utils import logger
+
+NUMBER_OF_MACHINES = 10
+
+def generate_event_log(number_of_operations):
+    """
+    generates an atomic event log in flow shop form (every job is processed on all machines one after another) with the given number of operations
+    """
+    operation = np.arange(number_of_operations)
+    start = pd.Timestamp("2013-09-20 13:00") + pd.to_timedelta(operation * 10, unit="m")
+    complete = start + pd.to_timedelta(np.random.randint(1, 10, number_of_operations), unit="m")
+    operations = pd.DataFrame({"Job": [f"j{i}" for i in operation // NUMBER_OF_MACHINES],
+                               "Machine": [f"m{i}" for i in operation % NUMBER_OF_MACHINES],
+                               "Resource": "Worker",
+                               "Activity_Instance": operation})
+    
+    df = pd.concat([operations.assign(Timestamp=start, Transaction_Type="start"), operations.assign(Timestamp=complete, Transaction_Type="complete")])
+    df = df.sort_values(["Timestamp", "Job", "Machine"], ignore_index=True)
+    df["Row_ID"] = range(0, len(df.index))
+    return df
+
+def measure(engine, df):
+    start = time.perf_counter()
+    EventToIntervalLog(engine).transform({}, df)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    logger.setLevel(logging.WARNING)
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 10000, 100000]
+    
+    print(f"{'operations':>12} {'pm4py [s]':>12} {'native [s]':>12} {'speedup':>10}")
+    for size in sizes:
+        df = generate_event_log(size)
+        pm4py_time = measure("pm4py", df)
+        native_time = measure("native", df)
+        print(f"{size:>12} {pm4py_time:>12.4f} {native_time:>12.4f} {pm4py_time/native_time:>9.1f}x")
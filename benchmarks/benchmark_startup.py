@@ -0,0 +1,53 @@
+"""
+Measures the startup time of short-lived analysis invocations: the time needed to import the modules of the package and the time of a whole run (import of a small log and checking all patterns), each in a fresh interpreter.
+For every module it is also listed which of the heavy dependencies (that should only be imported when they are used) have been imported.
+
+Usage (from the repository root): python benchmarks/benchmark_startup.py [--repeat 5]
+"""
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+
+MODULES = ["event_log_analyzer.utils",
+           "event_log_analyzer.importer",
+           "event_log_analyzer.pattern_library.pattern_structure",
+           "event_log_analyzer.pattern_library.stream_monitor"]
+HEAVY_DEPENDENCIES = ["pm4py", "matplotlib", "networkx", "duckdb", "sqlite3", "jsonschema"]
+RUN = f"""
+from event_log_analyzer import importer
+from event_log_analyzer.pattern_library.pattern_structure import PatternStructure
+PatternStructure().check_all_patterns(importer.import_event_log({os.path.join(parentdir, "test", "data", "event_log.json")!r}))
+"""
+
+def measure(code, directory):
+    """
+    runs the code in a fresh interpreter (in the given working directory) and returns the time in seconds and the heavy dependencies that have been imported
+    """
+    script = f"""
+import sys, time
+start = time.perf_counter()
+{code}
+print(__import__("json").dumps({{"seconds": time.perf_counter() - start, "imported": [m for m in {HEAVY_DEPENDENCIES!r} if m in sys.modules]}}))
+"""
+    env = dict(os.environ, PYTHONPATH=parentdir)
+    result = subprocess.run([sys.executable, "-c", script], cwd=directory, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="measures the import time of the modules and of a short analysis in fresh interpreters")
+    parser.add_argument("--repeat", type=int, default=5, help="the number of measurements of every module")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.symlink(os.path.join(parentdir, "test"), os.path.join(directory, "test"))    #the paths in the config files are relative to the repository root
+        print(f"{'':<60} {'median [s]':>10} {'min [s]':>10}   imported heavy dependencies")
+        for name, code in [(f"import {module}", f"import {module}") for module in MODULES] + [("import event_log.json and check all patterns", RUN)]:
+            results = [measure(code, directory) for _ in range(args.repeat)]
+            seconds = [r["seconds"] for r in results]
+            print(f"{name:<60} {statistics.median(seconds):>10.3f} {min(seconds):>10.3f}   {', '.join(results[-1]['imported']) or '-'}")
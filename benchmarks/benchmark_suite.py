@@ -0,0 +1,219 @@
+"""
+Benchmarks the whole analysis on generated atomic flow shop logs of increasing size: reading the csv file, every adapter of the import chain, the import into every storage type, the creation of the interval log and the checking of every pattern.
+The results are written to a JSON file and the results of two runs (for example before and after an upgrade) can be compared to find regressions.
+
+Usage (from the repository root):
+    python benchmarks/benchmark_suite.py [--sizes 1000 10000 ...] [--storage-types COLUMN_BASED ROW_BASED ...] [--repeat 3] [--time-limit 300] [--chunk-size 1000000] [--output output/benchmarks.json]
+    python benchmarks/benchmark_suite.py --compare <baseline>.json <current>.json [--threshold 0.1]
+
+Benchmarks whose median time exceeds the time limit are skipped for all larger logs (if the import into a storage type is too slow, all benchmarks of the storage type are skipped).
+The comparison exits with status 1 if at least one benchmark is slower than in the baseline by more than the threshold.
+"""
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import argparse
+import datetime
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import warnings
+import duckdb
+import numpy as np
+import pandas as pd
+from benchmark_event_to_interval import generate_event_log
+from event_log_analyzer import importer
+from event_log_analyzer.adapter import TimestampModifier
+from event_log_analyzer.event_log import StorageType
+from event_log_analyzer.pattern_library.pattern import condition_costs
+from event_log_analyzer.pattern_library.pattern_structure import PatternStructure
+from event_log_analyzer.utils import logger, pattern_logger
+
+SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]     #number of events of the generated logs
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+NOISE_FLOOR = 0.01      #differences of fewer seconds are not flagged in the comparison, because they are within the measurement noise of small logs
+
+def write_log(directory, number_of_events):
+    """
+    writes a generated atomic flow shop log with the given number of events as a csv file together with its config file and returns the path of the config file
+    """
+    np.random.seed(number_of_events)
+    df = generate_event_log(number_of_events // 2).drop(columns=["Activity_Instance", "Row_ID"])
+    path = os.path.join(directory, f"log_{number_of_events}.csv")
+    df.to_csv(path, sep=";", index=False, date_format=TIME_FORMAT)
+    config = {"path": path, "separator": ";", "event_log_format": "atomic", "sorted": True, "row_id_column": None,
+              "job_column": "Job", "machine_column": "Machine", "resource_columns": ["Resource"], "transaction_type_column": "Transaction_Type",
+              "time_attributes": ["Timestamp"], "relative_time": False, "time_format": TIME_FORMAT, "activity_instance_column": None,
+              "group_attributes": ["Job", "Machine"], "start_transaction_types": ["start"], "complete_transaction_types": ["complete"]}
+    config_file = os.path.join(directory, f"log_{number_of_events}.json")
+    with open(config_file, "w") as f:
+        json.dump(config, f, indent=4)
+    return config_file
+
+def measure(function, *args):
+    """
+    returns the time in seconds needed by the function and its result
+    """
+    start = time.perf_counter()
+    value = function(*args)
+    return time.perf_counter() - start, value
+
+class BenchmarkRun:
+    """
+    A BenchmarkRun measures all benchmarks on logs of increasing size and collects the results.
+
+    Attributes
+    -----------
+    repeat : int
+        the number of times every benchmark is measured
+
+    time_limit : float
+        benchmarks whose median time (in seconds) exceeds the limit are not measured on larger logs
+
+    chunk_size : int
+        if given, the logs are imported in chunks of this number of rows (see importer.import_event_log())
+
+    results : List[Dict]
+        the result of every benchmark on every log size
+    """
+    def __init__(self, repeat=3, time_limit=300, chunk_size=None):
+        self.repeat = repeat
+        self.time_limit = time_limit
+        self.chunk_size = chunk_size
+        self.results = []
+        self._too_slow = set()
+
+    def run(self, sizes, storage_types):
+        """
+        measures all benchmarks on generated logs of the given sizes (the logs are written into a temporary directory)
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            for number_of_events in sizes:
+                config_file = write_log(directory, number_of_events)
+                times = {}
+                for _ in range(self.repeat):
+                    self._run_adapters(config_file, times)
+                    for storage_type in storage_types:
+                        self._run_storage_type(config_file, storage_type, times)
+                for (benchmark, storage_type), seconds in times.items():
+                    self._add_result(benchmark, storage_type, number_of_events, seconds)
+                os.remove(config_file.replace(".json", ".csv"))
+
+    def _skipped(self, benchmark, storage_type=None):
+        return (benchmark, storage_type) in self._too_slow or ("import", storage_type) in self._too_slow
+
+    def _run_adapters(self, config_file, times):
+        """
+        measures reading the csv file and every adapter of the import chain one after another (independent of the storage type)
+        """
+        if self._skipped("read_csv"):
+            return
+        with open(config_file) as f:
+            config = json.load(f)
+        seconds, df = measure(lambda: pd.read_csv(config["path"], sep=config["separator"]))
+        times.setdefault(("read_csv", None), []).append(seconds)
+        for adapter in [TimestampModifier()] + importer.adapter_chain():
+            seconds, df = measure(adapter.transform, config, df)
+            times.setdefault((f"adapter:{type(adapter).__name__}", None), []).append(seconds)
+
+    def _run_storage_type(self, config_file, storage_type, times):
+        """
+        measures the import into the storage type, the creation of the interval log, the checking of every pattern on its own (all patterns are checked, even if a pattern they require does not apply) and the checking of all patterns
+        """
+        if self._skipped("import", storage_type.name):
+            return
+        seconds, log = measure(importer.import_event_log, config_file, storage_type, self.chunk_size)
+        times.setdefault(("import", storage_type.name), []).append(seconds)
+        seconds, _ = measure(log.create_interval_log)
+        times.setdefault(("create_interval_log", storage_type.name), []).append(seconds)
+        for p in PatternStructure().topological_order:
+            if not self._skipped(f"pattern:{p.name}", storage_type.name):
+                seconds, _ = measure(p.pattern_applies, log)
+                times.setdefault((f"pattern:{p.name}", storage_type.name), []).append(seconds)
+        if not self._skipped("check_all_patterns", storage_type.name):
+            seconds, _ = measure(PatternStructure().check_all_patterns, log)
+            times.setdefault(("check_all_patterns", storage_type.name), []).append(seconds)
+
+    def _add_result(self, benchmark, storage_type, number_of_events, seconds):
+        median = statistics.median(seconds)
+        self.results.append({"benchmark": benchmark, "storage_type": storage_type, "events": number_of_events, "seconds": seconds,
+                             "min": min(seconds), "median": median, "events_per_second": number_of_events / median if median > 0 else None})
+        if median > self.time_limit:
+            self._too_slow.add((benchmark, storage_type))
+        print(f"{number_of_events:>10} {storage_type or '':>22} {benchmark:<50} {median:>10.4f} s", flush=True)
+
+def metadata():
+    """
+    returns the versions of Python and the main dependencies, the platform and the git commit of the benchmarked code
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=parentdir, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"date": datetime.datetime.now().isoformat(timespec="seconds"), "commit": commit, "python": platform.python_version(), "pandas": pd.__version__,
+            "numpy": np.__version__, "duckdb": duckdb.__version__, "platform": platform.platform(), "processor": platform.processor(), "cpu_count": os.cpu_count()}
+
+def compare(baseline_file, current_file, threshold):
+    """
+    compares the median times of the benchmarks that have been measured in both runs and prints them, a benchmark is a regression (an improvement) if it is slower (faster) by more than the threshold (relative) and the noise floor (absolute)
+
+    Returns
+    -------
+    int
+        the number of regressions
+    """
+    with open(baseline_file) as f:
+        baseline = {(r["benchmark"], r["storage_type"], r["events"]): r["median"] for r in json.load(f)["results"]}
+    with open(current_file) as f:
+        current = {(r["benchmark"], r["storage_type"], r["events"]): r["median"] for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'events':>10} {'storage type':>22} {'benchmark':<50} {'baseline [s]':>12} {'current [s]':>12} {'ratio':>7}")
+    for key in sorted(baseline.keys() & current.keys(), key=lambda key: (key[2], key[1] or "", key[0])):
+        old, new = baseline[key], current[key]
+        status = ""
+        if new > old * (1 + threshold) and new - old > NOISE_FLOOR:
+            status = "REGRESSION"
+            regressions = regressions + 1
+        elif new < old * (1 - threshold) and old - new > NOISE_FLOOR:
+            status = "improved"
+        ratio = f"{new / old:>6.2f}x" if old > 0 else f"{'-':>7}"
+        print(f"{key[2]:>10} {key[1] or '':>22} {key[0]:<50} {old:>12.4f} {new:>12.4f} {ratio} {status}")
+    for name, missing in [("baseline", current.keys() - baseline.keys()), ("current run", baseline.keys() - current.keys())]:
+        if len(missing) > 0:
+            print(f"{len(missing)} benchmark(s) have not been measured in the {name}")
+    print(f"{regressions} regression(s) (threshold {threshold:.0%})")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmarks the import, the adapters, the storage types and the patterns on generated logs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="the number of events of the generated logs")
+    parser.add_argument("--storage-types", nargs="+", default=[s.name for s in StorageType], choices=[s.name for s in StorageType])
+    parser.add_argument("--repeat", type=int, default=3, help="the number of measurements of every benchmark")
+    parser.add_argument("--time-limit", type=float, default=300, help="benchmarks with a larger median time (in seconds) are skipped for larger logs")
+    parser.add_argument("--chunk-size", type=int, default=None, help="import the logs in chunks of this number of rows")
+    parser.add_argument("--output", default="output/benchmarks.json", help="the JSON file of the results")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two result files instead of running the benchmarks")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown from which a benchmark is flagged as regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) > 0 else 0)
+
+    logger.setLevel(logging.WARNING)
+    pattern_logger.setLevel(logging.WARNING)
+    warnings.simplefilter("ignore", FutureWarning)
+    condition_costs.disable()       #the conditions are checked in the order of their estimated costs, so that the measured order does not differ between the runs that are compared
+    run = BenchmarkRun(args.repeat, args.time_limit, args.chunk_size)
+    run.run(args.sizes, [StorageType[s] for s in args.storage_types])
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"metadata": metadata(), "parameters": {"repeat": args.repeat, "time_limit": args.time_limit, "chunk_size": args.chunk_size}, "results": run.results}, f, indent=4)
+    print(f"results written to {args.output}")
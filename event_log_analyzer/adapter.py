@@ -1,12 +1,9 @@
 """
 This module contains all functionality related to the adaption process to transform new event logs in a unified format
 """
+import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from pm4py.objects.conversion.log import converter as log_converter
-from pm4py.objects.log.util import interval_lifecycle
-from pm4py.util import constants
 from event_log_analyzer.utils import log_time, logger
 
 
@@ -36,35 +33,67 @@ class TimestampModifier(Adapter):
     """
     transforms all timestamps, indicated in the config file, to a common format (must be done before timestamps are renamed)
     """
-    def get_sec(self, time_str):
-        """converts a timestamp in HH:mm:ss format to seconds
+    def parse_durations(self, values):
+        """converts timestamps in HH:mm:ss format to timestamps relative to 1970-01-01 00:00:00
 
         Parameters
         ----------
-        time_str : str
-            a string in the following format HH:mm:ss, where the hours are continuous, i.e. this timestamp can be considered as duration
+        values : pandas.Series
+            strings in the following format HH:mm:ss, where the hours are continuous
 
         Returns
         -------
-        int
-            duration in seconds
+        pandas.Series
+            the timestamps (NaT where the format is wrong)
         """
-        h, m, s = time_str.split(':')
-        assert int(h)>=0 and int(m)>=0 and int(m)<=60 and int(s)>=0 and int(s)<=60, "Time Format is wrong"
+        values = values.astype(str)
+        parts = values.str.split(':', expand=True).reindex(columns=range(3))
+        h, m, s = (pd.to_numeric(parts[i], errors='coerce') for i in range(3))
+        valid = (values.str.count(':') == 2) & (h>=0) & (m>=0) & (m<=60) & (s>=0) & (s<=60) & (h % 1 == 0) & (m % 1 == 0) & (s % 1 == 0)
+        seconds = h * 3600 + m * 60 + s
+        return pd.to_datetime(seconds[valid], unit='s').reindex(values.index)      #only the valid rows are converted (casting NaN to datetime warns), the invalid rows become NaT
+
+    def parse_timestamps(self, cfg, values):
+        """parses a whole timestamp column at once, every distinct timestamp string is only parsed once
+
+        Parameters
+        ----------
+        cfg : json
+            the configuration file
+        values : pandas.Series
+            the timestamp strings as given in the raw event log
+
+        Returns
+        -------
+        pandas.Series
+            the parsed timestamps
+
+        Raises
+        ------
+        ValueError
+            if a timestamp is missing or does not match the format specified in the config file (the first offending row is reported)
+        """
+        codes, uniques = pd.factorize(values)
+        uniques = pd.Series(uniques, dtype=object)
+        if cfg["relative_time"]:
+            parsed = self.parse_durations(uniques)
+            error = "Time Format is wrong"
+        else:
+            parsed = pd.to_datetime(uniques, format=cfg["time_format"], errors='coerce')
+            error = f"""Incorrect timestamp format, should be {cfg["time_format"]}"""
+        
+        invalid = codes < 0
+        invalid[~invalid] = parsed.isna().to_numpy()[codes[~invalid]]
+        if invalid.any():
+            first = np.flatnonzero(invalid)[0]
+            raise ValueError(f"{error} (row {values.index[first]}: '{values.iloc[first]}')")
         
-        return int(h) * 3600 + int(m) * 60 + int(s) 
+        return pd.Series(parsed.to_numpy()[codes], index=values.index, name=values.name)
     
     @log_time(logger, "modify timestamps")
     def transform(self, cfg, df):
         for attr in cfg["time_attributes"]:
-            if cfg["relative_time"]:
-                df[attr] = df[attr].apply(lambda x: datetime(1970, 1, 1, 0, 0, 0, 0) + timedelta(seconds=self.get_sec(x)))
-            else:
-                try:
-                    df[attr] = df[attr].apply(lambda x: datetime.strptime(x, cfg["time_format"]))
-                except ValueError:
-                        raise ValueError(f"""Incorrect timestamp format, should be {cfg["time_format"]}""")
-            df[attr] = pd.to_datetime(df[attr])
+            df[attr] = self.parse_timestamps(cfg, df[attr])
 
         return df
     
@@ -72,10 +101,19 @@ class RowIDAdder(Adapter):
     """
     maps a given row id to the Row_ID attribute, if nothing is specified a new row column id is added to the log
     """
+    def __init__(self, first_row_id=0):
+        """
+        Parameters
+        ----------
+        first_row_id : int, optional
+            the row id of the first row of the given dataframe, needed if the log is adapted in chunks, by default 0
+        """
+        self.first_row_id = first_row_id
+        
     @log_time(logger, "add row id")
     def transform(self, cfg, df):
         if "row_id_column" not in cfg or cfg["row_id_column"] == None:
-            df['Row_ID'] = range(0, len(df.index))
+            df['Row_ID'] = range(self.first_row_id, self.first_row_id + len(df.index))
         else:
             df = df.rename(columns={cfg["row_id_column"]: "Row_ID"})
         return df
@@ -124,52 +162,109 @@ class IntervalToEventLogTransformer(Adapter):
     """
     if a log is given in interval format, this adapter converts it to atomic event log format (two timestamps 'Start' and 'Complete' are required -> TimestampRenamer needs to be applied before)
     """
+    def __init__(self, first_activity_instance=0, engine="native"):
+        """
+        Parameters
+        ----------
+        first_activity_instance : int, optional
+            the activity instance of the first operation of the given dataframe, needed if the log is adapted in chunks, by default 0
+        engine : str, optional
+            "native" for the vectorized conversion or "pm4py" to convert the log with pm4py (slower, only kept as a fallback), by default "native"
+        """
+        if engine not in ("native", "pm4py"):
+            raise ValueError(f"unknown engine {engine} (possible engines: native, pm4py)")
+        self.first_activity_instance = first_activity_instance
+        self.engine = engine
+        
     @log_time(logger, "interval to event log")
     def transform(self, cfg, df):
         if cfg["event_log_format"] == 'interval':  
-            df['Activity_Instance'] = range(0, len(df.index))   #!!! no need to use the activity instance adder anymore
+            df['Activity_Instance'] = range(self.first_activity_instance, self.first_activity_instance + len(df.index))   #!!! no need to use the activity instance adder anymore
             logger.info(f"log in interval format --> transform to atomic event log")
-            parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'Job'}
-            interval_log = log_converter.apply(df, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
-                
-            event_log = interval_lifecycle.to_lifecycle(interval_log, parameters={
-            constants.PARAMETER_CONSTANT_START_TIMESTAMP_KEY: "Start",
-            constants.PARAMETER_CONSTANT_TIMESTAMP_KEY: "Complete",
-            constants.PARAMETER_CONSTANT_ACTIVITY_KEY: "Machine",
-            constants.PARAMETER_CONSTANT_TRANSITION_KEY: "Transaction_Type"})
-            
-            df = log_converter.apply(event_log, variant=log_converter.Variants.TO_DATA_FRAME)
-            df = df.rename(columns={"Complete": "Timestamp"})
-            df = df.drop(df.filter(regex='@@').columns, axis=1)    
-            return df
+            if self.engine == "pm4py":
+                return self.transform_with_pm4py(cfg, df)
+            else:
+                return self.transform_without_pm4py(cfg, df)
         else:
             return df
-
+        
+    def transform_with_pm4py(self, cfg, df):
+        """
+        converts the log with the interval lifecycle utilities of pm4py (each operation is converted into pm4py event objects)
+        """
+        from pm4py.objects.conversion.log import converter as log_converter     #pm4py is only imported when it is used, because the import takes seconds
+        from pm4py.objects.log.util import interval_lifecycle
+        from pm4py.util import constants
+        parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'Job'}
+        interval_log = log_converter.apply(df, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
+            
+        event_log = interval_lifecycle.to_lifecycle(interval_log, parameters={
+        constants.PARAMETER_CONSTANT_START_TIMESTAMP_KEY: "Start",
+        constants.PARAMETER_CONSTANT_TIMESTAMP_KEY: "Complete",
+        constants.PARAMETER_CONSTANT_ACTIVITY_KEY: "Machine",
+        constants.PARAMETER_CONSTANT_TRANSITION_KEY: "Transaction_Type"})
+        
+        df = log_converter.apply(event_log, variant=log_converter.Variants.TO_DATA_FRAME)
+        df = df.rename(columns={"Complete": "Timestamp"})
+        df = df.drop(df.filter(regex='@@').columns, axis=1)    
+        return df
+    
+    def transform_without_pm4py(self, cfg, df):
+        """
+        vectorized conversion: every operation is repeated once and the start and complete timestamps are interleaved, so that the start event of an operation directly precedes its complete event,
+        afterwards the events are sorted in the order of the Sorter adapter
+        """
+        number_operations = len(df.index)
+        events = df.drop(columns=["Start", "Complete"]).take(np.repeat(np.arange(number_operations), 2))
+        events["Timestamp"] = np.column_stack([df["Start"].to_numpy(), df["Complete"].to_numpy()]).ravel()
+        events["Transaction_Type"] = np.tile(np.array(["start", "complete"], dtype=object), number_operations)
+        
+        return events.sort_values(["Timestamp", "Job", "Machine"], ignore_index=True)
+        
 class ActivityInstanceAdder(Adapter):
     """
     adds an activity instance, if not already present (only applicable to logs in atomic format with 'Timestamp' attribute -> TimestampRenamer needs to be applied before)
     """
+    def __init__(self, first_activity_instance=0, stored_instances=None):
+        """
+        Parameters
+        ----------
+        first_activity_instance : int, optional
+            the activity instance of the first new operation, needed if the events are appended to a stored log, by default 0
+        stored_instances : pandas.DataFrame, optional
+            the group attributes and the 'Activity_Instance' of operations of a stored log to which the events are appended, events of these operations get the stored activity instance 
+            (the operations are not checked for missing start or complete events, because they may be completed by later events), by default None
+        """
+        self.first_activity_instance = first_activity_instance
+        self.stored_instances = stored_instances
+        
     @log_time(logger, "adding activity instances manually (find corresponding events that belong to the same operation)")
     def transform(self, cfg, df):
         if "Activity_Instance" in df.columns:        #activity instance already existing, no need to create it
             return df
         elif "activity_instance_column" in cfg and cfg["activity_instance_column"] != None:
             return df.rename(columns={cfg["activity_instance_column"]: "Activity_Instance"})
+        elif self.stored_instances is not None:
+            group_attributes = cfg["group_attributes"]
+            stored_instances = self.stored_instances[group_attributes + ["Activity_Instance"]].astype({attr: object for attr in group_attributes}).drop_duplicates(group_attributes)
+            instances = df[group_attributes].astype(object).merge(stored_instances, on=group_attributes, how="left")["Activity_Instance"].to_numpy()
+            is_new = pd.isna(instances)
+            instances[is_new] = df[is_new].groupby(group_attributes, dropna=False).ngroup().to_numpy() + self.first_activity_instance
+            df["Activity_Instance"] = instances.astype(np.int64)
+            return df
         else:
-            log_grouped_by_attr = df.groupby(cfg["group_attributes"], dropna=False)
-                    
-            df_list = []
-            i = 0
-            for group in log_grouped_by_attr:
-                group_events = group[1].sort_values("Timestamp")
-                group_events["Activity_Instance"] = i
-                i = i + 1
-                df_list.append(group_events)
-                if "start" not in group_events.values or "complete" not in group_events.values:
-                    raise ValueError("The event log contains operations that do not have start and complete events")
+            group_attributes = cfg["group_attributes"]
+            df["Activity_Instance"] = df.groupby(group_attributes, dropna=False).ngroup() + self.first_activity_instance
             
-            merged_df = pd.concat(df_list) 
-            return merged_df
+            instances = df["Activity_Instance"]
+            number_start_events = (df["Transaction_Type"] == "start").groupby(instances).sum()
+            number_complete_events = (df["Transaction_Type"] == "complete").groupby(instances).sum()
+            malformed_instances = number_start_events.index[(number_start_events == 0) | (number_complete_events == 0)]
+            if len(malformed_instances) > 0:
+                malformed_operations = df.loc[instances.isin(malformed_instances), group_attributes].drop_duplicates()
+                raise ValueError(f"The event log contains operations that do not have start and complete events: {list(malformed_operations.itertuples(index=False, name=None))}")
+            
+            return df
 
 class Sorter(Adapter):
     """
@@ -186,12 +281,72 @@ class Sorter(Adapter):
             df = df.sort_values(["Timestamp","Job","Machine"], ignore_index=True)
             return df
 
+CATEGORICAL_ATTRIBUTES = ["Job", "Machine", "Resource", "Transaction_Type"]    #attributes with few distinct values that are dictionary encoded
+
+class CategoricalEncoder(Adapter):
+    """
+    converts the string columns of the categorical attributes (Job, Machine, Resource and Transaction_Type) into pandas categoricals with sorted categories,
+    so that every value is stored as a small integer code and all comparisons of these attributes are integer comparisons (numerical columns are already stored as integers and are not encoded)
+    """
+    def __init__(self, categories=None):
+        """
+        Parameters
+        ----------
+        categories : Dict[str, List], optional
+            the categories of the encoded attributes of a stored log to which the events are appended, if given exactly these attributes are encoded and new values are added (sorted) after the known categories, 
+            so that the codes of the stored log stay valid, by default None (the categories are sorted)
+        """
+        self.categories = categories
+        
+    @log_time(logger, "encode categorical attributes")
+    def transform(self, cfg, df):
+        if self.categories is None:
+            for attr in CATEGORICAL_ATTRIBUTES:
+                if attr in df.columns and is_string_column(df[attr]):
+                    df[attr] = pd.Categorical(df[attr], categories=sorted(df[attr].dropna().unique()), ordered=True)
+        else:
+            for attr, known_categories in self.categories.items():
+                new_categories = set(df[attr].dropna().unique()) - set(known_categories)
+                df[attr] = pd.Categorical(df[attr], categories=list(known_categories) + sorted(new_categories, key=str), ordered=True)
+        return df
+
+def is_string_column(values):
+    """
+    returns True if the column only contains strings (and missing values) and is not encoded yet, columns without any value are encoded as well (with no categories), so that values can be appended to them
+    """
+    if pd.api.types.is_categorical_dtype(values):
+        return False
+    return values.isna().all() or (values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) == "string")
+
 class EventToIntervalLog(Adapter):
     """
     if a log is given in atomic format, this adapter converts it to interval event log format (only applicable if log contains 'Job', 'Machine', 'Timestamp' and 'Transaction_Type' attributes)
     """
+    def __init__(self, engine="native"):
+        """
+        Parameters
+        ----------
+        engine : str, optional
+            "native" for the vectorized conversion or "pm4py" to convert the log with pm4py (slower, only kept as a fallback), by default "native"
+        """
+        if engine not in ("native", "pm4py"):
+            raise ValueError(f"unknown engine {engine} (possible engines: native, pm4py)")
+        self.engine = engine
+        
     @log_time(logger, "event to interval log")
     def transform(self, cfg, df):
+        if self.engine == "pm4py":
+            return self.transform_with_pm4py(cfg, df)
+        else:
+            return self.transform_without_pm4py(cfg, df)
+    
+    def transform_with_pm4py(self, cfg, df):
+        """
+        converts the log with the interval lifecycle utilities of pm4py (each event is converted into a pm4py event object)
+        """
+        from pm4py.objects.conversion.log import converter as log_converter
+        from pm4py.objects.log.util import interval_lifecycle
+        from pm4py.util import constants
         parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'Job'}
         event_log = log_converter.apply(df, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
 
@@ -207,35 +362,29 @@ class EventToIntervalLog(Adapter):
     
     def transform_without_pm4py(self, cfg, df):
         """
-        this method shows how the transform() method could be implemented without pm4py
-        """
-        group_attr = cfg["group_attributes"]
-        order_attr = "Timestamp"
-        transaction_type = cfg["transaction_type_column"]
-        assert len(cfg["time_attributes"])==1, "in an activity format only one timestamp is allowed"
-        time_attr = cfg["time_attributes"][0]
-        start_transaction_types = cfg["start_transaction_types"]
-        complete_transaction_types = cfg["complete_transaction_types"]
-        frames = []
-        
-        grouped_dataframe = df.groupby(group_attr)
-        for g in grouped_dataframe:
-            df = g[1]
-            #Filter out events that are not part of start- and complete-transaction-types (like schedule)
-            filtered_df = g[1][(g[1]["Transaction_Type"].isin(start_transaction_types)) | (g[1]["Transaction_Type"].isin(complete_transaction_types))]
-
-            df_events = filtered_df.sort_values(order_attr)
-            assert len(df_events) == 2, "start and complete transaction types do not match"
-            assert df_events.iloc[0][transaction_type] in start_transaction_types, "wrong start transaction type"
-            assert df_events.iloc[1][transaction_type] in complete_transaction_types, "wrong complete transaction type"
-            
-            df_activities = df_events[(df_events[transaction_type] == "start")].drop(columns=transaction_type)#.rename(columns={order_attribute: "Start"})
-            df_activities = df_activities.assign(Complete=df_events.iloc[1][order_attr])
-                    
-            frames.append(df_activities)
+        vectorized conversion: the start and complete events of each activity instance are paired first-in-first-out and joined by a single merge (the log needs to be sorted by time). 
+        As in pm4py, each interval keeps the attributes of its complete event, complete events without a start event get the complete timestamp as start and start events without complete event are dropped
+        """
+        transaction_type = df["Transaction_Type"]
+        is_start = transaction_type == "start"
+        is_complete = transaction_type == "complete"
+        started = is_start.groupby(df["Activity_Instance"]).cumsum()[is_complete]
+        
+        start_events = df.loc[is_start, ["Activity_Instance", "Timestamp"]]
+        start_events = start_events.assign(Occurrence=start_events.groupby("Activity_Instance").cumcount())
         
-        result = pd.concat(frames)
+        # the k-th complete event is paired with the m-th start event, where m is k minus the number of complete events that found no started operation so far
+        complete_events = df.loc[is_complete].drop(columns="Transaction_Type")
+        instances = complete_events["Activity_Instance"]
+        completed = complete_events.groupby("Activity_Instance").cumcount() + 1
+        unmatched = (completed - started).clip(lower=0).groupby(instances).cummax()
+        matched = completed - unmatched
+        is_matched = matched.groupby(instances).diff().fillna(matched) > 0
+        complete_events = complete_events.assign(Occurrence=(matched - 1).where(is_matched, -1))
         
-        result = result.rename(columns={time_attr: "Start"})
+        result = complete_events.rename(columns={"Timestamp": "Complete"}).merge(start_events.rename(columns={"Timestamp": "Start"}), 
+                                                                               on=["Activity_Instance", "Occurrence"], how="left", sort=False)
+        result["Start"] = result["Start"].fillna(result["Complete"])
         
-        return result
\ No newline at end of file
+        columns = [c for c in result.columns if c not in ("Start", "Complete", "Occurrence")] + ["Start", "Complete"]
+        return result[columns]
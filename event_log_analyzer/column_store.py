@@ -0,0 +1,280 @@
+"""
+This module contains the memory-mapped column store, in which every column of a table is stored as a raw binary file that is mapped into memory when it is read.
+Numerical, boolean and timestamp columns are stored with their fixed width data type, all other columns are dictionary encoded (the integer codes are stored in the binary file and the dictionary in a json file, 
+it is sorted when the table is written and values of appended rows are added at its end).
+"""
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+META_FILE = "meta.json"
+RECODING_BATCH_SIZE = 2**22     #number of codes that are converted at once when the dictionaries are sorted
+
+def code_dtype(number_categories):
+    """
+    returns the smallest integer data type that can store the codes of the given number of categories (the same data type that pandas uses for categorical codes, so that the codes do not need to be copied)
+    """
+    for dtype in [np.int8, np.int16, np.int32]:
+        if number_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+def sort_categories(values):
+    """
+    sorts the categories of a column, values of different types that cannot be compared are sorted by their string representation
+    """
+    try:
+        return sorted(values)
+    except TypeError:
+        return sorted(values, key=str)
+
+def encode_values(values, dictionary):
+    """
+    returns the codes of the values in the dictionary (a dict from the values to their codes), values that are not in the dictionary yet are added with the next codes (missing values get the code -1)
+    """
+    codes, uniques = pd.factorize(values)
+    mapping = np.array([dictionary.setdefault(v, len(dictionary)) for v in uniques.tolist()] + [-1], dtype=np.int64)
+    return mapping[codes]     #the code -1 of missing values is mapped to the last entry (-1)
+
+def fixed_width_values(values, column):
+    """
+    converts the values of a column that is not encoded into the fixed width data type of the column (timestamps with time zone are converted to UTC)
+    """
+    if column["timezone"] is not None:
+        values = values.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+    else:
+        values = values.to_numpy()
+    if values.dtype != column["dtype"]:
+        if np.dtype(column["dtype"]).kind in "iub" and pd.isna(values).any():
+            raise ValueError(f"the column {column['name']} contains missing values, but it has the data type {column['dtype']}")
+        values = values.astype(column["dtype"])
+    return values
+
+class ColumnWriter:
+    """
+    A ColumnWriter writes a table batch by batch into a directory of the column store, so that tables larger than the memory can be written. The dictionaries of the encoded columns are extended with every batch and sorted when the table is finished.
+
+    Attributes
+    -----------
+    directory : str
+        the directory in which the files of the table are written
+
+    rows : int
+        the number of rows that have been written so far
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.rows = 0
+        self._columns = None
+        self._dictionaries = {}
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+    def write_batch(self, df):
+        """
+        appends the rows of the dataframe to the table, all batches must have the same columns
+        """
+        if self._columns is None:
+            self._columns = []
+            for i, (name, dtype) in enumerate(df.dtypes.items()):
+                column = {"name": name, "file": f"{i}.bin", "dtype": None, "encoded": False, "timezone": None}
+                if pd.api.types.is_datetime64tz_dtype(dtype):
+                    column["dtype"], column["timezone"] = np.dtype("datetime64[ns]").str, str(dtype.tz)      #timestamps with time zone are stored in UTC
+                elif (pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_dtype(dtype)) and not pd.api.types.is_categorical_dtype(dtype):
+                    column["dtype"] = np.dtype(dtype).str
+                else:
+                    column["encoded"] = True
+                    self._dictionaries[name] = {}
+                self._columns.append(column)
+
+        for column in self._columns:
+            values = df[column["name"]]
+            if column["encoded"]:
+                values = encode_values(values, self._dictionaries[column["name"]])
+            else:
+                values = fixed_width_values(values, column)
+            with open(os.path.join(self.directory, column["file"]), "ab") as f:
+                f.write(np.ascontiguousarray(values).tobytes())
+        self.rows = self.rows + len(df.index)
+
+    def finish(self):
+        """
+        sorts the dictionaries, converts the codes into the smallest integer type and writes the meta data of the table
+        """
+        for column in self._columns:
+            if column["encoded"]:
+                dictionary = self._dictionaries[column["name"]]
+                categories = sort_categories(dictionary)
+                new_codes = np.empty(len(categories) + 1, dtype=np.int64)
+                new_codes[[dictionary[c] for c in categories]] = np.arange(len(categories))
+                new_codes[-1] = -1
+
+                path = os.path.join(self.directory, column["file"])
+                column["dtype"] = code_dtype(len(categories)).str
+                with open(f"{path}.recoded", "wb") as f:
+                    if self.rows > 0:
+                        codes = np.memmap(path, dtype=np.int64, mode="r", shape=(self.rows,))
+                        for start in range(0, self.rows, RECODING_BATCH_SIZE):
+                            f.write(new_codes[codes[start:start + RECODING_BATCH_SIZE]].astype(column["dtype"]).tobytes())
+                        del codes
+                os.replace(f"{path}.recoded", path)
+                with open(os.path.join(self.directory, f"{column['file']}.json"), "w") as f:
+                    json.dump(categories, f, default=str)
+            elif self.rows == 0:
+                open(os.path.join(self.directory, column["file"]), "ab").close()
+
+        with open(os.path.join(self.directory, META_FILE), "w") as f:
+            json.dump({"rows": self.rows, "columns": self._columns}, f, indent=4)
+
+class ColumnStore:
+    """
+    The ColumnStore stores tables as directories of memory-mapped column files. Tables are read without loading them into memory, the columns of the returned dataframes are backed by the mapped files,
+    so the store can be reopened cheaply by other processes and can hold tables that are larger than the memory.
+
+    Attributes
+    -----------
+    directory : str
+        the directory of the column store, every table is stored in a subdirectory
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _table_directory(self, table):
+        return os.path.join(self.directory, table)
+
+    def writer(self, table):
+        """
+        returns a ColumnWriter that writes the table into a temporary directory, the table is replaced by commit() after the writer is finished
+        """
+        return ColumnWriter(self._table_directory(f"{table}.tmp"))
+
+    def commit(self, table):
+        """
+        replaces the table by the table written by the writer (the files of the old table stay available as long as they are mapped)
+        """
+        shutil.rmtree(self._table_directory(table), ignore_errors=True)
+        os.rename(self._table_directory(f"{table}.tmp"), self._table_directory(table))
+
+    def write_table(self, table, df):
+        """
+        writes the dataframe as the given table into the store, an existing table is replaced
+        """
+        writer = self.writer(table)
+        writer.write_batch(df)
+        writer.finish()
+        self.commit(table)
+
+    def append_table(self, table, df):
+        """
+        appends the rows of the dataframe to the table (the dataframe needs to have the columns of the table), the values of encoded columns that are not in the dictionary yet are added (sorted) at its end, 
+        so that the codes of the stored rows stay valid. If the codes do not fit into the data type of a column anymore, the column file is rewritten with a larger data type. 
+        The meta data is written last, so readers only see the new rows after all column files have been extended
+        """
+        meta = self._meta(table)
+        directory = self._table_directory(table)
+        for column in meta["columns"]:
+            path = os.path.join(directory, column["file"])
+            values = df[column["name"]]
+            if column["encoded"]:
+                with open(f"{path}.json") as f:
+                    categories = json.load(f)
+                dictionary = {value: code for code, value in enumerate(categories)}
+                new_categories = sort_categories(set(pd.unique(values.dropna().astype(object))) - set(dictionary))
+                dictionary.update((value, len(categories) + i) for i, value in enumerate(new_categories))
+                values = encode_values(values, dictionary)
+                
+                dtype = code_dtype(len(dictionary))
+                if dtype.itemsize > np.dtype(column["dtype"]).itemsize:
+                    self._widen_column(path, meta["rows"], column["dtype"], dtype)
+                    column["dtype"] = dtype.str
+                values = values.astype(column["dtype"])
+                with open(f"{path}.json", "w") as f:
+                    json.dump(categories + new_categories, f, default=str)
+            else:
+                values = fixed_width_values(values, column)
+            with open(path, "ab") as f:
+                f.write(np.ascontiguousarray(values).tobytes())
+        
+        meta["rows"] = meta["rows"] + len(df.index)
+        with open(os.path.join(directory, f"{META_FILE}.tmp"), "w") as f:
+            json.dump(meta, f, indent=4)
+        os.replace(os.path.join(directory, f"{META_FILE}.tmp"), os.path.join(directory, META_FILE))
+    
+    def _widen_column(self, path, rows, dtype, new_dtype):
+        """
+        rewrites the codes of a column file with a larger integer data type (the old file stays available as long as it is mapped)
+        """
+        with open(f"{path}.recoded", "wb") as f:
+            if rows > 0:
+                codes = np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+                for start in range(0, rows, RECODING_BATCH_SIZE):
+                    f.write(codes[start:start + RECODING_BATCH_SIZE].astype(new_dtype).tobytes())
+                del codes
+        os.replace(f"{path}.recoded", path)
+    
+    def number_of_rows(self, table):
+        """
+        returns the number of rows of the table (0 if the table does not exist)
+        """
+        if not self.has_table(table):
+            return 0
+        return self._meta(table)["rows"]
+
+    def _meta(self, table):
+        with open(os.path.join(self._table_directory(table), META_FILE)) as f:
+            return json.load(f)
+
+    def has_table(self, table):
+        """
+        returns True if the table exists in the store
+        """
+        return os.path.exists(os.path.join(self._table_directory(table), META_FILE))
+
+    def columns(self, table):
+        """
+        returns the column names of the table (an empty list if the table does not exist)
+        """
+        if not self.has_table(table):
+            return []
+        return [column["name"] for column in self._meta(table)["columns"]]
+
+    def read_table(self, table, needed_columns=[]):
+        """
+        maps the needed columns of the table into memory and returns them as a dataframe (without copying the data)
+
+        Parameters
+        -----------
+        table : str
+            the name of the table
+
+        needed_columns : List[str], optional
+            a list of attributes/columns that need to be accessed, by default [] (the empty list stands for all attributes), columns that do not exist in the table are ignored
+
+        Returns
+        -----------
+        pandas.DataFrame
+            the table, the encoded columns are returned as categorical columns
+        """
+        meta = self._meta(table)
+        columns = [c for c in meta["columns"] if len(needed_columns) == 0 or c["name"] in needed_columns]
+        directory = self._table_directory(table)
+
+        series = {}
+        for column in columns:
+            path = os.path.join(directory, column["file"])
+            if meta["rows"] > 0:
+                values = np.memmap(path, dtype=column["dtype"], mode="r", shape=(meta["rows"],))
+            else:
+                values = np.empty(0, dtype=column["dtype"])
+            if column["encoded"]:
+                with open(f"{path}.json") as f:
+                    values = pd.Categorical.from_codes(values, categories=json.load(f), ordered=True)
+            elif column["timezone"] is not None:
+                values = pd.arrays.DatetimeArray(values, dtype=pd.DatetimeTZDtype(tz="UTC")).tz_convert(column["timezone"])
+            series[column["name"]] = pd.Series(values, copy=False)
+        if len(series) == 0:
+            return pd.DataFrame(index=pd.RangeIndex(meta["rows"]))
+        return pd.concat(series, axis=1, copy=False)
@@ -1,17 +1,31 @@
 """
 This module is responsible for storing and managing the event log data. 
 """
+import json
 import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+import numpy as np
 import pandas as pd
-import sqlite3
-import duckdb
 from event_log_analyzer.validate import validate
-from event_log_analyzer.adapter import EventToIntervalLog
-from event_log_analyzer.utils import log_time, logger
+from event_log_analyzer.adapter import CATEGORICAL_ATTRIBUTES, CategoricalEncoder, EventToIntervalLog
+from event_log_analyzer.utils import log_time, logger, output_file
+from event_log_analyzer.sequence_index import SequenceIndex
+from event_log_analyzer.column_store import ColumnStore
 from enum import Enum
 
 DATABASE_NAME = 'event_log'
 INTERVAL_DATABASE_NAME = 'interval_log'
+STAGING_DATABASE_NAME = 'staged_event_log'
+DICTIONARY_TABLE_NAME = 'dictionary'
+COLUMN_STORE_DIRECTORY = 'event_log_storage_mmap'
+TIME_ATTRIBUTES = {DATABASE_NAME: 'Timestamp', INTERVAL_DATABASE_NAME: 'Start'}     #the attribute by which the rows of each table are ordered in time
+
+SEQUENCE_BATCH_SIZE = 100000    #number of rows that are fetched at once when iterating over sequences
+DUCKDB_VECTOR_SIZE = 2048
+
+DEFAULT_CACHE_SIZE = 2**30      #maximal number of bytes of the dataframes that are kept in the cache of an EventLogStorage
 
 class StorageType(Enum):
     """
@@ -20,6 +34,69 @@ class StorageType(Enum):
     COLUMN_BASED=1
     ROW_BASED=2
     COLUMN_BASED_AT_ONCE=3
+    MEMORY_MAPPED=4
+
+class FrameCache:
+    """
+    A least recently used cache for the dataframes that are loaded from the database. The entries are keyed by the table, the version of the table and the selected columns, 
+    so that entries of older versions of a table are never returned (and are removed by invalidate()).
+    
+    Attributes
+    -----------
+    max_size : int
+        the maximal number of bytes of all cached dataframes, if a new dataframe does not fit in, the least recently used dataframes are evicted
+    
+    size : int
+        the number of bytes of all cached dataframes
+    """
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+        
+    def get(self, key):
+        """
+        returns the cached dataframe of the key (and marks it as recently used) or None if it is not cached
+        """
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+    
+    def put(self, key, df):
+        """
+        adds the dataframe to the cache, dataframes that are larger than the whole cache are not cached
+        """
+        df_size = int(df.memory_usage(deep=True).sum())
+        if df_size > self.max_size:
+            return
+        self._remove(key)
+        while self.size + df_size > self.max_size:
+            self._remove(next(iter(self._entries)))
+        self._entries[key] = (df, df_size)
+        self.size = self.size + df_size
+        
+    def invalidate(self, table):
+        """
+        removes all cached dataframes of the given table
+        """
+        for key in [key for key in self._entries if key[0] == table]:
+            self._remove(key)
+        
+    def _remove(self, key):
+        if key in self._entries:
+            self.size = self.size - self._entries.pop(key)[1]
+            
+
+def synchronized(method):
+    """
+    decorator for methods of the EventLogStorage that access the database connection, the cache or the sequence indexes, so that patterns can be checked in several threads at the same time
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class EventLogStorage:
     """
@@ -38,9 +115,42 @@ class EventLogStorage:
         
     _storage_type : StorageType
         specifies the data layout used in the event log storage
+        
+    _cache : FrameCache
+        the dataframes that have already been loaded from the database
+        
+    _versions : Dict[str, int]
+        the version of each database table, it is increased whenever the table is replaced
+        
+    _sequence_indexes : Dict[Tuple[str, str], SequenceIndex]
+        the sequence indexes of each database table by grouping attribute that have already been built for the current version
+        
+    _dictionaries : Dict[str, Dict[str, List]]
+        the categories of the dictionary encoded columns of each database table that have already been read from the dictionary table (the codes of the categories are their positions)
+        
+    _lock : threading.RLock
+        the lock that is held while the database, the cache or the sequence indexes are accessed
+        
+    _log_cache : LogCache
+        the on-disk cache in which the interval log is stored (None if the interval log is not cached)
+        
+    _log_cache_key : str
+        the fingerprint of the imported log in the on-disk cache
+        
+    _generation : int
+        the number of times a table has been replaced, rows that are appended do not change the generation (so summaries of the log only need to be rebuilt if the generation changes)
+        
+    _has_interval_log : bool
+        True if the interval log has been created for the current event log
+        
+    _unsorted_tables : Set[str]
+        the tables to which rows have been appended that are earlier than the stored rows, their rows are not in time order anymore
+        
+    _latest_times : Dict[str, object]
+        the latest timestamp of every table (the 'Timestamp' of the event log and the 'Start' of the interval log) that has already been determined, it is needed to detect appended rows that are not in time order
     """
     
-    def __init__(self, cfg, storage_type=StorageType.ROW_BASED):
+    def __init__(self, cfg, storage_type=StorageType.ROW_BASED, cache_size=DEFAULT_CACHE_SIZE):
         """
         Parameters
         ----------
@@ -48,19 +158,44 @@ class EventLogStorage:
             the database connection
         storage_type : StorageType, optional
             specifies the data layout used in the event log storage, by default StorageType.ROW_BASED
+        cache_size : int, optional
+            the maximal number of bytes of loaded dataframes that are kept in memory (0 disables the cache), by default DEFAULT_CACHE_SIZE
         """
         self._config = cfg
+        self._staging = False
+        self._cache = FrameCache(cache_size)
+        self._versions = {DATABASE_NAME: 0, INTERVAL_DATABASE_NAME: 0}
+        self._sequence_indexes = {}
+        self._dictionaries = {}
+        self._lock = threading.RLock()
+        self._log_cache = None
+        self._log_cache_key = None
+        self._generation = 0
+        self._has_interval_log = False
+        self._unsorted_tables = set()
+        self._latest_times = {}
         
         self._storage_type = storage_type 
         if self._storage_type == StorageType.ROW_BASED:
             logger.info("Connect with SQLite Database")
-            self._con = sqlite3.connect(f'{os.getcwd()}/event_log_storage_sqlite.db')
+            import sqlite3
+            self._con = sqlite3.connect(f'{os.getcwd()}/event_log_storage_sqlite.db', check_same_thread=False)    #the access from several threads is serialized by the lock
+            self._con.execute(f"CREATE TABLE IF NOT EXISTS {DICTIONARY_TABLE_NAME} (table_name TEXT, column_name TEXT, code INTEGER, value, PRIMARY KEY (table_name, column_name, value))")
         elif self._storage_type == StorageType.COLUMN_BASED or self._storage_type == StorageType.COLUMN_BASED_AT_ONCE:
             logger.info("Connect with DuckDB Database")
+            import duckdb
             self._con = duckdb.connect(f'{os.getcwd()}/event_log_storage_duck.db')
+        elif self._storage_type == StorageType.MEMORY_MAPPED:
+            logger.info("Open memory-mapped column store")
+            self._store = ColumnStore(f'{os.getcwd()}/{COLUMN_STORE_DIRECTORY}')
+            import duckdb
+            self._con = duckdb.connect(f'{os.getcwd()}/event_log_storage_duck.db')    #only used for chunked imports
+        if self._storage_type != StorageType.ROW_BASED:
+            self._con.execute(f"CREATE TABLE IF NOT EXISTS {DICTIONARY_TABLE_NAME} (table_name VARCHAR, column_name VARCHAR, code INTEGER, value VARCHAR)")
 
     
     @log_time(logger, "Storing dataframe into database")
+    @synchronized
     def add_new_dataframe(self, new_df):
         """
         validates the log and then adds it into the EventLogStorage database and the database is optimized (e.g. by creating indexes)
@@ -73,34 +208,451 @@ class EventLogStorage:
         validate(new_df)
                 
         if self._storage_type == StorageType.ROW_BASED:
-            new_df.to_sql(DATABASE_NAME, self._con, if_exists='replace', index=False)
-            cursor = self._con.cursor()
-            cursor.execute(f"CREATE INDEX job_index ON {DATABASE_NAME} (Job)")
-            cursor.execute(f"CREATE INDEX machine_index ON {DATABASE_NAME} (Machine)")
+            self._write_table(DATABASE_NAME, new_df)
+            self._create_indexes()
         elif self._storage_type == StorageType.COLUMN_BASED or self._storage_type == StorageType.COLUMN_BASED_AT_ONCE:
-            self._con.execute(f"DROP TABLE IF EXISTS {DATABASE_NAME}")
-            self._con.from_df(new_df).create(DATABASE_NAME)
+            self._write_table(DATABASE_NAME, new_df)
+        elif self._storage_type == StorageType.MEMORY_MAPPED:
+            self._store.write_table(DATABASE_NAME, new_df)
+        self._new_version(DATABASE_NAME)
+            
+    @log_time(logger, "Appending dataframe to database")
+    @synchronized
+    def append_dataframe(self, new_df):
+        """
+        appends new events to the stored event log without replacing it, only the new events are written and the categories of the dictionary encoded columns are extended. 
+        If the interval log has already been created, the operations that are completed by the new events are appended to the interval log as well (their start events may already be stored)
+        
+        Parameters
+        -----------
+        new_df : pandas.DataFrame
+            the new events in the goal format with the same attributes as the stored event log and sorted by "Timestamp", events of operations that are already stored need to have the same activity instance. 
+            The new events may be earlier than the stored events (for example the start events of operations that are completed later), but not earlier than the stored events of their own operation
+        
+        Raises
+        ------
+        ValueError
+            if the new events have other attributes than the stored event log, if they are not sorted by their timestamps or if they are earlier than the stored events of their operations
+        """
+        validate(new_df)
+        columns = self.get_columns()
+        if sorted(new_df.columns) != sorted(columns):
+            raise ValueError(f"the appended events need the same attributes as the stored event log: {columns}")
+        if len(new_df.index) == 0:
+            return
+        
+        has_interval_log = self._has_interval_log
+        if has_interval_log:
+            interval_df = self._complete_operations(new_df[columns])
+        self._append_table(DATABASE_NAME, new_df[columns])
+        if has_interval_log:
+            self._append_table(INTERVAL_DATABASE_NAME, interval_df)
+    
+    def _complete_operations(self, new_df):
+        """
+        creates the operations of the interval log that are completed by the new events, the stored events of their activity instances are read again, 
+        so that the start and complete events are paired in the same way as in create_interval_log()
+        """
+        stored_events = self.get_events_of("Activity_Instance", new_df["Activity_Instance"].dropna().unique())
+        latest_stored = stored_events.groupby("Activity_Instance")["Timestamp"].max()
+        earliest_new = new_df.groupby("Activity_Instance")["Timestamp"].min()
+        if (earliest_new.reindex(latest_stored.index) < latest_stored).any():
+            raise ValueError(f"The appended events are earlier than the stored events of their operations")
+        
+        events = pd.concat([stored_events.assign(Appended=False), new_df.assign(Appended=True)], ignore_index=True)
+        events = events.sort_values("Timestamp", kind="stable", ignore_index=True)
+        interval_df = EventToIntervalLog().transform(self._config, events)
+        
+        interval_df = interval_df[interval_df["Appended"]].drop(columns="Appended")      #the operations that were completed by stored events are already in the interval log
+        interval_df = interval_df.sort_values(["Start", "Complete", "Job","Machine"], ignore_index=True)
+        first_interval_id = self._count_rows(INTERVAL_DATABASE_NAME)
+        interval_df['Interval_ID'] = range(first_interval_id, first_interval_id + len(interval_df.index))
+        return interval_df
+    
+    def _append_table(self, table, df):
+        """
+        appends the rows to the table, the categorical columns are encoded with the categories of the table (new values are added after them), 
+        the table is marked as unsorted if the rows are earlier than the stored rows
+        """
+        if self._storage_type == StorageType.COLUMN_BASED_AT_ONCE and table == INTERVAL_DATABASE_NAME:
+            stored_df = self._interval_datataframe
+        else:
+            stored_df = self._load_table(table, first_row=self._count_rows(table))     #only the columns and their data types are needed
+        categories = {attr: stored_df[attr].cat.categories.tolist() for attr in stored_df.columns if pd.api.types.is_categorical_dtype(stored_df[attr])}
+        df = CategoricalEncoder(categories).transform(self._config, df[list(stored_df.columns)].copy())
+        
+        time_attr = TIME_ATTRIBUTES[table]
+        latest_time = self._latest_time(table)
+        if latest_time is not None and df[time_attr].min() < latest_time:
+            self._unsorted_tables.add(table)
+        
+        if self._storage_type == StorageType.MEMORY_MAPPED:
+            self._store.append_table(table, df)
+        elif self._storage_type == StorageType.COLUMN_BASED_AT_ONCE and table == INTERVAL_DATABASE_NAME:
+            stored_df = stored_df.assign(**{attr: stored_df[attr].cat.set_categories(df[attr].cat.categories, ordered=True) for attr in categories})
+            self._interval_datataframe = pd.concat([stored_df, df], ignore_index=True)
+        else:
+            self._write_table(table, df, append=True)
+        self._new_version(table, replaced=False)
+        self._latest_times[table] = df[time_attr].max() if latest_time is None else max(latest_time, df[time_attr].max())
+    
+    @synchronized
+    def _latest_time(self, table):
+        """
+        returns the latest timestamp of the table ('Timestamp' of the event log and 'Start' of the interval log) or None if the table is empty
+        """
+        if table not in self._latest_times:
+            time_attr = TIME_ATTRIBUTES[table]
+            if self._storage_type == StorageType.MEMORY_MAPPED:
+                value = self._store.read_table(table, [time_attr])[time_attr].max()
+            elif self._storage_type == StorageType.COLUMN_BASED_AT_ONCE and table == INTERVAL_DATABASE_NAME:
+                value = self._interval_datataframe[time_attr].max()
+            else:
+                value = self._execute(f'SELECT MAX("{time_attr}") FROM {table}')[0][0]
+            self._latest_times[table] = None if value is None or pd.isna(value) else pd.Timestamp(value)
+        return self._latest_times[table]
+            
+    def _new_version(self, table, replaced=True):
+        """
+        increases the version of the table after it has been replaced (or rows have been appended) and removes all cached dataframes and indexes of the old version
+        """
+        self._versions[table] = self._versions[table] + 1
+        self._cache.invalidate(table)
+        self._sequence_indexes = {k: v for k, v in self._sequence_indexes.items() if k[0] != table}
+        self._dictionaries.pop(table, None)
+        self._latest_times.pop(table, None)
+        if table == DATABASE_NAME:
+            self._log_cache = None      #the cached interval log does not belong to the new event log
+        if replaced:
+            self._generation = self._generation + 1
+            self._unsorted_tables.discard(table)
+            if table == DATABASE_NAME:
+                self._has_interval_log = False
 
-    def get_event_log(self):
+    def _write_table(self, table, df, append=False):
+        """
+        stores the dataframe as a table of the database (an existing table is replaced, unless the rows are appended), categorical columns are stored as their integer codes and their categories are stored in the dictionary table.
+        Appended rows need to have the categories of the table followed by the new categories, so that the codes of the stored rows stay valid
+        """
+        known_categories = self._dictionary(table) if append else {}
+        if not append:
+            self._execute(f"DELETE FROM {DICTIONARY_TABLE_NAME} WHERE table_name = ?", [table])
+        encoded_columns = {}
+        for attr in df.columns:
+            if pd.api.types.is_categorical_dtype(df[attr]):
+                codes = df[attr].cat.codes
+                encoded_columns[attr] = codes.astype("Int64").mask(codes < 0)     #missing values are stored as NULL
+                if not append:
+                    self._insert_dictionary(table, attr, [None], -1)        #marks the column as encoded, also if it has no categories yet
+                first_code = len(known_categories.get(attr, []))
+                self._insert_dictionary(table, attr, df[attr].cat.categories[first_code:].tolist(), first_code)
+        df = df.assign(**encoded_columns)
+        
+        if self._storage_type == StorageType.ROW_BASED:
+            df.to_sql(table, self._con, if_exists='append' if append else 'replace', index=False)
+        elif append:
+            self._con.from_df(df).insert_into(table)
+        else:
+            self._execute(f"DROP TABLE IF EXISTS {table}")
+            self._con.from_df(df).create(table)
+    
+    def _insert_dictionary(self, table, attr, categories, first_code):
+        """
+        adds the categories of a column to the dictionary table, their codes start at first_code
+        """
+        if len(categories) > 0:
+            entries = pd.DataFrame({"table_name": table, "column_name": attr, "code": np.arange(first_code, first_code + len(categories)), "value": categories})
+            if self._storage_type == StorageType.ROW_BASED:
+                entries.to_sql(DICTIONARY_TABLE_NAME, self._con, if_exists='append', index=False)
+            else:
+                self._con.from_df(entries).insert_into(DICTIONARY_TABLE_NAME)
+    
+    @synchronized
+    def _dictionary(self, table):
+        """
+        returns the categories of every dictionary encoded column of the database table (the codes of the categories are their positions)
+        """
+        if table not in self._dictionaries:
+            entries = self._execute(f"SELECT column_name, code, value FROM {DICTIONARY_TABLE_NAME} WHERE table_name = ? ORDER BY column_name, code", [table])
+            dictionary = {}
+            for attr, code, value in entries:
+                categories = dictionary.setdefault(attr, [])
+                if code >= 0:       #the entry with code -1 only marks the column as encoded
+                    categories.append(value)
+            self._dictionaries[table] = dictionary
+        return self._dictionaries[table]
+    
+    def _decode_categoricals(self, table, df):
+        """
+        converts the integer codes of the dictionary encoded columns that are read from the database into categoricals (the codes are kept, only the categories are added)
+        """
+        for attr, categories in self._dictionary(table).items():
+            if attr in df.columns:
+                df[attr] = pd.Categorical.from_codes(df[attr].fillna(-1).to_numpy(dtype=np.int64), categories=categories, ordered=True)
+        return df
+    
+    def _is_text_column(self, table, attr):
+        """
+        returns True if the column of the database table only contains strings (and at least one value)
+        """
+        if self._storage_type == StorageType.ROW_BASED:
+            number_strings, number_others = self._execute(f"""SELECT COALESCE(SUM(typeof("{attr}") = 'text'), 0), COALESCE(SUM(typeof("{attr}") NOT IN ('text', 'null')), 0) FROM {table}""")[0]
+            return number_strings > 0 and number_others == 0
+        else:
+            data_type = self._execute("SELECT data_type FROM information_schema.columns WHERE table_name = ? AND column_name = ?", [table, attr])[0][0]
+            return data_type == "VARCHAR" and self._execute(f'SELECT COUNT("{attr}") FROM {table}')[0][0] > 0
+    
+    def _encode_staged_columns(self, columns):
+        """
+        creates the dictionaries of the string columns of the categorical attributes in the staging table (with sorted values as in the CategoricalEncoder adapter) 
+        and returns the expressions that select the encoded columns from the staged log
+        """
+        expressions = {}
+        self._execute(f"DELETE FROM {DICTIONARY_TABLE_NAME} WHERE table_name = ?", [DATABASE_NAME])
+        for attr in CATEGORICAL_ATTRIBUTES:
+            if attr not in columns:
+                continue
+            if self._execute(f'SELECT COUNT("{attr}") FROM {STAGING_DATABASE_NAME}')[0][0] == 0:
+                self._insert_dictionary(DATABASE_NAME, attr, [None], -1)    #a column without any value is encoded without categories
+                expressions[attr] = "CAST(NULL AS INTEGER)"
+                continue
+            if not self._is_text_column(STAGING_DATABASE_NAME, attr):
+                continue
+            self._insert_dictionary(DATABASE_NAME, attr, [None], -1)
+            self._execute(f"""INSERT INTO {DICTIONARY_TABLE_NAME} 
+            SELECT ?, ?, ROW_NUMBER() OVER (ORDER BY value) - 1, value FROM (SELECT DISTINCT "{attr}" AS value FROM {STAGING_DATABASE_NAME} WHERE "{attr}" IS NOT NULL)
+            """, [DATABASE_NAME, attr])
+            expressions[attr] = f"""(SELECT code FROM {DICTIONARY_TABLE_NAME} WHERE table_name = '{DATABASE_NAME}' AND column_name = '{attr}' AND value = staged."{attr}")"""
+        return expressions
+
+    def _create_indexes(self):
+        """
+        creates the indexes on the event log table (only needed for the SQLite database)
+        """
+        cursor = self._con.cursor()
+        cursor.execute(f"CREATE INDEX job_index ON {DATABASE_NAME} (Job)")
+        cursor.execute(f"CREATE INDEX machine_index ON {DATABASE_NAME} (Machine)")
+        if "Activity_Instance" in self._columns(DATABASE_NAME):
+            cursor.execute(f"CREATE INDEX activity_instance_index ON {DATABASE_NAME} (Activity_Instance)")
+            
+    def _execute(self, query, parameters=()):
+        """
+        executes a query on the database and returns all resulting rows
+        """
+        if self._storage_type == StorageType.ROW_BASED:
+            return self._con.execute(query, parameters).fetchall()
+        else:
+            return self._con.execute(query, list(parameters)).fetchall()
+    
+    @synchronized
+    def _columns(self, table):
+        """
+        returns the column names of the given database table
+        """
+        if self._storage_type == StorageType.ROW_BASED:
+            return [row[1] for row in self._execute(f"PRAGMA table_info({table})")]
+        elif self._storage_type == StorageType.MEMORY_MAPPED and table != STAGING_DATABASE_NAME:
+            return self._store.columns(table)
+        else:
+            return [row[0] for row in self._execute("SELECT column_name FROM information_schema.columns WHERE table_name = ? ORDER BY ordinal_position", [table])]
+    
+    def add_dataframe_chunk(self, chunk):
+        """
+        appends a chunk of an event log to a staging table, so that logs can be imported without holding the whole log in memory. 
+        The chunks need to be adapted by all row-local adapters before, the activity instances (if missing) and the sorting are computed inside the database by finish_chunked_import()
+        
+        Parameters
+        -----------
+        chunk : pandas.DataFrame
+            the next rows of the event log in atomic event log form with one timestamp "Timestamp" in a pandas timestamp format
+        """
+        if self._storage_type == StorageType.ROW_BASED:
+            chunk.to_sql(STAGING_DATABASE_NAME, self._con, if_exists='append' if self._staging else 'replace', index=False)
+        else:
+            # columns without any value in this chunk cannot be typed, they are inserted as text (first chunk) or filled up with NULL (following chunks)
+            empty_columns = [c for c in chunk.columns if chunk[c].isna().all()]
+            self._con.register("chunk_view", chunk)
+            if self._staging:
+                columns = ", ".join(f'"{c}"' for c in chunk.columns if c not in empty_columns)
+                self._con.execute(f"INSERT INTO {STAGING_DATABASE_NAME} BY NAME SELECT {columns} FROM chunk_view")
+            else:
+                columns = ", ".join(f'CAST("{c}" AS VARCHAR) AS "{c}"' if c in empty_columns else f'"{c}"' for c in chunk.columns)
+                self._con.execute(f"DROP TABLE IF EXISTS {STAGING_DATABASE_NAME}")
+                self._con.execute(f"CREATE TABLE {STAGING_DATABASE_NAME} AS SELECT {columns} FROM chunk_view")
+            self._con.unregister("chunk_view")
+        self._staging = True
+    
+    @log_time(logger, "Creating event log out of the staged chunks")
+    def finish_chunked_import(self):
+        """
+        creates the event log table out of all chunks that were added with add_dataframe_chunk(): 
+        the staged log is validated, activity instances are added (if not already present), the categorical attributes are dictionary encoded and the log is sorted inside the database, afterwards the staging table is removed
+        (if the staged log is not valid, the staging table is removed and the stored event log is kept)
+        
+        Raises
+        ------
+        ValueError
+            if no chunk was added, if the log contains operations that do not have start and complete events or if the log is not sorted by its timestamps
+        """
+        if not self._staging:
+            raise ValueError("no chunks have been added to the event log")
+        
+        columns = self._columns(STAGING_DATABASE_NAME)
+        if 'Timestamp' not in columns:
+            raise ValueError(f"a Timestamp attribute is needed")
+        
+        selection = "*"
+        new_columns = []
+        if "Activity_Instance" not in columns:
+            group_attributes = ", ".join(f'"{attr}"' for attr in self._config["group_attributes"])
+            malformed_operations = self._execute(f"""SELECT {group_attributes}
+            FROM {STAGING_DATABASE_NAME}
+            GROUP BY {group_attributes}
+            HAVING SUM(CASE WHEN Transaction_Type = 'start' THEN 1 ELSE 0 END) = 0 OR SUM(CASE WHEN Transaction_Type = 'complete' THEN 1 ELSE 0 END) = 0
+            """)
+            if len(malformed_operations) > 0:
+                self._discard_staging()
+                raise ValueError(f"The event log contains operations that do not have start and complete events: {[tuple(operation) for operation in malformed_operations]}")
+            
+            group_order = ", ".join(f'"{attr}" NULLS LAST' for attr in self._config["group_attributes"])
+            selection = f"*, DENSE_RANK() OVER (ORDER BY {group_order}) - 1 AS Activity_Instance"
+            new_columns = ["Activity_Instance"]
+        
+        # same order as given by the Sorter adapter (the staged string values are sorted, not the codes)
+        if "sorted" in self._config and self._config["sorted"] == True and self._config["event_log_format"] == 'atomic':
+            order = "staged.Row_ID"
+        else:
+            order = "staged.Timestamp, staged.Job, staged.Machine, staged.Activity_Instance, staged.Row_ID"
+            if "Transaction_Type" in columns:   # start before complete for operations without duration
+                order = f"{order}, CASE WHEN staged.Transaction_Type = 'start' THEN 0 ELSE 1 END"
+        
+        # the order is checked on the staged log, so that the stored event log is not replaced by an unsorted log
+        unsorted_events = self._execute(f"""SELECT COUNT(*) FROM (
+            SELECT Timestamp, LAG(Timestamp) OVER (ORDER BY {order}) AS Previous_Timestamp FROM (SELECT {selection} FROM {STAGING_DATABASE_NAME}) AS staged
+        ) WHERE Previous_Timestamp > Timestamp
+        """)
+        if unsorted_events[0][0] > 0:
+            self._discard_staging()
+            raise ValueError(f"The event log in not sorted by timestamps")
+        
+        self._execute(f"DROP TABLE IF EXISTS {DATABASE_NAME}")
+        expressions = self._encode_staged_columns(columns)
+        encoded_selection = ", ".join(f'{expressions[c]} AS "{c}"' if c in expressions else f'staged."{c}"' for c in columns + new_columns)
+        self._execute(f"""CREATE TABLE {DATABASE_NAME} AS 
+        SELECT {encoded_selection} FROM (SELECT {selection} FROM {STAGING_DATABASE_NAME}) AS staged
+        ORDER BY {order}
+        """)
+        self._execute(f"DROP TABLE {STAGING_DATABASE_NAME}")
+        self._staging = False
+        self._new_version(DATABASE_NAME)
+        if self._storage_type == StorageType.ROW_BASED:
+            self._create_indexes()
+            self._con.commit()
+        
+        if self._storage_type == StorageType.MEMORY_MAPPED:
+            writer = self._store.writer(DATABASE_NAME)
+            for batch in self._fetch_batches(f"SELECT * FROM {DATABASE_NAME} ORDER BY rowid"):
+                writer.write_batch(self._decode_categoricals(DATABASE_NAME, batch))
+            writer.finish()
+            self._store.commit(DATABASE_NAME)
+            self._execute(f"DROP TABLE {DATABASE_NAME}")
+            self._execute(f"DELETE FROM {DICTIONARY_TABLE_NAME} WHERE table_name = ?", [DATABASE_NAME])
+            self._new_version(DATABASE_NAME)
+
+    def _discard_staging(self):
+        """
+        removes the staging table of a chunked import that is not finished
+        """
+        self._execute(f"DROP TABLE IF EXISTS {STAGING_DATABASE_NAME}")
+        self._staging = False
+        if self._storage_type == StorageType.ROW_BASED:
+            self._con.commit()
+
+    def get_columns(self):
+        """
+        returns the attributes of the event log without loading the log
+        
+        Returns
+        -----------
+        List[str]
+            the column names of the event log
+        """
+        return self._columns(DATABASE_NAME)
+    
+    def get_event_log(self, needed_columns=[], first_row=0):
         """
-        loads the event log from the database
+        loads the event log from the database (or from the cache, if it has already been loaded since the last change)
+        
+        Parameters
+        -----------
+        needed_columns : List[str], optional
+            a list of attributes/columns that need to be accessed, by default [] (the empty list stands for all attributes), columns that do not exist in the log are ignored
+            
+        first_row : int, optional
+            the position of the first event that is loaded, so that only the events appended after that position are read, by default 0
         
         Returns
         -----------
         dataframe : pandas.DataFrame
-            the whole event log from the data base as a data frame
+            the whole event log from the data base as a data frame (the dataframe is shared with the cache and must not be modified)
         """
-        query = f"SELECT * FROM {DATABASE_NAME}"
+        return self._load_table(DATABASE_NAME, needed_columns, first_row)
+    
+    @synchronized
+    def _load_table(self, table, needed_columns=[], first_row=0):
+        """
+        loads the needed columns of the table from the cache or, if not cached, from the database and adds them to the cache (the memory-mapped column store is read directly), 
+        if only the rows from first_row on are loaded, they are not cached
+        """
+        if self._storage_type == StorageType.MEMORY_MAPPED:
+            df = self._store.read_table(table, needed_columns)
+            return df if first_row == 0 else df.iloc[first_row:].reset_index(drop=True)
+        
+        full_df = self._cache.get((table, self._versions[table], ()))
+        if full_df is not None and first_row == 0:
+            return self._project(full_df, needed_columns)
         
+        columns = self._columns(table)
+        needed_columns = tuple(c for c in needed_columns if c in columns)
+        if len(needed_columns) == len(columns):
+            needed_columns = ()
+        key = (table, self._versions[table], needed_columns)
+        df = self._cache.get(key) if first_row == 0 else None
+        if df is None:
+            selection = "*" if len(needed_columns) == 0 else ", ".join(f'"{c}"' for c in needed_columns)
+            query = f"SELECT {selection} FROM {table} {self._rows_from(first_row)} ORDER BY rowid"    #all projections must have the same row order, so that they can share the sequence indexes
+            df = self._read_query(table, query)
+            if first_row == 0:
+                self._cache.put(key, df)
+        return df
+    
+    def _rows_from(self, first_row):
+        """
+        returns the condition that selects the rows of a database table from the given position on (the rowids of SQLite start at 1, the ones of DuckDB at 0)
+        """
+        if first_row == 0:
+            return ""
+        return f"WHERE rowid > {int(first_row)}" if self._storage_type == StorageType.ROW_BASED else f"WHERE rowid >= {int(first_row)}"
+    
+    def _read_query(self, table, query, parameters=()):
+        """
+        executes a query on the given database table and returns the result as a dataframe with decoded categorical columns and pandas timestamps
+        """
         if self._storage_type == StorageType.ROW_BASED:
-            df = pd.read_sql_query(query, self._con)
-            df['Timestamp'] = pd.to_datetime(df['Timestamp'], format="%Y-%m-%d %H:%M:%S")
+            df = self._convert_timestamps(pd.read_sql_query(query, self._con, params=list(parameters)))
+        else:
+            df = self._con.execute(query, list(parameters)).fetchdf()
+        return self._decode_categoricals(table, df)
+    
+    def _project(self, df, needed_columns):
+        """
+        selects the needed columns of the dataframe, columns that do not exist are ignored
+        """
+        if len(needed_columns) == 0:
             return df
-        elif self._storage_type == StorageType.COLUMN_BASED or self._storage_type == StorageType.COLUMN_BASED_AT_ONCE:
-            df = self._con.execute(query).fetchdf()
-            return df 
+        return df[[c for c in needed_columns if c in df.columns]]
     
-    def get_sequence(self, attr, needed_columns=[]):  #currently not used
+    def get_sequence(self, attr, needed_columns=[]):
         """
         groups the event log database and returns a generator object of the sequence of the given attribute as a generator object
         
@@ -110,42 +662,99 @@ class EventLogStorage:
             the attribute by which the event log should be grouped
             
         needed_columns : List[str], optional
-            a list of attributes/columns that need to be accessed, by default [] (the empty list stands for all attributes)
+            a list of attributes/columns that need to be accessed, by default [] (the empty list stands for all attributes), columns that do not exist in the log are ignored
              
         Yields
         ------
         pandas.DataFrame
             The next sequence as a dataframe.
         """
-        if self._storage_type == StorageType.COLUMN_BASED_AT_ONCE:
-            for key, group in self.get_event_log().groupby([attr]):
-                yield group
+        if self._storage_type == StorageType.COLUMN_BASED_AT_ONCE or self._storage_type == StorageType.MEMORY_MAPPED:
+            yield from self._group(DATABASE_NAME, self.get_event_log(), attr, needed_columns)
+        else:
+            yield from self._scan_sequences(DATABASE_NAME, attr, needed_columns)
+    
+    def _group(self, table, df, attr, needed_columns):
+        """
+        groups the given dataframe of the table by the attribute, the groups are ordered by their key and keep the order of the log (the same order as in _scan_sequences()), 
+        unless rows have been appended out of time order, then the groups are sorted by time
+        """
+        if attr not in df.columns:
+            raise ValueError(f"the log has no attribute {attr}")
+        if table in self._unsorted_tables:
+            df = df.sort_values(TIME_ATTRIBUTES[table], kind="stable")
         
+        for key, group in self._project(df, needed_columns).groupby(df[attr], sort=True, observed=True):
+            yield group.reset_index(drop=True)
+            
+    def _scan_sequences(self, table, attr, needed_columns):
+        """
+        reads the database table with one query that is ordered by the given attribute and yields the sequences by detecting the boundaries between the attribute values, 
+        the result is fetched in batches of SEQUENCE_BATCH_SIZE rows, so only one batch (and the current sequence) is held in memory
+        """
+        columns = self._columns(table)
+        if attr not in columns:
+            raise ValueError(f"the log has no attribute {attr}")
+        needed_columns = columns if len(needed_columns)==0 else [c for c in needed_columns if c in columns]
+        selected_columns = needed_columns if attr in needed_columns else needed_columns + [attr]
+        
+        order = f'"{attr}", "{TIME_ATTRIBUTES[table]}", rowid' if table in self._unsorted_tables else f'"{attr}", rowid'
+        query = f"""SELECT {", ".join(f'"{c}"' for c in selected_columns)}
+        FROM {table}
+        WHERE "{attr}" IS NOT NULL
+        ORDER BY {order}
+        """
+        
+        pending = []    #parts of the current sequence, that might continue in the next batch
+        for batch in self._fetch_batches(query):
+            keys = batch[attr].to_numpy()
+            boundaries = [0, *(np.flatnonzero(keys[1:] != keys[:-1]) + 1), len(batch)]
+            if len(pending) > 0 and pending[-1][attr].iat[-1] != keys[0]:
+                yield self._finish_sequence(table, pending, needed_columns)
+                pending = []
+            for i in range(len(boundaries) - 2):
+                pending.append(batch.iloc[boundaries[i]:boundaries[i+1]])
+                yield self._finish_sequence(table, pending, needed_columns)
+                pending = []
+            pending.append(batch.iloc[boundaries[-2]:])
+        
+        if len(pending) > 0:
+            yield self._finish_sequence(table, pending, needed_columns)
+    
+    def _finish_sequence(self, table, parts, needed_columns):
+        """
+        concatenates the parts of a sequence that were read in different batches
+        """
+        df = parts[0] if len(parts) == 1 else pd.concat(parts)
+        return self._decode_categoricals(table, self._convert_timestamps(df[needed_columns].reset_index(drop=True)))
+    
+    def _fetch_batches(self, query):
+        """
+        executes the query and yields the result in dataframes with at most SEQUENCE_BATCH_SIZE rows
+        """
+        if self._storage_type == StorageType.ROW_BASED:
+            yield from pd.read_sql_query(query, self._con, chunksize=SEQUENCE_BATCH_SIZE)
         else:
-            query = f"""SELECT {attr}
-            FROM {DATABASE_NAME}
-            GROUP BY {attr}
-            """
-            df_with_the_attr = pd.read_sql_query(query, self._con)
-            values_of_attr = df_with_the_attr[attr].unique()
-            
-            if len(needed_columns)==0:
-                s = '*'
-            else:
-                s = ','.join(needed_columns)
-                        
-            for x in values_of_attr:
-                query = f"""
-                SELECT {s}
-                FROM {DATABASE_NAME}
-                WHERE {attr} = '{x}'
-                """
-                if self._storage_type == StorageType.ROW_BASED: 
-                    df = pd.read_sql_query(query, self._con)
-                    yield df
-                elif self._storage_type == StorageType.COLUMN_BASED:
-                    df = self._con.execute(query).fetchdf()
-                yield df  
+            cursor = self._con.cursor()     #own cursor, so that other queries can be executed while the generator is not finished
+            try:
+                cursor.execute(query)
+                while True:
+                    batch = cursor.fetch_df_chunk(max(1, SEQUENCE_BATCH_SIZE // DUCKDB_VECTOR_SIZE))
+                    if len(batch) == 0:
+                        break
+                    yield batch
+            finally:
+                cursor.close()
+    
+    def _convert_timestamps(self, df):
+        """
+        converts the timestamps that are stored as strings in the SQLite database into pandas timestamps
+        """
+        if self._storage_type == StorageType.ROW_BASED:
+            for attr in ["Timestamp", "Start", "Complete"]:
+                if attr in df.columns:
+                    df[attr] = pd.to_datetime(df[attr], format="%Y-%m-%d %H:%M:%S")
+        return df
         
     def print_event_log(self):
         """
@@ -162,51 +771,230 @@ class EventLogStorage:
         file_name : str, optional
             file name where the log should be saved, by default "adapted_event_log.csv"
         """
-        self.get_event_log().to_csv(f'{os.getcwd()}/output/{file_name}')
+        self.get_event_log().to_csv(output_file(file_name))
                      
+    def use_log_cache(self, log_cache, key):
+        """
+        stores the interval log of the imported log in the on-disk cache, so that it only needs to be created once for an unchanged log
+        
+        Parameters
+        -----------
+        log_cache : LogCache
+            the on-disk cache
+            
+        key : str
+            the fingerprint of the imported log
+        """
+        self._log_cache = log_cache
+        self._log_cache_key = key
+    
+    @synchronized
     def create_interval_log(self):
         """
         if possible construct an interval log out of the stored atomic event log and save it into the database as a separate table
         """
-        df = self.get_event_log()
-        interval_df = EventToIntervalLog().transform(self._config, df)
-        
-        interval_df = interval_df.sort_values(["Start", "Complete", "Job","Machine"], ignore_index=True)
-        interval_df['Interval_ID'] = range(0, len(interval_df.index))
+        interval_df = None if self._log_cache is None else self._log_cache.load(self._log_cache_key, INTERVAL_DATABASE_NAME)
+        if interval_df is None:
+            df = self.get_event_log()
+            if DATABASE_NAME in self._unsorted_tables:
+                df = df.sort_values("Timestamp", kind="stable", ignore_index=True)      #appended events can be earlier than the stored events
+            interval_df = EventToIntervalLog().transform(self._config, df)
+            
+            interval_df = interval_df.sort_values(["Start", "Complete", "Job","Machine"], ignore_index=True)
+            interval_df['Interval_ID'] = range(0, len(interval_df.index))
+            if self._log_cache is not None:
+                self._log_cache.store(self._log_cache_key, INTERVAL_DATABASE_NAME, interval_df)
     
         if self._storage_type == StorageType.ROW_BASED:
-            interval_df.to_sql(INTERVAL_DATABASE_NAME, self._con, if_exists='replace', index=False)
+            self._write_table(INTERVAL_DATABASE_NAME, interval_df)
             cursor = self._con.cursor()
             cursor.execute(f"CREATE INDEX job_index_2 ON {INTERVAL_DATABASE_NAME} (Job)")
             cursor.execute(f"CREATE INDEX machine_index_2 ON {INTERVAL_DATABASE_NAME} (Machine)")
         elif self._storage_type == StorageType.COLUMN_BASED:
-            self._con.execute(f"DROP TABLE IF EXISTS {INTERVAL_DATABASE_NAME}")
-            self._con.from_df(interval_df).create(INTERVAL_DATABASE_NAME)
+            self._write_table(INTERVAL_DATABASE_NAME, interval_df)
         elif self._storage_type == StorageType.COLUMN_BASED_AT_ONCE:
             self._interval_datataframe = interval_df
+        elif self._storage_type == StorageType.MEMORY_MAPPED:
+            self._store.write_table(INTERVAL_DATABASE_NAME, interval_df)
+        self._new_version(INTERVAL_DATABASE_NAME)
+        self._has_interval_log = True
     
-    def get_interval_log(self):
+    def get_interval_log(self, needed_columns=[], first_row=0):
         """
-        loads the interval log from the database
+        loads the interval log from the database (or from the cache, if it has already been loaded since the last change)
+        
+        Parameters
+        -----------
+        needed_columns : List[str], optional
+            a list of attributes/columns that need to be accessed, by default [] (the empty list stands for all attributes), columns that do not exist in the log are ignored
+            
+        first_row : int, optional
+            the position of the first operation that is loaded, so that only the operations appended after that position are read, by default 0
         
         Returns
         -----------
         dataframe : pandas.DataFrame
-            the whole interval log from the data base as a data frame
+            the whole interval log from the data base as a data frame (the dataframe is shared with the cache and must not be modified)
+        """
+        if self._storage_type == StorageType.COLUMN_BASED_AT_ONCE:
+            df = self._project(self._interval_datataframe, needed_columns)
+            return df if first_row == 0 else df.iloc[first_row:].reset_index(drop=True)
+        else:
+            return self._load_table(INTERVAL_DATABASE_NAME, needed_columns, first_row)
+    
+    def has_interval_log(self):
+        """
+        returns True if the interval log has been created for the current event log (appended events are added to it automatically)
+        """
+        return self._has_interval_log
+    
+    def get_generation(self):
+        """
+        returns the generation of the stored logs, it changes whenever the event log or the interval log is replaced, but not when events are appended
         """
-        query = f"SELECT * FROM {INTERVAL_DATABASE_NAME}"
+        return self._generation
+    
+    def get_number_of_rows(self, interval=False):
+        """
+        returns the number of events of the event log or the number of operations of the interval log without loading the log
         
-        if self._storage_type == StorageType.ROW_BASED:
-            df = pd.read_sql_query(query, self._con)
-            df['Start'] = pd.to_datetime(df['Start'], format="%Y-%m-%d %H:%M:%S")
-            df['Complete'] = pd.to_datetime(df['Complete'], format="%Y-%m-%d %H:%M:%S")
-            return df
-        elif self._storage_type == StorageType.COLUMN_BASED:
-            df = self._con.execute(query).fetchdf()
-            return df
-        elif self._storage_type == StorageType.COLUMN_BASED_AT_ONCE:
-            return self._interval_datataframe
+        Parameters
+        -----------
+        interval : bool, optional
+            True if the operations of the interval log should be counted, False for the events of the atomic event log, by default False
+        """
+        return self._count_rows(INTERVAL_DATABASE_NAME if interval else DATABASE_NAME)
+    
+    @synchronized
+    def _count_rows(self, table):
+        """
+        returns the number of rows of the table
+        """
+        if self._storage_type == StorageType.MEMORY_MAPPED:
+            return self._store.number_of_rows(table)
+        elif self._storage_type == StorageType.COLUMN_BASED_AT_ONCE and table == INTERVAL_DATABASE_NAME:
+            return len(self._interval_datataframe.index)
+        elif self._storage_type == StorageType.ROW_BASED:
+            return self._execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}")[0][0]     #the rowids are consecutive, because rows are never deleted
+        else:
+            return self._execute(f"SELECT COUNT(*) FROM {table}")[0][0]
+    
+    @synchronized
+    def get_maximum(self, attr):
+        """
+        returns the largest value of an attribute of the event log (for example of 'Row_ID' or 'Activity_Instance') or None if the log is empty
+        """
+        if self._storage_type == StorageType.MEMORY_MAPPED:
+            value = self._store.read_table(DATABASE_NAME, [attr])[attr].max()
+        else:
+            value = self._execute(f'SELECT MAX("{attr}") FROM {DATABASE_NAME}')[0][0]
+        return None if value is None or pd.isna(value) else value
+    
+    def get_events_of(self, attr, values, needed_columns=[]):
+        """
+        loads only the events with the given values of an attribute (for example all events of some jobs or activity instances), in the order of the event log
+        
+        Parameters
+        -----------
+        attr : str
+            the attribute by which the events are selected
+            
+        values : List
+            the values of the attribute that are selected
+            
+        needed_columns : List[str], optional
+            a list of attributes/columns that need to be accessed, by default [] (the empty list stands for all attributes), columns that do not exist in the log are ignored
+        
+        Returns
+        -----------
+        dataframe : pandas.DataFrame
+            the selected events
+        """
+        return self._select_rows(DATABASE_NAME, attr, values, needed_columns)
+    
+    def get_intervals_of(self, attr, values, needed_columns=[]):
+        """
+        loads only the operations with the given values of an attribute (for example all operations of some jobs), in the order of the interval log
+        
+        Parameters
+        -----------
+        attr : str
+            the attribute by which the operations are selected
+            
+        values : List
+            the values of the attribute that are selected
+            
+        needed_columns : List[str], optional
+            a list of attributes/columns that need to be accessed, by default [] (the empty list stands for all attributes), columns that do not exist in the log are ignored
+        
+        Returns
+        -----------
+        dataframe : pandas.DataFrame
+            the selected operations
+        """
+        return self._select_rows(INTERVAL_DATABASE_NAME, attr, values, needed_columns)
+    
+    @synchronized
+    def _select_rows(self, table, attr, values, needed_columns):
+        """
+        selects the rows of the table with the given values of an attribute, the database is queried with the codes of the values if the attribute is dictionary encoded
+        """
+        if self._storage_type == StorageType.MEMORY_MAPPED or (self._storage_type == StorageType.COLUMN_BASED_AT_ONCE and table == INTERVAL_DATABASE_NAME):
+            df = self._interval_datataframe if self._storage_type == StorageType.COLUMN_BASED_AT_ONCE else self._store.read_table(table)
+            if attr not in df.columns:
+                raise ValueError(f"the log has no attribute {attr}")
+            return self._project(df[df[attr].isin(values).to_numpy()], needed_columns).reset_index(drop=True)
+        
+        columns = self._columns(table)
+        if attr not in columns:
+            raise ValueError(f"the log has no attribute {attr}")
+        needed_columns = columns if len(needed_columns) == 0 else [c for c in needed_columns if c in columns]
+        values = pd.Series(list(values), dtype=object).dropna()
+        if attr in self._dictionary(table):
+            codes = pd.Index(self._dictionary(table)[attr]).get_indexer(values)
+            values = pd.Series(codes[codes >= 0], dtype=np.int64)
+        values = [v.item() if isinstance(v, np.generic) else v for v in values]
+        
+        selection = ", ".join(f'"{c}"' for c in needed_columns)
+        if len(values) == 0:
+            return self._read_query(table, f'SELECT {selection} FROM {table} WHERE FALSE')
+        elif self._storage_type == StorageType.ROW_BASED:
+            return self._read_query(table, f'SELECT {selection} FROM {table} WHERE "{attr}" IN (SELECT value FROM json_each(?)) ORDER BY rowid', [json.dumps(values)])
+        
+        self._con.register("selected_values", pd.DataFrame({"value": values}))
+        try:
+            return self._read_query(table, f'SELECT {selection} FROM {table} WHERE "{attr}" IN (SELECT value FROM selected_values) ORDER BY rowid')
+        finally:
+            self._con.unregister("selected_values")
              
+    @synchronized
+    def get_sequence_index(self, attr, interval=True):
+        """
+        returns the sequence index of the given attribute, it is only built once per version of the log and then shared by all patterns
+        
+        Parameters
+        -----------
+        attr : str
+            the attribute by which the log should be grouped (for example 'Job' or 'Machine')
+            
+        interval : bool, optional
+            True if the index should be built on the interval log (ordered by 'Start'), False if on the atomic event log (ordered by 'Timestamp'), by default True
+        
+        Returns
+        -----------
+        SequenceIndex
+            the sequence index, its positions refer to the rows of the dataframes returned by get_interval_log() or get_event_log() respectively
+        """
+        table = INTERVAL_DATABASE_NAME if interval else DATABASE_NAME
+        index = self._sequence_indexes.get((table, attr))
+        if index is None:
+            if interval:
+                index = SequenceIndex.from_dataframe(self.get_interval_log([attr, "Start"]), attr, "Start")
+            else:
+                index = SequenceIndex.from_dataframe(self.get_event_log([attr, "Timestamp"]), attr, "Timestamp")
+            self._sequence_indexes[(table, attr)] = index
+        return index
+    
     def get_interval_sequence(self, attr, needed_columns=[]):   #This is the operation Sequence we introduced in Chapter 2.2.2.4
         """
         groups the interval log database and returns a generator object of the sequence of the given attribute as a generator object
@@ -217,39 +1005,14 @@ class EventLogStorage:
             the attribute by which the event log should be grouped
             
         needed_columns : List[str], optional
-            a list of attributes/columns that need to be accessed, by default [] (the empty list stands for all attributes)
+            a list of attributes/columns that need to be accessed, by default [] (the empty list stands for all attributes), columns that do not exist in the log are ignored
              
         Yields
         ------
         pandas.DataFrame
             The next interval sequence as a dataframe.
         """
-        if self._storage_type == StorageType.COLUMN_BASED_AT_ONCE:
-            for key, group in self.get_interval_log().groupby([attr]):
-                yield group
-        
+        if self._storage_type == StorageType.COLUMN_BASED_AT_ONCE or self._storage_type == StorageType.MEMORY_MAPPED:
+            yield from self._group(INTERVAL_DATABASE_NAME, self.get_interval_log(), attr, needed_columns)
         else:
-            query = f"""SELECT {attr}
-            FROM {INTERVAL_DATABASE_NAME}
-            GROUP BY {attr}
-            """
-            df_with_the_attr = pd.read_sql_query(query, self._con)
-            values_of_attr = df_with_the_attr[attr].unique()
-                    
-            if len(needed_columns)==0:
-                s = '*'
-            else:
-                s = ','.join(needed_columns)        
-                        
-            for x in values_of_attr:
-                query = f"""
-                SELECT *
-                FROM {INTERVAL_DATABASE_NAME}
-                WHERE {attr} = '{x}'
-                """
-                if self._storage_type == StorageType.ROW_BASED: 
-                    df = pd.read_sql_query(query, self._con)
-                    yield df
-                elif self._storage_type == StorageType.COLUMN_BASED:
-                    df = self._con.execute(query).fetchdf()
-                    yield df                  
\ No newline at end of file
+            yield from self._scan_sequences(INTERVAL_DATABASE_NAME, attr, needed_columns)
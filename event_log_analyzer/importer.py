@@ -1,19 +1,21 @@
 """
 This module contains thr functionality to import new event logs.
 """
+import io
 import json
 import pandas as pd
 import pathlib
+import time
 from event_log_analyzer.event_log import EventLogStorage, StorageType
-from event_log_analyzer.adapter import ActivityInstanceAdder, ColumnRenamer, IntervalToEventLogTransformer, Sorter, TimestampModifier, TimestampRenamer, RowIDAdder
+from event_log_analyzer.adapter import ActivityInstanceAdder, CategoricalEncoder, ColumnRenamer, IntervalToEventLogTransformer, Sorter, TimestampModifier, TimestampRenamer, RowIDAdder
+from event_log_analyzer.log_cache import LogCache, fingerprint
+from event_log_analyzer.metrics import registry
 from event_log_analyzer.validate import validate_config
 from event_log_analyzer.utils import log_time, logger
-from pm4py.objects.log.importer.xes import importer as xes_importer
-from pm4py.objects.conversion.log import converter as log_converter
 
 
 @log_time(logger, "import duration")
-def import_event_log(config_file, storage_type=StorageType.COLUMN_BASED_AT_ONCE):
+def import_event_log(config_file, storage_type=StorageType.COLUMN_BASED_AT_ONCE, chunk_size=None, cache_dir=None):
     """
     Import and validate an event log into the internal representation of an EventLogStorage object
     
@@ -24,6 +26,12 @@ def import_event_log(config_file, storage_type=StorageType.COLUMN_BASED_AT_ONCE)
         
     storage_type: StorageType
         the storage type of the database where we want to import the log, default StorageType.COLUMN_BASED_AT_ONCE
+        
+    chunk_size: int, optional
+        if given, the log is streamed into the database in chunks of this number of rows, so that the memory needed is bounded by the chunk size instead of the file size (only possible for .csv files), by default None
+        
+    cache_dir: str, optional
+        if given, the adapted event log and the interval log are cached as Parquet files in this directory and reused by later imports of the unchanged file with the same configuration (not used for chunked imports), by default None
     
     Returns
     -----------
@@ -37,6 +45,138 @@ def import_event_log(config_file, storage_type=StorageType.COLUMN_BASED_AT_ONCE)
         validate_config(f"{pathlib.Path(__file__).parent}/config_format.schema.json", config)   
             
             
+    if chunk_size is not None:
+        if not config["path"].endswith(".csv"):
+            raise ValueError("the imported file has the wrong format (a chunked import is only possible for .csv files)!")
+        return import_csv_file_in_chunks(config, storage_type, chunk_size)
+            
+    if cache_dir is not None:
+        log_cache = LogCache(cache_dir)
+        key = fingerprint(config)
+        dataframe = log_cache.load(key, "event_log")
+        if dataframe is None:
+            dataframe = adapt_event_log(config)
+            log_cache.store(key, "event_log", dataframe)
+    else:
+        dataframe = adapt_event_log(config)
+    
+    registry.add_rows(len(dataframe.index))
+    event_log_storage = EventLogStorage(config, storage_type)
+    event_log_storage.add_new_dataframe(dataframe)
+    if cache_dir is not None:
+        event_log_storage.use_log_cache(log_cache, key)
+    return event_log_storage
+
+@log_time(logger, "append duration")
+def append_event_log(event_log_storage, config_file):
+    """
+    Import new events (for example the latest part of a log that is still being recorded) and append them to an EventLogStorage without importing the stored log again. 
+    The events are adapted like in adapt_event_log(), but the row ids (if not given in the log) and the activity instances continue those of the stored log, 
+    events of operations that are already stored (e.g. the complete event of a started operation) get the stored activity instance
+    
+    Parameters
+    -----------
+    event_log_storage : EventLogStorage
+        the EventLogStorage object to which the events are appended
+        
+    config_file
+        the path to a JSON configuration file of the new events (the log needs to have the same format as the stored log)
+    """
+    logger.info(f"append event log") 
+ 
+    with open(config_file) as json_config_file:
+        config = json.load(json_config_file)  
+        validate_config(f"{pathlib.Path(__file__).parent}/config_format.schema.json", config)   
+    
+    if config["path"].endswith(".csv"):
+        raw_df = import_csv_file(config)
+    elif config["path"].endswith(".xes"):
+        raw_df = import_xes_file(config)
+    else:
+        raise ValueError("the imported file has the wrong format (currently only .csv possible)!")
+    
+    last_row_id = event_log_storage.get_maximum("Row_ID")
+    last_activity_instance = event_log_storage.get_maximum("Activity_Instance")
+    first_row_id = 0 if last_row_id is None else int(last_row_id) + 1
+    first_activity_instance = 0 if last_activity_instance is None else int(last_activity_instance) + 1
+    
+    df = raw_df
+    for adapter in [RowIDAdder(first_row_id), ColumnRenamer(), TimestampRenamer(), IntervalToEventLogTransformer(first_activity_instance)]:
+        df = adapter.transform(config, df)
+    if "Activity_Instance" not in df.columns and ("activity_instance_column" not in config or config["activity_instance_column"] == None):
+        group_attributes = config["group_attributes"]
+        stored_instances = event_log_storage.get_events_of(group_attributes[0], df[group_attributes[0]].dropna().unique(), group_attributes + ["Activity_Instance"])
+        df = ActivityInstanceAdder(first_activity_instance, stored_instances).transform(config, df)
+    else:
+        df = ActivityInstanceAdder().transform(config, df)
+    df = Sorter().transform(config, df)
+    
+    registry.add_rows(len(df.index))
+    event_log_storage.append_dataframe(df)
+    return event_log_storage
+
+def stream_event_log(config_file, follow=False, poll_interval=1.0):
+    """
+    Read the events of a .csv file in atomic format one at a time (e.g. for the PatternMonitor), the rows are adapted like in adapt_event_log() as soon as they are written to the file. 
+    The events need to be written in the order of their timestamps and the activity instances are not added (the monitor finds the operations by the group attributes)
+    
+    Parameters
+    -----------
+    config_file
+        the path to a JSON configuration file
+        
+    follow : bool, optional
+        if True, the file is tailed, i.e. when the end of the file is reached, new rows are waited for (the generator never ends), by default False
+        
+    poll_interval : float, optional
+        the number of seconds that are waited before the file is read again when following the file, by default 1.0
+    
+    Yields
+    -----------
+    Dict
+        the attributes of every event
+    """
+    with open(config_file) as json_config_file:
+        config = json.load(json_config_file)  
+        validate_config(f"{pathlib.Path(__file__).parent}/config_format.schema.json", config)
+    if not config["path"].endswith(".csv") or config["event_log_format"] != "atomic":
+        raise ValueError("the imported file has the wrong format (only .csv files in atomic format can be streamed)!")
+    
+    number_rows = 0
+    with open(config["path"]) as f:
+        header = f.readline()
+        pending = ""
+        while True:
+            pending = pending + f.read()
+            lines, _, pending = pending.rpartition("\n")    #an incomplete last line is kept until it is completed
+            if not follow and len(pending) > 0:
+                lines, pending = f"{lines}\n{pending}", ""
+            if len(lines.strip()) > 0:
+                df = pd.read_csv(io.StringIO(header + lines), sep=config["separator"])
+                df = TimestampModifier().transform(config, df)
+                for adapter in [RowIDAdder(number_rows), ColumnRenamer(), TimestampRenamer()]:
+                    df = adapter.transform(config, df)
+                number_rows = number_rows + len(df.index)
+                yield from df.to_dict("records")
+            elif not follow:
+                return
+            else:
+                time.sleep(poll_interval)
+
+def adapt_event_log(config):
+    """
+    Import the event log from the file and transform it with all adapters into an atomic event log
+    
+    Parameters
+    -----------
+    config
+        the parsed JSON configuration file
+    
+    Returns
+    -----------
+    dataframe
+        the adapted event log
+    """
     #specific input format to dataframe    
     if config["path"].endswith(".csv"):
         raw_df = import_csv_file(config)
@@ -47,15 +187,16 @@ def import_event_log(config_file, storage_type=StorageType.COLUMN_BASED_AT_ONCE)
     
         
     #transform all event log formats to interval log
-    adapters = [RowIDAdder(), ColumnRenamer(), TimestampRenamer(), IntervalToEventLogTransformer(), ActivityInstanceAdder(), Sorter()]
     df = raw_df
-    for adapter in adapters:
+    for adapter in adapter_chain():
         df = adapter.transform(config, df)
-    dataframe = df
-    
-    event_log_storage = EventLogStorage(config, storage_type)
-    event_log_storage.add_new_dataframe(dataframe)
-    return event_log_storage
+    return df
+
+def adapter_chain():
+    """
+    returns the adapters that transform a raw log (with parsed timestamps) into the adapted atomic event log, in the order in which they are applied by adapt_event_log()
+    """
+    return [RowIDAdder(), ColumnRenamer(), TimestampRenamer(), IntervalToEventLogTransformer(), ActivityInstanceAdder(), Sorter(), CategoricalEncoder()]
 
 @log_time(logger, "extracting dataframe from xes file")
 def import_xes_file(config):
@@ -72,6 +213,8 @@ def import_xes_file(config):
     raw_dataframe
         the pandas dataframe without any modification
     """
+    from pm4py.objects.log.importer.xes import importer as xes_importer     #pm4py is only imported when it is used, because the import takes seconds
+    from pm4py.objects.conversion.log import converter as log_converter
     event_log = xes_importer.apply(config["path"])
     raw_df = log_converter.apply(event_log, variant=log_converter.Variants.TO_DATA_FRAME)
 
@@ -95,4 +238,47 @@ def import_csv_file(config):
     df = pd.read_csv(config["path"], sep=config["separator"])
     df = TimestampModifier().transform(config, df)
 
-    return df 
\ No newline at end of file
+    return df
+
+@log_time(logger, "chunked import of csv file")
+def import_csv_file_in_chunks(config, storage_type, chunk_size):
+    """
+    Import the event log from a csv file chunk by chunk: all row-local adapters are applied on each chunk and the chunk is then appended to the database,
+    the adapters that need the whole log (ActivityInstanceAdder, Sorter and CategoricalEncoder) are applied inside the database afterwards
+    
+    Parameters
+    -----------
+    config
+        the parsed JSON configuration file
+        
+    storage_type: StorageType
+        the storage type of the database where we want to import the log
+        
+    chunk_size: int
+        the number of rows that are read and adapted at once
+    
+    Returns
+    -----------
+    log
+        EventLogStorage object
+    """
+    event_log_storage = EventLogStorage(config, storage_type)
+    
+    number_rows = 0
+    for chunk in pd.read_csv(config["path"], sep=config["separator"], chunksize=chunk_size):
+        chunk = TimestampModifier().transform(config, chunk)
+        
+        adapters = [RowIDAdder(number_rows), ColumnRenamer(), TimestampRenamer(), IntervalToEventLogTransformer(number_rows)]
+        number_rows = number_rows + len(chunk.index)
+        for adapter in adapters:
+            chunk = adapter.transform(config, chunk)
+        
+        # activity instances that are given in the log only need to be renamed, otherwise they are computed in the database
+        if "Activity_Instance" in chunk.columns or ("activity_instance_column" in config and config["activity_instance_column"] != None):
+            chunk = ActivityInstanceAdder().transform(config, chunk)
+            
+        event_log_storage.add_dataframe_chunk(chunk)
+    
+    event_log_storage.finish_chunked_import()
+    registry.add_rows(number_rows)
+    return event_log_storage
@@ -0,0 +1,82 @@
+"""
+This module contains the on-disk cache of adapted event logs. The adapted event log (and the interval log) of an import are stored as Parquet files, which are identified by a fingerprint of the imported file and the configuration, so that an unchanged log does not need to be parsed and adapted again.
+"""
+import hashlib
+import json
+import os
+from event_log_analyzer.adapter import CategoricalEncoder
+from event_log_analyzer.utils import log_time, logger
+
+CACHE_FORMAT_VERSION = 1        #has to be increased whenever the adapters change the format of the adapted logs, so that old cache files are not used anymore
+BLOCK_SIZE = 2**20              #number of bytes of the imported file that are read at once to compute the fingerprint
+
+def fingerprint(config):
+    """
+    computes the fingerprint of an import from the configuration and the content of the imported file (the whole file is hashed block by block, so that every change of the content is detected, also if the size and the modification time are kept)
+
+    Parameters
+    ----------
+    config : json
+        the parsed configuration file
+
+    Returns
+    -------
+    str
+        the fingerprint as a hexadecimal string
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([CACHE_FORMAT_VERSION, config], sort_keys=True).encode())
+    with open(config["path"], "rb") as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class LogCache:
+    """
+    A LogCache stores adapted logs as Parquet files in a cache directory, the files are written and read with DuckDB.
+
+    Attributes
+    -----------
+    cache_dir : str
+        the directory in which the Parquet files are stored
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, key, kind):
+        """
+        returns the path of the Parquet file of the given fingerprint and kind of log ('event_log' or 'interval_log')
+        """
+        return os.path.join(self.cache_dir, f"{key}.{kind}.parquet")
+
+    @log_time(logger, "load log from cache")
+    def load(self, key, kind):
+        """
+        loads a log from the cache
+
+        Returns
+        -------
+        pandas.DataFrame
+            the cached log or None if it has not been cached yet
+        """
+        path = self.path(key, kind)
+        if not os.path.exists(path):
+            return None
+        logger.info(f"use cached {kind} {path}")
+        import duckdb
+        df = duckdb.connect().execute("SELECT * FROM read_parquet(?)", [path]).fetchdf()
+        return CategoricalEncoder().transform(None, df)      #the categorical attributes are stored as strings in the Parquet files
+
+    @log_time(logger, "store log in cache")
+    def store(self, key, kind, df):
+        """
+        stores a log in the cache, the file is written under a temporary name and then renamed, so that no incomplete files can be read
+        """
+        path = self.path(key, kind)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        import duckdb
+        con = duckdb.connect()
+        con.register("cached_log", df)
+        con.execute(f"""COPY cached_log TO '{temporary_path.replace("'", "''")}' (FORMAT PARQUET)""")
+        os.replace(temporary_path, path)
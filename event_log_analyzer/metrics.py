@@ -0,0 +1,273 @@
+"""
+This module contains the metrics registry, which records the time, the number of calls, the peak memory and the processed rows of the steps of the analysis (e.g. import -> adapter, pattern -> condition) as a hierarchy of spans.
+The spans are opened by the methods that are decorated with utils.log_time(), the registry is disabled by default and then costs only a flag check per decorated call.
+
+Usage:
+    from event_log_analyzer.metrics import registry
+    registry.enable(memory=True)
+    ...
+    registry.save_json("output/metrics.json")
+    registry.save_chrome_trace("output/trace.json")     #can be opened in chrome://tracing or https://ui.perfetto.dev
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+MAX_TRACE_EVENTS = 1000000  #at most this number of spans is kept for the chrome trace (the aggregated metrics contain all spans)
+
+def rows_of(value):
+    """
+    returns the number of rows of a dataframe (or of any other object with a shape), otherwise None
+    """
+    shape = getattr(value, "shape", None)
+    if isinstance(shape, tuple) and len(shape) > 0:
+        return shape[0]
+    return None
+
+class Span:
+    """
+    A Span is a step of the analysis that is currently running, it is closed when the step is finished and then added to the metrics of its path.
+
+    Attributes
+    -----------
+    name : str
+        the name of the step (the text of utils.log_time())
+
+    path : Tuple[str]
+        the names of all enclosing spans and of the span itself
+
+    category : str
+        the category of the step in the chrome trace (e.g. the module of the decorated function)
+
+    args : Dict
+        further information that is written into the chrome trace (e.g. the decorated function)
+
+    rows : int
+        the number of rows processed in the span (None if unknown)
+    """
+    def __init__(self, name, path, category, args, memory):
+        self.name = name
+        self.path = path
+        self.category = category
+        self.args = args
+        self.rows = None
+        self.start = time.perf_counter()
+        self.start_memory = tracemalloc.get_traced_memory()[0] if memory else None
+        self.peak_memory = self.start_memory
+
+    def add_rows(self, rows):
+        """
+        adds processed rows to the span
+        """
+        if rows is not None:
+            self.rows = rows if self.rows is None else self.rows + rows
+
+class MetricsRegistry:
+    """
+    The MetricsRegistry collects the spans of all threads. Spans that are opened while another span of the same thread is running are its children,
+    spans of worker threads are children of the span in which the work was submitted if the submitted function is wrapped with propagate().
+
+    Attributes
+    -----------
+    enabled : bool
+        True if spans are recorded
+
+    memory : bool
+        True if the peak memory of the spans is traced with tracemalloc (which slows down the analysis considerably),
+        the peak memory is traced for the whole process, so it also contains the memory of spans that run at the same time in other threads
+
+    metrics : Dict[Tuple[str], Dict]
+        the aggregated metrics (calls, seconds, min, max, peak memory, rows) per path of spans
+
+    trace_events : List[Dict]
+        a complete event of the chrome trace-event format for every closed span
+    """
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self._started_tracemalloc = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, memory=False):
+        """
+        starts recording spans, if memory is True the peak memory of every span is traced as well
+        """
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.memory = memory
+        self.enabled = True
+
+    def disable(self):
+        """
+        stops recording spans (the recorded metrics are kept until reset() is called)
+        """
+        self.enabled = False
+        self.memory = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self):
+        """
+        deletes all recorded metrics
+        """
+        with self._lock:
+            self.metrics = {}
+            self.trace_events = []
+            self._traced_spans = set()
+            self._epoch = time.perf_counter()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name, category="analysis", **args):
+        """
+        records the time (and the peak memory) of the enclosed code as a child of the currently running span of the thread
+
+        Parameters
+        ----------
+        name : str
+            the name of the span
+        category : str, optional
+            the category of the span in the chrome trace, by default "analysis"
+        **args
+            further information that is written into the chrome trace
+
+        Yields
+        ------
+        Span
+            the running span (to add processed rows), None if the registry is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+        stack = self._stack()
+        parent_path = stack[-1].path if stack else ()
+        memory = self.memory and tracemalloc.is_tracing()
+        if memory:
+            self._fold_peak()
+        span = Span(name, parent_path + (name,), category, args, memory)
+        if memory:
+            with self._lock:
+                self._traced_spans.add(span)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            self._close(span)
+
+    def add_rows(self, rows):
+        """
+        adds processed rows to the currently running span of the thread (nothing happens if the registry is disabled)
+        """
+        if self.enabled:
+            stack = self._stack()
+            if stack:
+                stack[-1].add_rows(rows)
+
+    def propagate(self, func):
+        """
+        returns a function that runs func with the currently running span as parent span, e.g. to submit it to a thread pool (func itself if the registry is disabled)
+        """
+        if not self.enabled:
+            return func
+        stack = self._stack()
+        if not stack:
+            return func
+        parent = stack[-1]
+        def run_in_span(*args, **kwargs):
+            own_stack = self._stack()
+            own_stack.append(Span(parent.name, parent.path, parent.category, {}, False))   #placeholder of the parent, it is not recorded
+            try:
+                return func(*args, **kwargs)
+            finally:
+                own_stack.pop()
+        return run_in_span
+
+    def _fold_peak(self):
+        """
+        adds the peak memory since the last reset of the peak to all running spans (of all threads) and resets the peak, so that a span that is opened later only measures the peak during its own lifetime
+        """
+        with self._lock:
+            peak = tracemalloc.get_traced_memory()[1]
+            for span in self._traced_spans:
+                if peak > span.peak_memory:
+                    span.peak_memory = peak
+            tracemalloc.reset_peak()
+
+    def _close(self, span):
+        end = time.perf_counter()
+        seconds = end - span.start
+        peak_memory = None
+        if span.start_memory is not None and tracemalloc.is_tracing():
+            self._fold_peak()
+            peak_memory = span.peak_memory - span.start_memory
+
+        with self._lock:
+            self._traced_spans.discard(span)
+            metric = self.metrics.get(span.path)
+            if metric is None:
+                metric = self.metrics[span.path] = {"calls": 0, "seconds": 0.0, "min": seconds, "max": seconds, "peak_memory": None, "rows": None}
+            metric["calls"] += 1
+            metric["seconds"] += seconds
+            metric["min"] = min(metric["min"], seconds)
+            metric["max"] = max(metric["max"], seconds)
+            if peak_memory is not None:
+                metric["peak_memory"] = max(metric["peak_memory"] or 0, peak_memory)
+            if span.rows is not None:
+                metric["rows"] = (metric["rows"] or 0) + span.rows
+
+            if len(self.trace_events) < MAX_TRACE_EVENTS:
+                args = dict(span.args)
+                if span.rows is not None:
+                    args["rows"] = span.rows
+                if peak_memory is not None:
+                    args["peak_memory"] = peak_memory
+                self.trace_events.append({"name": span.name, "cat": span.category, "ph": "X", "ts": (span.start - self._epoch) * 1e6, "dur": seconds * 1e6,
+                                          "pid": os.getpid(), "tid": threading.get_ident(), "args": args})
+
+    def to_dict(self):
+        """
+        returns the aggregated metrics as a tree of spans, every span has a name, the number of calls, the total, minimum and maximum seconds, the peak memory in bytes,
+        the number of processed rows and rows per second (None if unknown) and its child spans
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+        nodes = {}
+        roots = []
+        for path in sorted(metrics, key=len):
+            metric = metrics[path]
+            node = {"name": path[-1], **metric, "rows_per_second": metric["rows"] / metric["seconds"] if metric["rows"] is not None and metric["seconds"] > 0 else None, "children": []}
+            nodes[path] = node
+            parent = nodes.get(path[:-1])
+            (parent["children"] if parent is not None else roots).append(node)
+        return {"spans": roots}
+
+    def save_json(self, file):
+        """
+        saves the aggregated metrics (see to_dict()) as a json file
+        """
+        with open(file, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    def save_chrome_trace(self, file):
+        """
+        saves the recorded spans in the chrome trace-event format
+        """
+        with self._lock:
+            events = list(self.trace_events)
+        with open(file, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+registry = MetricsRegistry()
@@ -1,13 +1,29 @@
 """
 This module contains all patterns, that have the Manufacturing Scheduling Pattern as a prerequisite 
 """
-import pandas as pd
 import numpy as np
+from pandas.api.extensions import take
 from event_log_analyzer.utils import logger, log_time, pattern_logger
 from event_log_analyzer.pattern_library.pattern import Pattern
+from event_log_analyzer.pattern_library.sequence_checks import find_divergent_sequences, find_overlapping_operations, find_simultaneous_operations, find_waiting_operations, summarize_sequences, waiting_time_statistics
 
 CHECK_ON_INTERVAL = True    #for test reasons we can specify whether the pattern conditions should be checked on an atomic or an interval log
-  
+REPORT_WAITING_TIMES = False    #if True, the No Wait Pattern additionally logs the number of breaks and the waiting times of every job that waits
+
+def violating_sequences(sequence_summary, counts):
+    """
+    returns the key and the count of every sequence of a summary (see sequence_summaries) whose count is positive, for example the jobs with overlapping operations
+    """
+    return [(sequence_summary.keys.values[i], counts[i]) for i in np.flatnonzero(counts > 0)]
+
+def deviating_sequences(summary):
+    """
+    returns a boolean array that is True for every sequence of a summary (with the columns 'Length' and 'Fingerprint') that differs from the first sequence
+    """
+    if len(summary) == 0:
+        return np.zeros(0, dtype=bool)
+    return ((summary["Fingerprint"] != summary["Fingerprint"].iat[0]) | (summary["Length"] != summary["Length"].iat[0])).to_numpy()
+
 
 class ManufacturingScheduling(Pattern):
     """
@@ -35,14 +51,14 @@ class ManufacturingScheduling(Pattern):
         self.check_dependencies()
 
         if self.applies is None:
-            df = event_log.get_event_log()
-            if 'Job' not in df.columns:
+            columns = event_log.get_columns()
+            if 'Job' not in columns:
                 pattern_logger.info("\t>>>\tManufacturing Scheduling does not hold!!! (no Job attribute existing)")
                 return False        
-            elif 'Machine' not in df.columns:
+            elif 'Machine' not in columns:
                 pattern_logger.info("\t>>>\tManufacturing Scheduling does not hold!!! (no Machine attribute existing)")
                 return False
-            if 'Transaction_Type' not in df.columns:
+            if 'Transaction_Type' not in columns:
                 pattern_logger.info("\t>>>\tManufacturing Scheduling does not hold!!! (no Transaction Type existing in atomic event log representation)")
                 return False
             
@@ -51,8 +67,19 @@ class ManufacturingScheduling(Pattern):
             return True   
         else:
             return self.applies
-
     
+    def summary_applies(self, summary):
+        """
+        the pattern applies if all needed attributes are available (the interval log is created by the summary)
+        """
+        if self.check_dependencies() is None:
+            for attr, message in [("Job", "no Job attribute existing"), ("Machine", "no Machine attribute existing"), ("Transaction_Type", "no Transaction Type existing in atomic event log representation")]:
+                if attr not in summary.columns:
+                    pattern_logger.info(f"\t>>>\tManufacturing Scheduling does not hold!!! ({message})")
+                    return False
+            return True
+        return self.applies
+
 class JobShop(Pattern):
     """
     In the Job Shop Pattern, each job needs to be processed on a subset of the machines in a predetermined order which might be different between the jobs.
@@ -60,6 +87,16 @@ class JobShop(Pattern):
     dependencies = {"requires":['Manufacturing_Scheduling_Pattern'], "forces":[]}
     name = "Job_Shop_Pattern"
     
+    @property
+    def conditions(self):
+        """
+        the conditions (a), (b) and (c) with their estimated costs, condition (a) only checks one column, (b) and (c) need to sort the log
+        """
+        if CHECK_ON_INTERVAL:                       #only for test reasons between checking the conditions on atomic or interval log
+            return {"cond_a": 1, "cond_b_interval": 4, "cond_c_interval": 4}
+        else:
+            return {"cond_a": 1, "cond_b": 8, "cond_c": 8}
+    
     @log_time(logger, "Job Shop Condition a)")
     def cond_a(self, event_log):
         """
@@ -67,7 +104,7 @@ class JobShop(Pattern):
         
         vectorization is used on the whole event log to check whether there exists an event without a machine
         """
-        dataframe = event_log.get_event_log()
+        dataframe = event_log.get_event_log(["Machine", "Job", "Row_ID"])
         series = dataframe["Machine"].isna()
         if series.any():
             pattern_logger.info("\t>>>\tJob Shop Condition a) does not hold!!!")
@@ -76,86 +113,70 @@ class JobShop(Pattern):
             return False
         return True
     
-    @log_time(logger, "Job Shop Condition b)")
+    @log_time(logger, "Job Shop Condition b) (atomic log)")
     def cond_b(self, event_log):
         """
         no two operations of the same job can be processed at the same time
         
-        the condition is checked on the atomic event log
-        """
-        for df in event_log.get_sequence("Job"):   
-            look_for_op = None         
-            for index, row in df.iterrows():
-                if look_for_op != None:
-                    if row['Transaction_Type']!="complete" or row["Activity_Instance"]!=look_for_op:
-                        pattern_logger.info(f"""\t>>>\tJob Shop Condition b) does not hold!!!""")
-                        pattern_logger.info(f"""\t\tRow ID {row["Row_ID"]}: Job "{row["Job"]}" runs two operations at the same time!""")
-                        return False
-                    else:
-                        look_for_op = None
-                if row["Transaction_Type"]=="start":
-                    look_for_op = row["Activity_Instance"]
-                
+        the condition is checked on the atomic event log, every start event of a job must be directly followed by its own complete event
+        """
+        violations = find_simultaneous_operations(event_log.get_event_log(["Job", "Timestamp", "Transaction_Type", "Activity_Instance", "Row_ID"]), "Job", event_log.get_sequence_index("Job", interval=False))
+        if len(violations) > 0:
+            pattern_logger.info(f"""\t>>>\tJob Shop Condition b) does not hold!!!""")
+            for violation in violations.itertuples(index=False):
+                pattern_logger.info(f"""\t\tRow ID {violation.Row_ID}: Job "{violation.Job}" runs two operations at the same time!""")
+            return False
         return True
     
-    @log_time(logger, "Job Shop Condition b)")
+    @log_time(logger, "Job Shop Condition b) (interval log)")
     def cond_b_interval(self, event_log):
         """
         no two operations of the same job can be processed at the same time
         
-        the condition is checked on the interval log
-        """
-        for df in event_log.get_interval_sequence("Job"):
-            number_rows = len(df)
-            for i in range(0,number_rows-1):
-                if df['Complete'].values[i] > df['Start'].values[i+1]:
-                    pattern_logger.info(f"\t>>>\tJob Shop Condition b) does not hold!!!") 
-                    pattern_logger.info(f"""\t\tRow ID {df["Row_ID"].values[i+1]}: Job "{df['Job'].values[i+1]}" runs two operations at the same time!""")
-                    return False
+        the condition is checked on the interval log, all overlapping operations are found at once by sorting the whole log by job and start timestamp
+        """
+        overlaps = find_overlapping_operations(event_log.get_interval_log(["Job", "Start", "Complete", "Row_ID"]), "Job", event_log.get_sequence_index("Job"))
+        if len(overlaps) > 0:
+            pattern_logger.info(f"\t>>>\tJob Shop Condition b) does not hold!!!") 
+            for overlap in overlaps.itertuples(index=False):
+                pattern_logger.info(f"""\t\tRow ID {overlap.Row_ID}: Job "{overlap.Job}" runs two operations at the same time! (overlaps with Row ID {overlap.Overlapping_Row_ID})""")
+            return False
         return True
      
-    @log_time(logger, "Job Shop Condition c)")
+    @log_time(logger, "Job Shop Condition c) (atomic log)")
     def cond_c(self, event_log):
         """
         No machine can process more than one operation at the same time
             
-        the condition is checked on the atomic event log
-        """
-        for df in event_log.get_sequence("Machine"): 
-            look_for_op = None         
-            for index, row in df.iterrows():
-                if look_for_op != None:
-                    if row['Transaction_Type']!="complete" or row["Activity_Instance"]!=look_for_op:
-                        pattern_logger.info(f"""\t>>>\tJob Shop Condition c) does not hold!!!""")
-                        pattern_logger.info(f"""\t\tRow ID {row["Row_ID"]}: Machine "{row["Machine"]}" processes two operations at the same time!""")
-                        return False
-                    else:
-                        look_for_op = None
-                if row["Transaction_Type"]=="start":
-                    look_for_op = row["Activity_Instance"]
-
+        the condition is checked on the atomic event log, every start event on a machine must be directly followed by its own complete event
+        """
+        violations = find_simultaneous_operations(event_log.get_event_log(["Machine", "Timestamp", "Transaction_Type", "Activity_Instance", "Row_ID"]), "Machine", event_log.get_sequence_index("Machine", interval=False))
+        if len(violations) > 0:
+            pattern_logger.info(f"""\t>>>\tJob Shop Condition c) does not hold!!!""")
+            for violation in violations.itertuples(index=False):
+                pattern_logger.info(f"""\t\tRow ID {violation.Row_ID}: Machine "{violation.Machine}" processes two operations at the same time!""")
+            return False
         return True
     
-    @log_time(logger, "Job Shop Condition c)")
+    @log_time(logger, "Job Shop Condition c) (interval log)")
     def cond_c_interval(self, event_log):
         """
         No machine can process more than one operation at the same time
             
-        the condition is checked on the interval log
-        """
-        for df in event_log.get_interval_sequence("Machine"):
-            number_rows = len(df)
-            for i in range(0,number_rows-1):
-                if df['Complete'].values[i] > df['Start'].values[i+1]:
-                    pattern_logger.info(f"\t>>>\tJob Shop Condition c) does not hold!!!")
-                    pattern_logger.info(f"""\t\tRow ID {df["Row_ID"].values[i+1]}: Machine "{df['Machine'].values[i+1]}" processes two operations at the same time!""")
-                    return False
+        the condition is checked on the interval log, all overlapping operations are found at once by sorting the whole log by machine and start timestamp
+        """
+        overlaps = find_overlapping_operations(event_log.get_interval_log(["Machine", "Start", "Complete", "Row_ID"]), "Machine", event_log.get_sequence_index("Machine"))
+        if len(overlaps) > 0:
+            pattern_logger.info(f"\t>>>\tJob Shop Condition c) does not hold!!!")
+            for overlap in overlaps.itertuples(index=False):
+                pattern_logger.info(f"""\t\tRow ID {overlap.Row_ID}: Machine "{overlap.Machine}" processes two operations at the same time! (overlaps with Row ID {overlap.Overlapping_Row_ID})""")
+            return False
         return True
     
     @log_time(logger, "Job Shop Pattern checking duration")
     def pattern_applies(self, event_log):
         """
-        the pattern applies if all three conditions (a), (b) and (c) apply
+        the pattern applies if all three conditions (a), (b) and (c) apply, they are checked in the order of their costs until the first condition does not hold (unless explain_all is set)
         
         Arguments
         -----------
@@ -170,19 +191,39 @@ class JobShop(Pattern):
         self.check_dependencies()
         
         if self.applies is None:            
-            a = self.cond_a(event_log)
-            if CHECK_ON_INTERVAL:                       #only for test reasons between checking the conditions on atomic or interval log
-                b = self.cond_b_interval(event_log)
-                c = self.cond_c_interval(event_log)     
-            else:                           
-                b = self.cond_b(event_log) 
-                c = self.cond_c(event_log)
-            
-            return a and b and c
+            return self.check_conditions(event_log)
         
         else:
             return self.applies
     
+    def summary_applies(self, summary):
+        """
+        the conditions are decided on the summary: (a) no event without machine, (b) and (c) no overlapping operations of a job or a machine (or no simultaneous events in the atomic event log, see CHECK_ON_INTERVAL)
+        """
+        if self.check_dependencies() is None:
+            if CHECK_ON_INTERVAL:
+                job_violations, machine_violations = summary.job_intervals.overlaps, summary.machine_intervals.overlaps
+            else:
+                job_violations, machine_violations = summary.job_events.violations, summary.machine_events.violations
+            
+            applies = True
+            if summary.events_without_machine > 0:
+                pattern_logger.info("\t>>>\tJob Shop Condition a) does not hold!!!")
+                pattern_logger.info(f"""\t\tRow ?: {summary.events_without_machine} event(s) have no machine assigned!""")
+                applies = False
+            if (applies or self.explain_all) and job_violations.any():
+                pattern_logger.info("\t>>>\tJob Shop Condition b) does not hold!!!")
+                for j, number in violating_sequences(summary.job_intervals if CHECK_ON_INTERVAL else summary.job_events, job_violations):
+                    pattern_logger.info(f"""\t\tRow ?: Job "{j}" runs two operations at the same time! ({number} time(s))""")
+                applies = False
+            if (applies or self.explain_all) and machine_violations.any():
+                pattern_logger.info("\t>>>\tJob Shop Condition c) does not hold!!!")
+                for m, number in violating_sequences(summary.machine_intervals if CHECK_ON_INTERVAL else summary.machine_events, machine_violations):
+                    pattern_logger.info(f"""\t\tRow ?: Machine "{m}" processes two operations at the same time! ({number} time(s))""")
+                applies = False
+            return applies
+        return self.applies
+
 class FlowShop(Pattern):
     """
     In the Flow Shop Pattern, each job needs to be processed on each of the machines in a predetermined order and the order is the same for all jobs.
@@ -190,58 +231,70 @@ class FlowShop(Pattern):
     dependencies = {"requires":['Job_Shop_Pattern'], "forces":[]}
     
     name = "Flow_Shop_Pattern"
+    conditions = {"cond_a": 1, "cond_b": 2, "cond_c": 1}    #all conditions are decided on the job summary, (b) additionally counts the machines
+    
+    @log_time(logger, "Flow Shop job summary")
+    def job_summary(self, event_log):
+        """
+        summarizes all jobs in one pass over the interval log: the number of operations, the number of distinct machines and the fingerprint of the machine route of every job
+        """
+        return summarize_sequences(event_log.get_interval_log(["Job", "Machine"]), "Job", "Machine", event_log.get_sequence_index("Job"))
     
     @log_time(logger, "Flow Shop Condition a)")
-    def cond_a(self, event_log):
+    def cond_a(self, event_log, summary=None):
         """
         every job can be processed on every machine at most once
         """
-        for df in event_log.get_interval_sequence("Job"):
-            if len(df['Machine']) != len(df['Machine'].unique()):
-                pattern_logger.info("\t>>>\tFlow Shop Condition a) does not hold!!!")
-                seen = set()
-                duplicates = [x for x in df['Machine'] if x in seen or seen.add(x)]
-                j = df["Job"][0]
-                pattern_logger.info(f"""\t\tRow ?: Job "{j}" is processed on machine(s) {duplicates} more than once!""")
-                return False
+        summary = self.job_summary(event_log) if summary is None else summary
+        violating_jobs = summary.index[summary["Length"] != summary["Distinct_Values"]]
+        if len(violating_jobs) > 0:
+            pattern_logger.info("\t>>>\tFlow Shop Condition a) does not hold!!!")
+            df = event_log.get_interval_log(["Job", "Machine"])
+            duplicates = df[df["Job"].isin(violating_jobs) & df.duplicated(["Job", "Machine"])].groupby("Job", sort=True, observed=True)["Machine"].unique()
+            for j, machines in duplicates.items():
+                pattern_logger.info(f"""\t\tRow ?: Job "{j}" is processed on machine(s) {list(machines)} more than once!""")
+            return False
         return True
             
     @log_time(logger, "Flow Shop Condition b)")
-    def cond_b(self, event_log):
+    def cond_b(self, event_log, summary=None):
         """
         every job consists of exactly as much operations as machines exist in total
         """
-        dataframe = event_log.get_event_log()
-        allMachines = dataframe["Machine"].unique()
+        summary = self.job_summary(event_log) if summary is None else summary
+        number_machines = len(event_log.get_interval_log(["Machine"])["Machine"].unique())
         
-        for df in event_log.get_interval_sequence("Job"):
-            if len(df) != len(allMachines):
-                pattern_logger.info("\t>>>\tFlow Shop Condition b) does not hold!!!")
-                j = df["Job"][0]
-                pattern_logger.info(f"""\t\tRow ?: Job "{j}" has {len(df)} operations but in total there exist {len(allMachines)} machines""")
-                return False
+        violating_jobs = summary[summary["Length"] != number_machines]
+        if len(violating_jobs) > 0:
+            pattern_logger.info("\t>>>\tFlow Shop Condition b) does not hold!!!")
+            for j, number_operations in violating_jobs["Length"].items():
+                pattern_logger.info(f"""\t\tRow ?: Job "{j}" has {number_operations} operations but in total there exist {number_machines} machines""")
+            return False
         return True
     
     @log_time(logger, "Flow Shop Condition c)")
-    def cond_c(self, event_log):
+    def cond_c(self, event_log, summary=None):
         """
-        the route of every job through the machines must be the same
+        the route of every job through the machines must be the same, the routes are compared by their fingerprints with the route of the first job
         """
-        df_first_job = next(event_log.get_interval_sequence("Job"))
-        machine_route = df_first_job['Machine'].values #machine route of first job
+        summary = self.job_summary(event_log) if summary is None else summary
+        if len(summary) == 0:
+            return True
         
-        for df in event_log.get_interval_sequence("Job"):  #now starting from second after one next() call
-            if not np.array_equal(machine_route, df['Machine'].values):
-                pattern_logger.info("\t>>>\tFlow Shop Condition c) does not hold!!!")
-                first_job = df_first_job["Job"][0]
-                pattern_logger.info(f"""\t\tRow ?: The routes of the operations of job "{first_job}" ({machine_route}) and job "{df['Job'][0]}" ({df['Machine'].values}) differ!""")
-                return False
+        deviating_jobs = np.flatnonzero(deviating_sequences(summary))
+        if len(deviating_jobs) > 0:
+            pattern_logger.info("\t>>>\tFlow Shop Condition c) does not hold!!!")
+            index = event_log.get_sequence_index("Job")
+            routes, machines = index.take_codes(event_log.get_interval_log(["Machine"])["Machine"])
+            for j in deviating_jobs:
+                pattern_logger.info(f"""\t\tRow ?: The routes of the operations of job "{index.keys[0]}" ({take(machines, index.sequence(routes, 0), allow_fill=True)}) and job "{index.keys[j]}" ({take(machines, index.sequence(routes, j), allow_fill=True)}) differ!""")
+            return False
         return True
     
     @log_time(logger, "Flow Shop Pattern checking duration")
     def pattern_applies(self, event_log):
         """
-        the pattern applies if all three conditions (a), (b) and (c) apply
+        the pattern applies if all three conditions (a), (b) and (c) apply, all conditions are decided on one summary of the jobs and they are checked in the order of their costs until the first condition does not hold (unless explain_all is set)
         
         Arguments
         -----------
@@ -255,15 +308,39 @@ class FlowShop(Pattern):
         """   
         self.check_dependencies()
         
-        if self.applies is None:            
-            a = self.cond_a(event_log)
-            b = self.cond_b(event_log)           
-            c = self.cond_c(event_log)
-            
-            return a and b and c
+        if self.applies is None:
+            return self.check_conditions(event_log, self.job_summary(event_log))
         else:
             return self.applies
     
+    def summary_applies(self, summary):
+        """
+        the conditions (a), (b) and (c) are decided on the summary of the job routes (the number of operations, the number of distinct machines and the fingerprint of every route)
+        """
+        if self.check_dependencies() is None:
+            jobs = summary.job_intervals.summary()
+            applies = True
+            violating_jobs = jobs.index[jobs["Length"] != jobs["Distinct_Values"]]
+            if len(violating_jobs) > 0:
+                pattern_logger.info("\t>>>\tFlow Shop Condition a) does not hold!!!")
+                for j in violating_jobs:
+                    pattern_logger.info(f"""\t\tRow ?: Job "{j}" is processed on a machine more than once!""")
+                applies = False
+            violating_jobs = jobs[jobs["Length"] != summary.number_machines]
+            if (applies or self.explain_all) and len(violating_jobs) > 0:
+                pattern_logger.info("\t>>>\tFlow Shop Condition b) does not hold!!!")
+                for j, number_operations in violating_jobs["Length"].items():
+                    pattern_logger.info(f"""\t\tRow ?: Job "{j}" has {number_operations} operations but in total there exist {summary.number_machines} machines""")
+                applies = False
+            deviating_jobs = jobs.index[deviating_sequences(jobs)]
+            if (applies or self.explain_all) and len(deviating_jobs) > 0:
+                pattern_logger.info("\t>>>\tFlow Shop Condition c) does not hold!!!")
+                for j in deviating_jobs:
+                    pattern_logger.info(f"""\t\tRow ?: The routes of the operations of job "{jobs.index[0]}" and job "{j}" differ!""")
+                applies = False
+            return applies
+        return self.applies
+
 class Permutation(Pattern):
     """
     In the Permutation Pattern, when processing a number of jobs on machines under the Flow Shop Pattern no job is allowed to overtake another job, so the order in which jobs are processed on a machine is the same for all machines.
@@ -288,19 +365,38 @@ class Permutation(Pattern):
         """
         self.check_dependencies()
         if self.applies is None:
-            df_first_machine = next(event_log.get_interval_sequence("Machine"))
-            job_route = df_first_machine['Job'].values
+            df = event_log.get_interval_log(["Machine", "Job"])
+            index = event_log.get_sequence_index("Machine")
+            summary = summarize_sequences(df, "Machine", "Job", index)
+            if len(summary) == 0:
+                return True
             
-            for df in event_log.get_interval_sequence("Machine"):  #now starting from second after one next() call
-                if not np.array_equal(job_route, df['Job'].values):
-                    pattern_logger.info("\t>>>\tPermutation Pattern does not hold!!!")
-                    first_machine = df_first_machine["Machine"][0]
-                    pattern_logger.info(f"""\t\tRow ?: On Machine "{df['Machine'][0]}" the jobs are processed in a different order({df['Job'].values}) than on machine "{first_machine}" ({job_route})!""")
-                    return False
+            if deviating_sequences(summary).any():
+                pattern_logger.info("\t>>>\tPermutation Pattern does not hold!!!")
+                divergent_machines = find_divergent_sequences(df, "Machine", "Job", index)
+                first_machine, job_route = divergent_machines["Machine"].iat[0], divergent_machines["Values"].iat[0]
+                for m, position, jobs in divergent_machines.iloc[1:].itertuples(index=False):
+                    pattern_logger.info(f"""\t\tRow ?: On Machine "{m}" the jobs are processed in a different order({jobs}) than on machine "{first_machine}" ({job_route}), the orders differ first at position {position}!""")
+                return False
             return True
         else:
             return self.applies
     
+    def summary_applies(self, summary):
+        """
+        all machines process the jobs in the same order, the orders are compared by the fingerprints in the summary of the machines
+        """
+        if self.check_dependencies() is None:
+            machines = summary.machine_intervals.summary()
+            deviating_machines = machines.index[deviating_sequences(machines)]
+            if len(deviating_machines) > 0:
+                pattern_logger.info("\t>>>\tPermutation Pattern does not hold!!!")
+                for m in deviating_machines:
+                    pattern_logger.info(f"""\t\tRow ?: On Machine "{m}" the jobs are processed in a different order than on machine "{machines.index[0]}"!""")
+                return False
+            return True
+        return self.applies
+
 class NoWait(Pattern):
     """
     In the No Wait Pattern, when a number of jobs are to be processed on a set of machines, jobs are not allowed to wait between operations.
@@ -325,16 +421,34 @@ class NoWait(Pattern):
         """
         self.check_dependencies()
         if self.applies is None:                      
-            for df in event_log.get_interval_sequence("Job"):
-                for i in range(1,len(df)):
-                    if df['Complete'].values[i-1] != df['Start'].values[i]:
-                        pattern_logger.info(f"\t>>>\t{self.name} does not hold!!!")
-                        pattern_logger.info(f"""\t\tRow {df['Row_ID'].values[i-1]}: Job "{df['Job'].values[i]}" has a break between machine "{df['Machine'].values[i-1]}" and machine "{df['Machine'].values[i]}" """)
-                        return False                    
+            df = event_log.get_interval_log(["Job", "Machine", "Start", "Complete", "Row_ID"])
+            waiting_operations = find_waiting_operations(df, "Job", event_log.get_sequence_index("Job"))
+            if len(waiting_operations) > 0:
+                pattern_logger.info(f"\t>>>\t{self.name} does not hold!!!")
+                machines = df.set_index("Row_ID")["Machine"]
+                for j, row_id, next_row_id in waiting_operations[["Job", "Row_ID", "Next_Row_ID"]].itertuples(index=False):
+                    pattern_logger.info(f"""\t\tRow {row_id}: Job "{j}" has a break between machine "{machines[row_id]}" and machine "{machines[next_row_id]}" """)
+                if REPORT_WAITING_TIMES:
+                    for j, breaks, total, maximum in waiting_time_statistics(waiting_operations, "Job").itertuples():
+                        pattern_logger.info(f"""\t\tJob "{j}" waits {breaks} time(s), in total {total} (at most {maximum})""")
+                return False                    
             return True
         else:
             return self.applies
     
+    def summary_applies(self, summary):
+        """
+        jobs are not allowed to wait between operations, the breaks of every job are counted in the summary
+        """
+        if self.check_dependencies() is None:
+            if summary.job_intervals.breaks.any():
+                pattern_logger.info(f"\t>>>\t{self.name} does not hold!!!")
+                for j, breaks in violating_sequences(summary.job_intervals, summary.job_intervals.breaks):
+                    pattern_logger.info(f"""\t\tRow ?: Job "{j}" has {breaks} break(s) between its operations""")
+                return False
+            return True
+        return self.applies
+
 class OneBlocking(Pattern):
     """
     In the 1-Blocking Pattern, when processing a number of jobs on machines under the Flow Shop pattern, there must at any time be at most one job queuing in front of a machine, so the buffer between any two machines has capacity 1.
@@ -393,13 +507,12 @@ class DistinguishableResource(Pattern):
         """
         self.check_dependencies()
         if self.applies is None:
-            df = event_log.get_event_log()
-            
-            if 'Resource' not in df.columns:
+            if 'Resource' not in event_log.get_columns():
                 pattern_logger.info("\t>>>\tDistinguishable Resource does not hold!!!")
                 pattern_logger.info(f"""\t\tRow ?: No resource column is specified!""")
                 return False
             
+            df = event_log.get_event_log(["Resource", "Job", "Machine", "Row_ID"])
             series = df["Resource"].isna()
             if series.any():
                 pattern_logger.info("\t>>>\tDistinguishable Resource does not hold!!!")
@@ -407,21 +520,37 @@ class DistinguishableResource(Pattern):
                     pattern_logger.info(f"""\t\tRow {row["Row_ID"]}: No resource is assigned to job "{row["Job"]}" at machine "{row["Machine"]}"!""")
                 return False
             
-            for df in event_log.get_sequence("Resource"): 
-                look_for_op = None         
-                for index, row in df.iterrows():
-                    if look_for_op != None:
-                        if row['Transaction_Type']!="complete" or row["Activity_Instance"]!=look_for_op:
-                            pattern_logger.info(f"""\t>>>\tRow {row["Row_ID"]}: Resource "{row["Resource"]}" processes two operations at the same time!!!""")
-                            return False
-                        else:
-                            look_for_op = None
-                    if row["Transaction_Type"]=="start":
-                       look_for_op = row["Activity_Instance"]
+            violations = find_simultaneous_operations(event_log.get_event_log(["Resource", "Timestamp", "Transaction_Type", "Activity_Instance", "Row_ID"]), "Resource", event_log.get_sequence_index("Resource", interval=False))
+            if len(violations) > 0:
+                pattern_logger.info("\t>>>\tDistinguishable Resource does not hold!!!")
+                for violation in violations.itertuples(index=False):
+                    pattern_logger.info(f"""\t\tRow {violation.Row_ID}: Resource "{violation.Resource}" processes two operations at the same time!""")
+                return False
             return True
         else:
             return self.applies
     
+    def summary_applies(self, summary):
+        """
+        one resource must be present at every event and no resource processes two operations at the same time (decided on the summary of the resources)
+        """
+        if self.check_dependencies() is None:
+            if 'Resource' not in summary.columns:
+                pattern_logger.info("\t>>>\tDistinguishable Resource does not hold!!!")
+                pattern_logger.info(f"""\t\tRow ?: No resource column is specified!""")
+                return False
+            if summary.events_without_resource > 0:
+                pattern_logger.info("\t>>>\tDistinguishable Resource does not hold!!!")
+                pattern_logger.info(f"""\t\tRow ?: {summary.events_without_resource} event(s) have no resource assigned!""")
+                return False
+            if summary.resource_events.violations.any():
+                pattern_logger.info("\t>>>\tDistinguishable Resource does not hold!!!")
+                for r, number in violating_sequences(summary.resource_events, summary.resource_events.violations):
+                    pattern_logger.info(f"""\t\tRow ?: Resource "{r}" processes two operations at the same time! ({number} time(s))""")
+                return False
+            return True
+        return self.applies
+
 class IndistinguishableResource(Pattern):  
     """
     In the Indistinguishable Resource Pattern, when processing a number of operations, exactly one resource from a set of indistinguishable resources needs to be present for each operation.
@@ -448,22 +577,17 @@ class IndistinguishableResource(Pattern):
         """
         self.check_dependencies()
         if self.applies is None:
-            first_df = next(event_log.get_interval_sequence("Job"))
-            if 'Resource' not in first_df.columns:
+            if 'Resource' not in event_log.get_columns():
                 pattern_logger.info("\t>>>\tIndistinguishable Resource does not hold!!!")
                 pattern_logger.info(f"""\t\tRow ?: No resource column is specified!""")
                 return False
             
-            ressources = []
-            for df in event_log.get_interval_sequence("Job"):
-                for res in df["Resource"]:
-                    if pd.isna(res):
-                        pattern_logger.info("\t>>>\tIndistinguishable Resource does not hold!!!")
-                        pattern_logger.info(f"""\t\tRow ?: Not all jobs are assigned to a resource!""")
-                        return False
-                    ressources.append(res)
-            all_same = all(element == ressources[0] for element in ressources)
-            if not all_same:
+            resources = event_log.get_interval_log(["Job", "Resource"]).dropna(subset=["Job"])["Resource"]
+            if resources.isna().any():
+                pattern_logger.info("\t>>>\tIndistinguishable Resource does not hold!!!")
+                pattern_logger.info(f"""\t\tRow ?: Not all jobs are assigned to a resource!""")
+                return False
+            if resources.nunique() > 1:
                 pattern_logger.info("\t>>>\tIndistinguishable Resource does not hold!!!")
                 pattern_logger.info(f"""\t\tRow ?: The resources are not indistinguishable (they differ)!""")
                 return False
@@ -471,6 +595,26 @@ class IndistinguishableResource(Pattern):
         else:
             return self.applies
     
+    def summary_applies(self, summary):
+        """
+        for each operation there must be exactly one resource and all resources are the same (decided on the resources in the summary)
+        """
+        if self.check_dependencies() is None:
+            if 'Resource' not in summary.columns:
+                pattern_logger.info("\t>>>\tIndistinguishable Resource does not hold!!!")
+                pattern_logger.info(f"""\t\tRow ?: No resource column is specified!""")
+                return False
+            if summary.jobs_without_resource > 0:
+                pattern_logger.info("\t>>>\tIndistinguishable Resource does not hold!!!")
+                pattern_logger.info(f"""\t\tRow ?: Not all jobs are assigned to a resource!""")
+                return False
+            if len(summary.resources) > 1:
+                pattern_logger.info("\t>>>\tIndistinguishable Resource does not hold!!!")
+                pattern_logger.info(f"""\t\tRow ?: The resources are not indistinguishable (they differ)!""")
+                return False
+            return True
+        return self.applies
+
 class ResourceSetupTimes(Pattern):
     """
     In the Resource Setup Times Pattern, a number of operations are to be processed by some distinguishable resources (Distinguishable Resources Pattern needs to apply) and each resource needs a certain amount of time between two operations, where the time depends on the type of the two tasks.
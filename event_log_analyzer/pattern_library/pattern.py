@@ -1,9 +1,123 @@
 """
 This module implements contains the abstract pattern class that must be extended by any pattern.
 """
+import json
+import os
+import threading
+import time
 from abc import ABC, abstractmethod
 from event_log_analyzer.utils import pattern_logger
 
+CONDITION_COSTS_FILE = 'condition_costs.json'   #file in the output folder in which the measured costs of the conditions are stored
+COST_SMOOTHING = 0.5    #weight of the newest measurement in the moving average of the costs of a condition
+
+class ConditionCosts:
+    """
+    The ConditionCosts store the measured evaluation time of every condition of every pattern (as a moving average), so that the conditions can be checked in the order of their costs. The costs are loaded from and saved to a json file.
+    The measuring is disabled by default, then the conditions are checked in the order of their estimated costs, so that the checking (and the violation that is logged first) does not depend on earlier runs and no file is written.
+    
+    Attributes
+    -----------
+    enabled : bool
+        True if the costs are measured, loaded and saved (see enable())
+        
+    file : str
+        the path of the json file, if no path is given the file condition_costs.json in the output folder of the current working directory at the time the costs are loaded or saved
+        
+    costs : Dict[str, Dict[str, float]]
+        the measured costs in seconds per pattern name and condition name
+    """
+    def __init__(self, file=None):
+        self._file = file
+        self.enabled = False
+        self.costs = None
+        self._lock = threading.Lock()
+        
+    def enable(self, file=None):
+        """
+        starts measuring the costs, the measured costs of earlier runs are loaded from the file (by default the file given to the constructor) when they are accessed for the first time
+        """
+        with self._lock:
+            if file is not None:
+                self._file = file
+            self.costs = None
+            self.enabled = True
+        
+    def disable(self):
+        """
+        stops measuring the costs, the conditions are checked in the order of their estimated costs again
+        """
+        with self._lock:
+            self.enabled = False
+            self.costs = None
+        
+    @property
+    def file(self):
+        if self._file is None:
+            return f'{os.getcwd()}/output/{CONDITION_COSTS_FILE}'
+        return self._file
+        
+    def _load(self):
+        """
+        loads the costs from the file when they are accessed for the first time
+        """
+        if self.costs is None:
+            try:
+                with open(self.file) as f:
+                    self.costs = json.load(f)
+            except (OSError, ValueError):
+                self.costs = {}
+        
+    def order(self, pattern_name, estimated_costs):
+        """
+        sorts the conditions of a pattern by their costs, conditions that have not been measured yet are estimated by their estimated costs scaled like the already measured conditions of the pattern
+        
+        Parameters
+        ----------
+        pattern_name : str
+            the name of the pattern
+        estimated_costs : Dict[str, float]
+            the relative estimated cost of every condition
+        
+        Returns
+        -------
+        List[str]
+            the names of the conditions, the cheapest condition first
+        """
+        if not self.enabled:
+            return sorted(estimated_costs, key=estimated_costs.get)
+        with self._lock:
+            self._load()
+            measured = {c: t for c, t in self.costs.get(pattern_name, {}).items() if c in estimated_costs}
+        ratios = [t / estimated_costs[c] for c, t in measured.items() if estimated_costs[c] > 0]
+        scale = sum(ratios) / len(ratios) if ratios else 1
+        return sorted(estimated_costs, key=lambda c: measured.get(c, estimated_costs[c] * scale))
+        
+    def update(self, pattern_name, condition, seconds):
+        """
+        adds a new measurement of the evaluation time of a condition (ignored if the measuring is disabled)
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._load()
+            pattern_costs = self.costs.setdefault(pattern_name, {})
+            previous = pattern_costs.get(condition)
+            pattern_costs[condition] = seconds if previous is None else COST_SMOOTHING * seconds + (1 - COST_SMOOTHING) * previous
+        
+    def save(self):
+        """
+        saves the measured costs into the json file (nothing is saved if the measuring is disabled)
+        """
+        with self._lock:
+            if self.enabled and self.costs is not None:
+                file = self.file
+                os.makedirs(os.path.dirname(file), exist_ok=True)
+                with open(file, 'w') as f:
+                    json.dump(self.costs, f, indent=4, sort_keys=True)
+        
+condition_costs = ConditionCosts()
+
 class Pattern(ABC):        
     """
     The abstract Pattern class describes single constraint patterns with all its dependencies. 
@@ -18,9 +132,18 @@ class Pattern(ABC):
     
     applies : bool
         True if the pattern applies, False if not, None if it has not been checked yet        
+        
+    conditions : Dict[str, float]
+        the names of the methods that check the conditions of the pattern together with their relative estimated costs (empty if the pattern does not use check_conditions)
+        
+    explain_all : bool
+        True if all conditions should be checked and all violations should be logged, False if the checking stops at the first condition that does not hold
     """
+    conditions = {}
+    
     def __init__(self):
         self.applies = None
+        self.explain_all = False
     
     def add_dependencies(self, pattern_structure):
         """
@@ -74,6 +197,25 @@ class Pattern(ABC):
         """
         pass
         
+    def summary_applies(self, summary) -> bool:
+        """
+        decides whether the pattern applies on the summary of the log that is updated incrementally when events are appended (instead of checking the whole log), 
+        patterns whose conditions are not summarized do not apply (like patterns that are not implemented yet)
+        
+        Arguments
+        -----------
+        summary : LogSummary
+            the summary of the log (see sequence_summaries.LogSummary) on which the conditions of the pattern should be decided
+        
+        Returns
+        -----------
+        bool
+            True if the pattern applies, False if it does not apply
+        """
+        if self.check_dependencies() is None:
+            return False
+        return self.applies
+        
     def check_dependencies(self):
         """
         checks whether the pattern already applies without further checking based on dependencies with other classes and logs it
@@ -92,4 +234,33 @@ class Pattern(ABC):
         elif not self.applies:
             pattern_logger.info(f"\t>>>\t{self.name} cannot apply because preconditions are violated")
             return False
-    
+            
+    def check_conditions(self, event_log, *args):
+        """
+        checks the conditions of the pattern, the cheapest condition first (based on the measured or estimated costs), and stops at the first condition that does not hold unless explain_all is set
+        
+        Arguments
+        -----------
+        event_log : EventLogStorage
+            the EventLogStorage object of the log on which the conditions of the pattern should be checked
+        *args
+            further arguments that are passed to every condition
+        
+        Returns
+        -----------
+        bool
+            True if all conditions apply, False if at least one does not apply
+        """
+        order = condition_costs.order(self.name, self.conditions)
+        applies = True
+        for i, c in enumerate(order):
+            start = time.perf_counter()
+            holds = getattr(self, c)(event_log, *args)
+            condition_costs.update(self.name, c, time.perf_counter() - start)
+            if not holds:
+                applies = False
+                if not self.explain_all:
+                    if i + 1 < len(order):
+                        pattern_logger.info(f"\t\t(the conditions {', '.join(order[i + 1:])} are not checked anymore)")
+                    break
+        return applies
@@ -1,10 +1,11 @@
 """
 This module contains the functionality that organizes the pattern checking process by structuring them in a graph
 """
-import os
-import networkx as nx
-import matplotlib.pyplot as plt
-from event_log_analyzer.utils import logger, log_time, pattern_logger
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from event_log_analyzer.metrics import registry
+from event_log_analyzer.utils import logger, log_time, output_file, pattern_logger
+from event_log_analyzer.pattern_library.pattern import condition_costs
+from event_log_analyzer.pattern_library.sequence_summaries import LogSummary
 from event_log_analyzer.pattern_library.manufacturing_scheduling_patterns import DistinguishableResource, FlowShop, IndistinguishableResource, JobShop, ManufacturingScheduling, NoWait, OneBlocking, Permutation, ResourceSetupTimes 
  
 class PatternStructure():
@@ -18,13 +19,18 @@ class PatternStructure():
         
     topological_order : List[Pattern]
         a list of all patterns in a topological order
+        
+    summary : LogSummary
+        the summary of the log that is updated by update_all_patterns() (None before the first update)
     """
     def __init__(self):
         """initialize the PatternStructure
         """
         logger.info("Set up Pattern Structure")
+        import networkx as nx
                 
         self.dependency_graph = nx.DiGraph() #Node object  
+        self.summary = None
               
         pattern_list = [ManufacturingScheduling(),
                         Permutation(), 
@@ -43,7 +49,7 @@ class PatternStructure():
         self.topological_ordering()
             
     @log_time(logger,"pattern check duration")
-    def check_all_patterns(self, event_log):
+    def check_all_patterns(self, event_log, max_workers=1, explain_all=False):
         """
         check all patterns that are initialized in the pattern structure in a topological order and log whether they apply
         
@@ -51,23 +57,87 @@ class PatternStructure():
         -----------
         log : EventLogStorage
             the event log on which the patterns should be classified
+            
+        max_workers : int, optional
+            the number of patterns that may be checked at the same time in separate threads, by default 1 (the patterns are checked one after another in the topological order)
+            
+        explain_all : bool, optional
+            True if all conditions of a pattern should be checked to log all violations, by default False (the checking of a pattern stops at the first condition that does not hold)
         """        
         for p in self.topological_order:
-            edges = self.dependency_graph.out_edges(p, data="type")
-            if p.pattern_applies(event_log):
-                p.applies = True
-                pattern_logger.info(f"✅ \tThe {p.name} applies!")
-                for e in edges:
-                    if e[2]=="forces":
-                        pattern_logger.info(f"\t--> forces {e[1].name}")
-                        e[1].applies = True
-            else:
-                p.applies = False
-                pattern_logger.info(f"❌ \tThe {p.name} does not apply!")
-                for e in edges:
-                    if e[2]=="enables":
-                        pattern_logger.info(f"\t--> excludes {e[1].name}")
-                        e[1].applies = False   
+            p.explain_all = explain_all
+        if registry.enabled:
+            registry.add_rows(event_log.get_number_of_rows())
+            
+        if max_workers == 1:
+            for p in self.topological_order:
+                self._set_result(p, p.pattern_applies(event_log))
+        else:
+            self._check_patterns_in_parallel(event_log, max_workers)
+        condition_costs.save()
+    
+    @log_time(logger,"pattern update duration")
+    def update_all_patterns(self, event_log, explain_all=False):
+        """
+        decides all patterns on the summary of the log, which is only extended by the events that have been appended since the last update (see EventLogStorage.append_dataframe()), 
+        so only the new events and the jobs and machines they belong to are processed. The first update (and the first update after the log has been replaced) summarizes the whole log
+        
+        Arguments
+        -----------
+        log : EventLogStorage
+            the event log on which the patterns should be classified
+            
+        explain_all : bool, optional
+            True if all conditions of a pattern should be decided to log all violations, by default False
+        """
+        if self.summary is None:
+            self.summary = LogSummary()
+        self.summary.update(event_log)
+        
+        for p in self.topological_order:
+            p.applies = None
+            p.explain_all = explain_all
+        for p in self.topological_order:
+            self._set_result(p, p.summary_applies(self.summary))
+    
+    def _check_patterns_in_parallel(self, event_log, max_workers):
+        """
+        checks every pattern in a thread pool as soon as all patterns it depends on (by an enables or forces edge) are decided, so independent branches of the pattern structure are checked concurrently
+        
+        the results are set in the main thread, therefore a pattern that is excluded or forced by another pattern is decided without checking its conditions (like in the serial order), the log messages of patterns that are checked at the same time may be interleaved
+        """
+        waiting_for = {p: self.dependency_graph.in_degree(p) for p in self.dependency_graph}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {executor.submit(registry.propagate(p.pattern_applies), event_log): p for p in self.topological_order if waiting_for[p] == 0}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    p = running.pop(future)
+                    self._set_result(p, future.result())
+                    for successor in self.dependency_graph.successors(p):
+                        waiting_for[successor] -= 1
+                        if waiting_for[successor] == 0:
+                            running[executor.submit(registry.propagate(successor.pattern_applies), event_log)] = successor
+    
+    def _set_result(self, p, applies):
+        """
+        stores whether the pattern applies, logs it and forces or excludes the dependent patterns
+        """
+        edges = self.dependency_graph.out_edges(p, data="type")
+        if applies:
+            p.applies = True
+            pattern_logger.info(f"✅ \tThe {p.name} applies!")
+            for e in edges:
+                if e[2]=="forces":
+                    pattern_logger.info(f"\t--> forces {e[1].name}")
+                    e[1].applies = True
+        else:
+            p.applies = False
+            pattern_logger.info(f"❌ \tThe {p.name} does not apply!")
+            for e in edges:
+                if e[2]=="enables":
+                    pattern_logger.info(f"\t--> excludes {e[1].name}")
+                    e[1].applies = False   
                         
     def applying_pattern_list(self):
         """
@@ -101,6 +171,8 @@ class PatternStructure():
         file : str, optional
             The file name of the output where the graphic should be plotted (default is pattern_structure.pdf)
         """ 
+        import matplotlib.pyplot as plt     #matplotlib and networkx are only imported when they are used
+        import networkx as nx
         plt.figure(figsize=(20, 10))    
         labels = {}
         for p in self.dependency_graph.nodes:
@@ -116,7 +188,7 @@ class PatternStructure():
             force_edges = {k: v for k, v in edge_labels.items() if v=="forces"}
             nx.draw_networkx_edge_labels(self.dependency_graph, pos, edge_labels=force_edges, font_color="grey")
             
-            plt.savefig(f'{os.getcwd()}/output/{file}', bbox_inches='tight')   
+            plt.savefig(output_file(file), bbox_inches='tight')   
         except:
             raise ImportError("requires pygraphviz, this package requires additional dependencies (see http://pygraphviz.github.io/), therefore we decided to not install it by default (on MacOS use: brew install graphviz & pip install pygraphviz)")
           
@@ -124,6 +196,7 @@ class PatternStructure():
         """
         finds the topological ordering of the initialized pattern structure and stores it in the topological_order attribute
         """
+        import networkx as nx
         graph_only_with_preconditions = nx.DiGraph(((u, v, e) for u,v,e in self.dependency_graph.edges(data=True) if e["type"] == 'enables'))
         self.topological_order = list(nx.topological_sort(graph_only_with_preconditions))
         for p in self.dependency_graph.nodes:
@@ -0,0 +1,307 @@
+"""
+This module contains vectorized checks on the operation sequences of a whole log, i.e. instead of iterating over every sequence (for example of every job) the log is sorted once by the sequence attribute (see SequenceIndex) and the sequences are compared at their boundaries.
+"""
+import numpy as np
+import pandas as pd
+from event_log_analyzer.sequence_index import SequenceIndex
+from event_log_analyzer.pattern_library.sharding import run_check
+
+
+def is_new_sequence(codes):
+    """
+    returns a boolean array that is True for every operation that is the first of its sequence (the codes need to be sorted)
+    """
+    new_sequence = np.ones(len(codes), dtype=bool)
+    new_sequence[1:] = codes[1:] != codes[:-1]
+    return new_sequence
+
+def overlapping_operations(codes, starts, completes):
+    """
+    finds all operations that start before an earlier operation of the same sequence is completed
+
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        the sorted sequence codes of the operations
+    starts : numpy.ndarray
+        the start timestamps of the operations (sorted by time within each sequence)
+    completes : numpy.ndarray
+        the complete timestamps of the operations
+
+    Returns
+    -------
+    earlier : numpy.ndarray
+        for every overlap the position of the earlier operation (the one that is completed last before the later operation)
+    later : numpy.ndarray
+        for every overlap the position of the later operation
+    """
+    if len(codes) < 2:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+    new_sequence = is_new_sequence(codes)
+    latest_complete = pd.Series(completes).groupby(codes).cummax().to_numpy()
+    positions = np.arange(len(codes))
+    latest_operation = np.maximum.accumulate(np.where((completes == latest_complete) | new_sequence, positions, 0))
+
+    later = np.flatnonzero(~new_sequence[1:] & (latest_complete[:-1] > starts[1:])) + 1
+    return latest_operation[later - 1], later
+
+def find_overlapping_operations(interval_df, attr, index=None):
+    """
+    finds all pairs of operations of the same sequence that are processed at the same time
+
+    Parameters
+    ----------
+    interval_df : pandas.DataFrame
+        the interval log (the attributes 'Start', 'Complete', 'Row_ID' and the given attribute are needed)
+    attr : str
+        the attribute of the sequences (for example 'Job' or 'Machine')
+    index : SequenceIndex, optional
+        the sequence index of the attribute ordered by 'Start' (with the same row order as the interval log), by default it is built from the interval log
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row for each overlap with the sequence attribute, the 'Row_ID' of the later operation and the 'Overlapping_Row_ID' of the earlier operation
+    """
+    index = SequenceIndex.from_dataframe(interval_df, attr, "Start") if index is None else index
+    earlier, later = run_check(overlapping_operations, index.offsets, {"codes": index.codes, "starts": index.take(interval_df["Start"]), "completes": index.take(interval_df["Complete"])}, positions=(0, 1))
+
+    row_ids = index.take(interval_df["Row_ID"])
+    return pd.DataFrame({attr: index.keys[index.codes[later]],
+                         "Row_ID": row_ids[later],
+                         "Overlapping_Row_ID": row_ids[earlier]})
+
+def simultaneous_operations(codes, is_start, is_complete, activity_instances):
+    """
+    finds all events of an atomic event log, at which a sequence processes two operations at the same time, i.e. every start event must be directly followed by the complete event of the same activity instance
+
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        the sorted sequence codes of the events
+    is_start : numpy.ndarray
+        True for the start events (sorted by time within each sequence)
+    is_complete : numpy.ndarray
+        True for the complete events
+    activity_instances : numpy.ndarray
+        the activity instances of the events
+
+    Returns
+    -------
+    numpy.ndarray
+        the positions of the events that follow a start event of another operation
+    """
+    if len(codes) < 2:
+        return np.empty(0, dtype=int)
+
+    follows_start = ~is_new_sequence(codes)[1:] & is_start[:-1]
+    is_own_complete = is_complete[1:] & (activity_instances[1:] == activity_instances[:-1])
+    return np.flatnonzero(follows_start & ~is_own_complete) + 1
+
+def find_simultaneous_operations(event_df, attr, index=None):
+    """
+    finds all events at which a sequence (for example of a machine) occupies two operations at the same time in an atomic event log
+
+    Parameters
+    ----------
+    event_df : pandas.DataFrame
+        the atomic event log (the attributes 'Timestamp', 'Transaction_Type', 'Activity_Instance', 'Row_ID' and the given attribute are needed)
+    attr : str
+        the attribute of the sequences (for example 'Job', 'Machine' or 'Resource')
+    index : SequenceIndex, optional
+        the sequence index of the attribute ordered by 'Timestamp' (with the same row order as the event log), by default it is built from the event log
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row for each violating event with the sequence attribute and the 'Row_ID' of the event
+    """
+    index = SequenceIndex.from_dataframe(event_df, attr, "Timestamp") if index is None else index
+    transaction_types = event_df["Transaction_Type"]      #the transaction types are compared once (on their codes if they are categorical)
+    violations = run_check(simultaneous_operations, index.offsets, {"codes": index.codes, "is_start": index.take(transaction_types == "start"), "is_complete": index.take(transaction_types == "complete"), 
+                                                                    "activity_instances": index.take(event_df["Activity_Instance"])}, positions=(0,))
+
+    return pd.DataFrame({attr: index.keys[index.codes[violations]],
+                         "Row_ID": index.take(event_df["Row_ID"])[violations]})
+
+FINGERPRINT_BASE = np.uint64(0x9E3779B97F4A7C15)     #odd 64 bit multiplier for the polynomial hash of the sequences
+
+def sequence_fingerprints(codes, value_codes):
+    """
+    computes a fingerprint for every sequence, i.e. a polynomial hash (modulo 2^64) of the ordered values of the sequence, 
+    two sequences with the same fingerprint and the same length are considered to be equal
+
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        the sorted sequence codes of the operations
+    value_codes : numpy.ndarray
+        the integer codes of the values that form the sequences (for example the machine codes of the route of a job)
+
+    Returns
+    -------
+    numpy.ndarray
+        the fingerprint of every sequence (in the order of the sequence codes)
+    """
+    if len(codes) == 0:
+        return np.empty(0, dtype=np.uint64)
+    first_positions = np.flatnonzero(is_new_sequence(codes))
+    positions = np.arange(len(codes)) - np.repeat(first_positions, np.diff(np.append(first_positions, len(codes))))
+    with np.errstate(over="ignore"):
+        terms = (value_codes.astype(np.uint64) + np.uint64(1)) * np.power(FINGERPRINT_BASE, positions.astype(np.uint64))
+        return np.add.reduceat(terms, first_positions)
+
+def sequence_statistics(codes, value_codes):
+    """
+    computes the number of distinct values and the fingerprint of every sequence (in the order of the sequence codes)
+    """
+    return pd.Series(value_codes).groupby(codes).nunique().to_numpy(), sequence_fingerprints(codes, value_codes)
+
+def summarize_sequences(df, attr, value_attr, index=None):
+    """
+    summarizes the sequences of the given attribute in one pass, for example for every job the number of operations, the number of distinct machines and the fingerprint of the route
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        the interval log (the attributes 'Start', attr and value_attr are needed)
+    attr : str
+        the attribute of the sequences (for example 'Job')
+    value_attr : str
+        the attribute whose values form the sequences (for example 'Machine')
+    index : SequenceIndex, optional
+        the sequence index of the attribute ordered by 'Start' (with the same row order as the interval log), by default it is built from the interval log
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per sequence (indexed and ordered by the key) with the columns 'Length', 'Distinct_Values' and 'Fingerprint'
+    """
+    index = SequenceIndex.from_dataframe(df, attr, "Start") if index is None else index
+    value_codes = index.take_codes(df[value_attr])[0]
+    distinct_values, fingerprints = run_check(sequence_statistics, index.offsets, {"codes": index.codes, "value_codes": value_codes})
+    
+    return pd.DataFrame({"Length": index.lengths,
+                         "Distinct_Values": distinct_values,
+                         "Fingerprint": fingerprints},
+                        index=pd.Index(index.keys, name=attr))
+
+def first_divergences(codes, value_codes):
+    """
+    compares every sequence with the first sequence and finds the first position at which they differ
+    
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        the sorted sequence codes of the operations
+    value_codes : numpy.ndarray
+        the integer codes of the values that form the sequences
+
+    Returns
+    -------
+    numpy.ndarray
+        for every sequence the first position at which it differs from the first sequence (-1 if both sequences are equal)
+    """
+    if len(codes) == 0:
+        return np.empty(0, dtype=int)
+    first_positions = np.flatnonzero(is_new_sequence(codes))
+    lengths = np.diff(np.append(first_positions, len(codes)))
+    positions = np.arange(len(codes)) - np.repeat(first_positions, lengths)
+    
+    reference = value_codes[:lengths[0]]
+    in_reference = positions < len(reference)
+    mismatch = ~in_reference
+    mismatch[in_reference] = value_codes[in_reference] != reference[positions[in_reference]]
+    
+    sequence_numbers = np.repeat(np.arange(len(first_positions)), lengths)
+    divergences = np.where(lengths != len(reference), np.minimum(lengths, len(reference)), -1)
+    mismatch_positions = pd.Series(positions[mismatch]).groupby(sequence_numbers[mismatch]).min()
+    divergences[mismatch_positions.index.to_numpy()] = mismatch_positions.to_numpy()
+    return divergences
+
+def find_divergent_sequences(df, attr, value_attr, index=None):
+    """
+    finds all sequences whose values are not in the same order as the values of the first sequence (for example the machines that process the jobs in another order than the first machine)
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        the interval log (the attributes 'Start', attr and value_attr are needed)
+    attr : str
+        the attribute of the sequences (for example 'Machine')
+    value_attr : str
+        the attribute whose values form the sequences (for example 'Job')
+    index : SequenceIndex, optional
+        the sequence index of the attribute ordered by 'Start' (with the same row order as the interval log), by default it is built from the interval log
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row for each divergent sequence with the sequence attribute, the 'Divergence' position and the ordered values of the sequence ('Values'), the first row contains the first sequence as reference
+    """
+    index = SequenceIndex.from_dataframe(df, attr, "Start") if index is None else index
+    value_codes, categories = index.take_codes(df[value_attr])
+    divergences = first_divergences(index.codes, value_codes)
+    
+    sequences = pd.DataFrame({attr: index.keys, "Divergence": divergences})
+    sequences = sequences[(divergences >= 0) | (np.arange(len(sequences)) == 0)]
+    sequences["Values"] = [pd.api.extensions.take(categories, index.sequence(value_codes, i), allow_fill=True) for i in sequences.index]     #only the values of the reported sequences are decoded
+    return sequences.reset_index(drop=True)
+
+def waiting_times(codes, starts, completes):
+    """
+    computes the time between the completion of every operation and the start of the next operation of the same sequence
+    
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        the sorted sequence codes of the operations
+    starts : numpy.ndarray
+        the start timestamps of the operations (sorted by time within each sequence)
+    completes : numpy.ndarray
+        the complete timestamps of the operations
+
+    Returns
+    -------
+    previous : numpy.ndarray
+        the positions of all operations that are followed by another operation of the same sequence
+    gaps : numpy.ndarray
+        the waiting time between each of these operations and the next operation (negative if the next operation starts earlier)
+    """
+    previous = np.flatnonzero(~is_new_sequence(codes)[1:])
+    return previous, starts[previous + 1] - completes[previous]
+
+def find_waiting_operations(interval_df, attr, index=None):
+    """
+    finds all operations of a sequence (for example of a job) after which the next operation does not start directly
+
+    Parameters
+    ----------
+    interval_df : pandas.DataFrame
+        the interval log (the attributes 'Start', 'Complete', 'Row_ID' and the given attribute are needed)
+    attr : str
+        the attribute of the sequences (for example 'Job')
+    index : SequenceIndex, optional
+        the sequence index of the attribute ordered by 'Start' (with the same row order as the interval log), by default it is built from the interval log
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row for each break with the sequence attribute, the 'Row_ID' of the operation before the break, the 'Next_Row_ID' of the operation after the break and the 'Waiting_Time'
+    """
+    index = SequenceIndex.from_dataframe(interval_df, attr, "Start") if index is None else index
+    previous, gaps = run_check(waiting_times, index.offsets, {"codes": index.codes, "starts": index.take(interval_df["Start"]), "completes": index.take(interval_df["Complete"])}, positions=(0,))
+    
+    breaks = gaps != np.zeros(1, dtype=gaps.dtype)
+    row_ids = index.take(interval_df["Row_ID"])
+    return pd.DataFrame({attr: index.keys[index.codes[previous[breaks]]],
+                         "Row_ID": row_ids[previous[breaks]],
+                         "Next_Row_ID": row_ids[previous[breaks] + 1],
+                         "Waiting_Time": gaps[breaks]})
+
+def waiting_time_statistics(waiting_operations, attr):
+    """
+    summarizes the breaks found by find_waiting_operations for every sequence (number of breaks, total and maximum waiting time)
+    """
+    return waiting_operations.groupby(attr, sort=True)["Waiting_Time"].agg(Breaks="count", Total_Waiting_Time="sum", Maximum_Waiting_Time="max")
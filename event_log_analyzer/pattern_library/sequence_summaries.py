@@ -0,0 +1,390 @@
+"""
+This module contains summaries of the sequences of a log that are updated incrementally, i.e. when events are appended to the log only the new rows are processed and the state at the end of every sequence
+(for example the last complete timestamp, the route so far and the number of overlapping operations of every job) is extended instead of checking the whole log again.
+Sequences whose new rows are earlier than their last summarized row are summarized again from all their rows.
+"""
+import numpy as np
+import pandas as pd
+from event_log_analyzer.pattern_library.sequence_checks import FINGERPRINT_BASE, is_new_sequence
+
+NAT = np.iinfo(np.int64).min     #missing timestamps are stored as the smallest integer, so they are ignored by the maxima
+
+def time_values(values):
+    """
+    returns the timestamps as int64 nanoseconds (timestamps with time zone are converted to UTC)
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64tz_dtype(values):
+        values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+    return values.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+def shift(values):
+    """
+    returns the values shifted by one position (the first value is repeated)
+    """
+    return np.concatenate((values[:1], values[:-1]))
+
+class ValueIds:
+    """
+    ValueIds assign stable integer ids to the values of a column in the order in which they appear, so the ids do not change when the categories of the stored log are extended (missing values get the id -1)
+
+    Attributes
+    -----------
+    values : List
+        the value of every id
+    """
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, values):
+        """
+        returns the ids of the values, values that have no id yet get the next ids
+        """
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        for value in uniques:
+            if value not in self._ids:
+                self._ids[value] = len(self.values)
+                self.values.append(value)
+        mapping = np.array([self._ids[value] for value in uniques] + [-1], dtype=np.int64)
+        return mapping[codes]     #the code -1 of missing values is mapped to the last entry (-1)
+
+class SequenceSummary:
+    """
+    The SequenceSummary is the base class of the summaries of all sequences of one attribute (for example of every job), the state of every sequence is stored in arrays that are indexed by the id of its key.
+
+    Attributes
+    -----------
+    attr : str
+        the attribute of the sequences (for example 'Job')
+
+    keys : ValueIds
+        the ids of the keys of the sequences
+
+    lengths : numpy.ndarray
+        the number of rows of every sequence
+
+    last_times : numpy.ndarray
+        the time of the last row of every sequence (as int64 nanoseconds)
+    """
+    time_attr = None
+    state = {"lengths": (np.int64, 0), "last_times": (np.int64, NAT)}      #the data type and the value of an empty sequence of every state array
+
+    def __init__(self, attr):
+        self.attr = attr
+        self.keys = ValueIds()
+        for name, (dtype, fill) in self.state.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+
+    @property
+    def columns(self):
+        """
+        the columns of the log that are needed to extend the summary
+        """
+        return [self.attr, self.time_attr]
+
+    def _grow(self):
+        """
+        adds the state of an empty sequence for all new keys
+        """
+        number_new_keys = len(self.keys) - len(self.lengths)
+        for name, (dtype, fill) in self.state.items():
+            setattr(self, name, np.concatenate((getattr(self, name), np.full(number_new_keys, fill, dtype=dtype))))
+
+    def _reset(self, key_ids):
+        """
+        resets the sequences of the given keys to empty sequences
+        """
+        for name, (dtype, fill) in self.state.items():
+            getattr(self, name)[key_ids] = fill
+
+    def extend(self, rows, load_rows):
+        """
+        extends the summaries of the sequences with the new rows of the log
+
+        Parameters
+        ----------
+        rows : pandas.DataFrame
+            the new rows in the order of the log (the columns of the summary are needed)
+        load_rows : function
+            returns all rows of the log (including the new rows) of a list of keys, it is called for the sequences whose new rows are earlier than their last summarized row, they are summarized again
+        """
+        key_ids = self.keys.encode(rows[self.attr])
+        self._grow()
+        rows = rows[key_ids >= 0]
+        key_ids = key_ids[key_ids >= 0]
+        times = time_values(rows[self.time_attr])
+
+        earliest_times = pd.Series(times).groupby(key_ids).min()
+        earlier = (earliest_times.to_numpy() < self.last_times[earliest_times.index]) & (self.lengths[earliest_times.index] > 0)
+        rebuilt = earliest_times.index.to_numpy()[earlier]
+        if len(rebuilt) > 0:
+            self._reset(rebuilt)
+            all_rows = load_rows([self.keys.values[k] for k in rebuilt])
+            keep = ~np.isin(key_ids, rebuilt)
+            rows = pd.concat([rows[keep], all_rows], ignore_index=True)
+            key_ids = np.concatenate((key_ids[keep], self.keys.encode(all_rows[self.attr])))
+            times = time_values(rows[self.time_attr])
+        if len(key_ids) == 0:
+            return
+
+        order = np.lexsort((times, key_ids))      #stable, so rows with the same time keep the order of the log
+        codes = key_ids[order]
+        new_sequence = is_new_sequence(codes)
+        first_positions = np.flatnonzero(new_sequence)
+        last_positions = np.append(first_positions[1:], len(codes)) - 1
+        self._extend_sorted(codes, new_sequence, first_positions, {c: np.asarray(rows[c])[order] for c in self.columns if c != self.attr})
+
+        keys = codes[first_positions]
+        self.lengths[keys] += np.diff(np.append(first_positions, len(codes)))
+        self.last_times[keys] = times[order][last_positions]
+
+    def _extend_sorted(self, codes, new_sequence, first_positions, columns):
+        """
+        extends the state of the sequences with the new rows sorted by key and time (implemented by the subclasses, the lengths and the last times are updated afterwards)
+        """
+        pass
+
+    def _previous(self, values, state, codes, new_sequence):
+        """
+        returns for every sorted row the value of the previous row of its sequence, the first new row of a sequence gets the state of the summarized rows
+        """
+        return np.where(new_sequence, state[codes], shift(values))
+
+class IntervalSummary(SequenceSummary):
+    """
+    The IntervalSummary summarizes the sequences of operations of an interval log (ordered by 'Start'), for example the route of every job through the machines.
+
+    Attributes
+    -----------
+    value_attr : str
+        the attribute whose values form the sequences (for example 'Machine' for the routes of the jobs)
+
+    value_ids : ValueIds
+        the ids of the values
+
+    last_completes : numpy.ndarray
+        the complete timestamp of the last operation of every sequence
+
+    max_completes : numpy.ndarray
+        the latest complete timestamp of all operations of every sequence
+
+    overlaps : numpy.ndarray
+        the number of operations of every sequence that start before an earlier operation of the sequence is completed
+
+    breaks : numpy.ndarray
+        the number of operations of every sequence that do not start directly when the previous operation is completed
+
+    fingerprints : numpy.ndarray
+        the fingerprint of the values of every sequence (the same polynomial hash as in sequence_checks.sequence_fingerprints(), but on the ids of the values)
+
+    distinct_values : numpy.ndarray
+        the number of distinct values of every sequence (missing values count as one value)
+    """
+    time_attr = "Start"
+    state = {**SequenceSummary.state, "last_completes": (np.int64, NAT), "max_completes": (np.int64, NAT), "overlaps": (np.int64, 0), "breaks": (np.int64, 0),
+             "fingerprints": (np.uint64, 0), "distinct_values": (np.int64, 0)}
+
+    def __init__(self, attr, value_attr):
+        super().__init__(attr)
+        self.value_attr = value_attr
+        self.value_ids = ValueIds()
+        self._values_of = {}
+
+    @property
+    def columns(self):
+        return [self.attr, self.value_attr, "Start", "Complete"]
+
+    def _reset(self, key_ids):
+        super()._reset(key_ids)
+        for k in key_ids:
+            self._values_of.pop(k, None)
+
+    def _extend_sorted(self, codes, new_sequence, first_positions, columns):
+        starts = time_values(columns["Start"])
+        completes = time_values(columns["Complete"])
+        values = self.value_ids.encode(columns[self.value_attr])
+        has_previous = np.where(new_sequence, self.lengths[codes] > 0, True)
+        keys = codes[first_positions]
+
+        latest_completes = np.maximum(pd.Series(completes).groupby(codes).cummax().to_numpy(), self.max_completes[codes])
+        overlapping = has_previous & (starts != NAT) & (self._previous(latest_completes, self.max_completes, codes, new_sequence) > starts)
+        previous_completes = self._previous(completes, self.last_completes, codes, new_sequence)
+        waiting = has_previous & ((starts != previous_completes) | (starts == NAT) | (previous_completes == NAT))
+
+        positions = self.lengths[codes] + np.arange(len(codes)) - np.repeat(first_positions, np.diff(np.append(first_positions, len(codes))))
+        with np.errstate(over="ignore"):
+            terms = (values.astype(np.uint64) + np.uint64(1)) * np.power(FINGERPRINT_BASE, positions.astype(np.uint64))
+            self.fingerprints[keys] += np.add.reduceat(terms, first_positions)
+        self.overlaps[keys] += np.add.reduceat(overlapping.astype(np.int64), first_positions)
+        self.breaks[keys] += np.add.reduceat(waiting.astype(np.int64), first_positions)
+
+        for pair in np.unique((codes << 32) | (values + 1)):
+            self._values_of.setdefault(int(pair >> 32), set()).add(int(pair & 0xFFFFFFFF))
+        self.distinct_values[keys] = [len(self._values_of[k]) for k in keys.tolist()]
+
+        last_positions = np.append(first_positions[1:], len(codes)) - 1
+        self.last_completes[keys] = completes[last_positions]
+        self.max_completes[keys] = latest_completes[last_positions]
+
+    def summary(self):
+        """
+        returns the summary of all sequences with the columns 'Length', 'Distinct_Values' and 'Fingerprint' (like sequence_checks.summarize_sequences(), indexed by the keys in the order in which they appeared)
+        """
+        return pd.DataFrame({"Length": self.lengths, "Distinct_Values": self.distinct_values, "Fingerprint": self.fingerprints}, index=pd.Index(self.keys.values, name=self.attr))
+
+class EventSummary(SequenceSummary):
+    """
+    The EventSummary summarizes the sequences of events of an atomic event log (ordered by 'Timestamp'), it counts the events at which a sequence (for example a machine) processes two operations at the same time
+    (every start event must be directly followed by the complete event of the same activity instance, see sequence_checks.simultaneous_operations()).
+
+    Attributes
+    -----------
+    last_is_start : numpy.ndarray
+        True if the last event of the sequence is a start event
+
+    last_activity_instances : numpy.ndarray
+        the activity instance of the last event of every sequence
+
+    violations : numpy.ndarray
+        the number of events of every sequence that follow a start event of another operation
+    """
+    time_attr = "Timestamp"
+    state = {**SequenceSummary.state, "last_is_start": (bool, False), "last_activity_instances": (np.float64, np.nan), "violations": (np.int64, 0)}
+
+    @property
+    def columns(self):
+        return [self.attr, "Timestamp", "Transaction_Type", "Activity_Instance"]
+
+    def _extend_sorted(self, codes, new_sequence, first_positions, columns):
+        transaction_types = pd.Series(columns["Transaction_Type"])
+        is_start = (transaction_types == "start").to_numpy()
+        is_complete = (transaction_types == "complete").to_numpy()
+        activity_instances = pd.to_numeric(pd.Series(columns["Activity_Instance"]), errors="coerce").to_numpy(dtype=np.float64)
+        keys = codes[first_positions]
+
+        follows_start = self._previous(is_start, self.last_is_start, codes, new_sequence)
+        is_own_complete = is_complete & (activity_instances == self._previous(activity_instances, self.last_activity_instances, codes, new_sequence))
+        self.violations[keys] += np.add.reduceat((follows_start & ~is_own_complete).astype(np.int64), first_positions)
+
+        last_positions = np.append(first_positions[1:], len(codes)) - 1
+        self.last_is_start[keys] = is_start[last_positions]
+        self.last_activity_instances[keys] = activity_instances[last_positions]
+
+class LogSummary:
+    """
+    A LogSummary summarizes an event log and its interval log for the incremental pattern checking: it keeps the summaries of the job, machine and resource sequences and some counters of the whole log
+    and only processes the rows that have been appended since the last update (everything is summarized again if the log has been replaced).
+
+    Attributes
+    -----------
+    generation : int
+        the generation of the summarized log (see EventLogStorage.get_generation())
+
+    columns : List[str]
+        the attributes of the event log
+
+    event_rows : int
+        the number of events that have been summarized
+
+    interval_rows : int
+        the number of operations of the interval log that have been summarized
+
+    events_without_machine : int
+        the number of events without a machine
+
+    events_without_resource : int
+        the number of events without a resource
+
+    jobs_without_resource : int
+        the number of operations of the interval log that have a job but no resource
+
+    machines : ValueIds
+        the machines of the interval log, missing_machine is True if an operation of the interval log has no machine
+
+    resources : ValueIds
+        the resources of the operations of the interval log that have a job
+
+    job_intervals, machine_intervals : IntervalSummary
+        the summaries of the operation sequences of the jobs (the routes through the machines) and of the machines (the order of the jobs)
+
+    job_events, machine_events, resource_events : EventSummary
+        the summaries of the event sequences of the jobs, machines and resources
+    """
+    def __init__(self):
+        self._reset(None, [])
+
+    def _reset(self, generation, columns):
+        """
+        removes all summarized rows
+        """
+        self.generation = generation
+        self.columns = columns
+        self.event_rows = 0
+        self.interval_rows = 0
+        self.events_without_machine = 0
+        self.events_without_resource = 0
+        self.jobs_without_resource = 0
+        self.machines = ValueIds()
+        self.missing_machine = False
+        self.resources = ValueIds()
+        self.job_intervals = IntervalSummary("Job", "Machine")
+        self.machine_intervals = IntervalSummary("Machine", "Job")
+        self.job_events = EventSummary("Job")
+        self.machine_events = EventSummary("Machine")
+        self.resource_events = EventSummary("Resource")
+
+    def is_scheduling_log(self):
+        """
+        returns True if the log has all attributes that are needed to summarize it (Job, Machine and Transaction_Type)
+        """
+        return all(attr in self.columns for attr in ["Job", "Machine", "Transaction_Type"])
+
+    def update(self, event_log):
+        """
+        summarizes the rows that have been appended to the event log (and to its interval log) since the last update, the interval log is created if it does not exist yet
+
+        Parameters
+        -----------
+        event_log : EventLogStorage
+            the summarized log
+        """
+        columns = event_log.get_columns()
+        if all(attr in columns for attr in ["Job", "Machine", "Transaction_Type"]) and not event_log.has_interval_log():
+            event_log.create_interval_log()
+        if event_log.get_generation() != self.generation:
+            self._reset(event_log.get_generation(), columns)
+        if not self.is_scheduling_log():
+            return
+
+        event_summaries = [self.job_events, self.machine_events] + ([self.resource_events] if "Resource" in self.columns else [])
+        event_columns = list(dict.fromkeys(c for summary in event_summaries for c in summary.columns))
+        events = event_log.get_event_log(event_columns, first_row=self.event_rows)
+        self.events_without_machine += int(events["Machine"].isna().sum())
+        if "Resource" in self.columns:
+            self.events_without_resource += int(events["Resource"].isna().sum())
+        for summary in event_summaries:
+            summary.extend(events, lambda keys, summary=summary: event_log.get_events_of(summary.attr, keys, event_columns))
+        self.event_rows += len(events.index)
+
+        interval_columns = ["Job", "Machine", "Resource", "Start", "Complete"]
+        intervals = event_log.get_interval_log(interval_columns, first_row=self.interval_rows)
+        self.machines.encode(intervals["Machine"])
+        self.missing_machine = self.missing_machine or bool(intervals["Machine"].isna().any())
+        if "Resource" in self.columns:
+            with_job = intervals["Job"].notna()
+            self.jobs_without_resource += int((with_job & intervals["Resource"].isna()).sum())
+            self.resources.encode(intervals.loc[with_job, "Resource"])
+        for summary in [self.job_intervals, self.machine_intervals]:
+            summary.extend(intervals, lambda keys, summary=summary: event_log.get_intervals_of(summary.attr, keys, interval_columns))
+        self.interval_rows += len(intervals.index)
+
+    @property
+    def number_machines(self):
+        """
+        the number of machines of the interval log (a missing machine counts as one machine, like in the Flow Shop Pattern)
+        """
+        return len(self.machines) + self.missing_machine
@@ -0,0 +1,128 @@
+"""
+This module contains the sharded execution of the sequence checks in several processes. The sorted column arrays of a sequence index are copied once into shared memory and every process checks a contiguous range of sequences (for example a range of jobs), so the dataframes never need to be pickled.
+"""
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+MAX_PROCESSES = 1               #number of processes in which the sequence checks are executed, 1 disables the sharded execution
+MIN_ROWS_PER_SHARD = 100000     #logs with less than two shards of this size are checked in the main process
+
+_executor = None
+
+def get_executor():
+    """
+    returns the process pool that is shared by all sharded checks, it is started on first use (with the spawn method, because the pattern checking may use threads and database connections)
+    """
+    global _executor
+    if _executor is not None and _executor._max_workers != MAX_PROCESSES:
+        shutdown()
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=MAX_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+@atexit.register
+def shutdown():
+    """
+    stops the process pool (it is started again when it is needed)
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+def shard_bounds(offsets, number_shards):
+    """
+    splits the sequences into contiguous shards with about the same number of rows, shards always start at the beginning of a sequence
+
+    Parameters
+    ----------
+    offsets : numpy.ndarray
+        the offsets of the sequences of a SequenceIndex
+    number_shards : int
+        the maximal number of shards
+
+    Returns
+    -------
+    numpy.ndarray
+        the first row of every shard followed by the number of rows
+    """
+    targets = np.linspace(0, offsets[-1], number_shards + 1)[1:-1]
+    bounds = offsets[np.searchsorted(offsets, targets)]
+    return np.unique(np.concatenate(([0], bounds, [offsets[-1]])))
+
+class SharedArrays:
+    """
+    SharedArrays copy numpy arrays into shared memory blocks, so that they can be accessed by other processes by their descriptions. Object arrays (for example strings) are converted into fixed width unicode arrays.
+
+    Attributes
+    -----------
+    descriptions : Dict[str, Tuple[str, Tuple[int], str]]
+        the name of the shared memory block, the shape and the data type of every array
+    """
+    def __init__(self, arrays):
+        self._blocks = []
+        self.descriptions = {}
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            if array.dtype == object:
+                array = array.astype(str)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            self.descriptions[name] = (block.name, array.shape, array.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+
+def _check_shard(check, descriptions, start, stop, positions):
+    """
+    executes the check on the rows start to stop of the shared arrays (in a worker process) and returns the result with the positions relative to the whole arrays
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name, shape, dtype in descriptions.values()]
+    try:
+        arrays = {attr: np.ndarray(shape, dtype=dtype, buffer=block.buf)[start:stop] for (attr, (name, shape, dtype)), block in zip(descriptions.items(), blocks)}
+        result = check(**arrays)
+        result = result if isinstance(result, tuple) else (result,)
+        return tuple(r + start if i in positions else np.array(r) for i, r in enumerate(result))     #copy the results before the shared memory is closed
+    finally:
+        for block in blocks:
+            block.close()
+
+def run_check(check, offsets, arrays, positions=()):
+    """
+    executes a check on the sorted arrays of a sequence index, in several processes if MAX_PROCESSES is greater than 1 and the log is large enough, otherwise directly
+
+    Parameters
+    ----------
+    check : function
+        a function of the sequence_checks module that checks the sequences (its arguments are the arrays given by their names), the results of the shards are concatenated
+    offsets : numpy.ndarray
+        the offsets of the sequences of the SequenceIndex
+    arrays : Dict[str, numpy.ndarray]
+        the sorted arrays (for example 'codes' and 'starts') that are passed to the check
+    positions : Tuple[int], optional
+        the numbers of the results that contain positions in the arrays (they are shifted by the first row of the shard), by default ()
+
+    Returns
+    -------
+    numpy.ndarray or Tuple[numpy.ndarray]
+        the result of the check as if it had been executed on the whole arrays
+    """
+    number_shards = min(MAX_PROCESSES, int(offsets[-1] // MIN_ROWS_PER_SHARD))
+    if number_shards < 2:
+        return check(**arrays)
+
+    bounds = shard_bounds(offsets, number_shards)
+    with SharedArrays(arrays) as shared:
+        futures = [get_executor().submit(_check_shard, check, shared.descriptions, start, stop, positions) for start, stop in zip(bounds[:-1], bounds[1:])]
+        results = [future.result() for future in futures]
+    merged = tuple(np.concatenate(parts) for parts in zip(*results))
+    return merged if len(merged) > 1 else merged[0]
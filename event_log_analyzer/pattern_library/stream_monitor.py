@@ -0,0 +1,347 @@
+"""
+This module contains the streaming monitor of the patterns, which consumes the start and complete events of a log one at a time (for example while the log is still being recorded) instead of checking the whole imported log.
+For every pattern only the state that is needed to decide its conditions is kept (for example the open operations of every job and machine and the common route of the jobs so far), so every event is processed in constant time
+and a violation is reported as soon as it is certain.
+"""
+import pandas as pd
+from event_log_analyzer.utils import logger, pattern_logger
+from event_log_analyzer.pattern_library.pattern_structure import PatternStructure
+from event_log_analyzer.pattern_library.manufacturing_scheduling_patterns import DistinguishableResource, FlowShop, IndistinguishableResource, JobShop, ManufacturingScheduling, NoWait, Permutation
+
+MONITORED_PATTERNS = [ManufacturingScheduling, JobShop, FlowShop, Permutation, NoWait, DistinguishableResource, IndistinguishableResource]     #all other patterns are not implemented yet and never apply
+
+class Violation:
+    """
+    A Violation describes an event at which a condition of a pattern does not hold anymore.
+
+    Attributes
+    -----------
+    pattern : str
+        the name of the violated pattern
+
+    condition : str
+        the violated condition of the pattern (for example 'cond_b'), None if the pattern has no separate conditions
+
+    row_id : int
+        the row id of the event at which the violation was detected ('?' if the event has no row id)
+
+    timestamp
+        the timestamp of the event
+
+    message : str
+        the description of the violation (as it is written to the pattern log)
+    """
+    def __init__(self, pattern, condition, row_id, timestamp, message):
+        self.pattern = pattern
+        self.condition = condition
+        self.row_id = row_id
+        self.timestamp = timestamp
+        self.message = message
+
+    def __repr__(self):
+        return f"Violation({self.pattern}, {self.condition}, Row {self.row_id}: {self.message})"
+
+class PatternMonitor:
+    """
+    The PatternMonitor decides the patterns of a PatternStructure on a stream of events of an atomic event log (with the attributes of the adapted logs, i.e. 'Job', 'Machine', 'Transaction_Type', 'Timestamp' and optionally 'Resource', 'Activity_Instance' and 'Row_ID').
+    All patterns hold until one of their conditions is violated, a violated pattern excludes all patterns that it enables (like in PatternStructure.check_all_patterns()).
+
+    The events need to be in the order of their timestamps. The conditions on the attributes of an event are checked when it arrives, the sequences of the jobs and machines are extended when the first event with a later timestamp arrives
+    (or by flush()), because an operation that is running may still be completed at the same time, so all events with the same timestamp are processed like in the interval log independent of the order in which they arrive.
+    The events of a resource are checked in the order of their arrival like the atomic event log in the Distinguishable Resource Pattern, so events with the same timestamp need to arrive in the order of the log.
+    The conditions that depend on the whole log (every job is processed on all machines and all jobs and machines have sequences of the same length) are only decided by finish().
+
+    Attributes
+    -----------
+    pattern_structure : PatternStructure
+        the patterns and their dependencies, the applies attribute of every pattern is True as long as it holds on the events so far
+
+    group_attributes : List[str]
+        the attributes that identify the operation of an event if it has no 'Activity_Instance'
+
+    explain_all : bool
+        True if every violation should be reported, by default only the first violation of every pattern is reported
+    """
+    def __init__(self, pattern_structure=None, group_attributes=["Job", "Machine"], explain_all=False):
+        self.pattern_structure = PatternStructure() if pattern_structure is None else pattern_structure
+        self.group_attributes = group_attributes
+        self.explain_all = explain_all
+        self._patterns = {type(p): p for p in self.pattern_structure.dependency_graph}
+        self._violated = set()
+        self._time = None
+        self._pending = []              #the events with the latest timestamp, which are processed when the timestamp is over
+
+        self._operations = {}           #the job and machine of every running operation
+        self._running = {}              #the number of running operations of every job and machine (keyed by the attribute and the value)
+        self._resource_starts = {}      #the operation of the start event of every resource whose last event is a start event (None if its last event is not a start event)
+        self._job_machines = {}         #the machines on which every job has been processed (in the order of its route)
+        self._job_machine_sets = {}     #the same machines as a set, so that a repeated machine is found in constant time
+        self._job_last_operations = {}  #the machine and the complete timestamp of the last operation of every job (the timestamp is None while it is running)
+        self._route = []                #the common route of all jobs so far
+        self._job_order = []            #the common order of the jobs on all machines so far
+        self._machine_lengths = {}
+        self._machines = set()
+        self._resource = None
+
+        for p in self.pattern_structure.topological_order:
+            p.applies = type(p) in MONITORED_PATTERNS
+            p.explain_all = explain_all
+        for p in self.pattern_structure.topological_order:
+            if not p.applies:
+                self._exclude_successors(p)
+
+    def watch(self, events):
+        """
+        processes all events of an iterable (for example importer.stream_event_log()) and yields every violation as soon as it is detected, the patterns are finished when the iterable is exhausted
+
+        Parameters
+        -----------
+        events : Iterable[Dict]
+            the events (as dictionaries from the attributes to their values) in the order of their timestamps
+        """
+        for event in events:
+            yield from self.process(event)
+        yield from self.finish()
+
+    def process(self, event):
+        """
+        updates the state of all patterns with one event
+
+        Parameters
+        -----------
+        event : Dict
+            the attributes of the event
+
+        Returns
+        -----------
+        List[Violation]
+            the violations detected by the event and by the events with the previous timestamp
+
+        Raises
+        ------
+        ValueError
+            if the event is earlier than the previous event or has no timestamp
+        """
+        timestamp = event.get("Timestamp")
+        if timestamp is None or pd.isna(timestamp):
+            raise ValueError(f"""the event (Row ID {event.get("Row_ID", "?")}) has no timestamp""")
+        violations = []
+        if self._time is not None and timestamp != self._time:
+            if timestamp < self._time:
+                raise ValueError(f"""the events need to be ordered by their timestamps (Row ID {event.get("Row_ID", "?")} at {timestamp} follows an event at {self._time})""")
+            violations += self.flush()
+        self._time = timestamp
+
+        violations += self._check_attributes(event)
+        if all(attr in event for attr in ["Job", "Machine", "Transaction_Type"]):
+            violations += self._check_resource(event)
+            self._pending.append(event)
+        return violations
+
+    def flush(self):
+        """
+        processes the events with the latest timestamp, this is done automatically when an event with a later timestamp arrives 
+        (it should only be called directly if no further events with the same timestamp can arrive, e.g. if no event has arrived for a while)
+
+        Returns
+        -----------
+        List[Violation]
+            the detected violations
+        """
+        pending, self._pending = self._pending, []
+        completed = {self._operation_key(event) for event in pending if event["Transaction_Type"] == "complete"}
+        
+        def order(event):
+            #first the operations that started earlier are completed, then the operations that are completed at the same time are processed (like in the interval log, which is ordered by start, complete, job and machine) and then all other operations are started
+            key = self._operation_key(event)
+            if key in self._operations:
+                return (0,)
+            if key in completed:
+                return (1, str(event["Job"]), str(event["Machine"]), str(key), event["Transaction_Type"] == "complete")
+            return (2,)
+        
+        violations = []
+        for event in sorted(pending, key=order):     #stable, so events are otherwise processed in the order of their arrival
+            violations += self._process_event(event)
+        return violations
+
+    def finish(self):
+        """
+        processes the events with the latest timestamp and decides the conditions that depend on the whole log: every job consists of as many operations as machines exist and all jobs and all machines have sequences of the same length
+
+        Returns
+        -----------
+        List[Violation]
+            the detected violations
+        """
+        violations = self.flush()
+        row_id = "?"
+        for j, machines in self._job_machines.items():
+            if len(machines) != len(self._machines):
+                violations += self._violate(FlowShop, "cond_b", row_id, f"""Job "{j}" has {len(machines)} operations but in total there exist {len(self._machines)} machines""")
+            if len(machines) != len(self._route):
+                violations += self._violate(FlowShop, "cond_c", row_id, f"""The route of job "{j}" ends after {len(machines)} of {len(self._route)} machines!""")
+        for m, length in self._machine_lengths.items():
+            if length != len(self._job_order):
+                violations += self._violate(Permutation, None, row_id, f"""On Machine "{m}" only {length} of {len(self._job_order)} jobs are processed!""")
+        return violations
+
+    def applying_pattern_list(self):
+        """
+        returns a list of all patterns that hold on the events so far
+
+        Returns
+        -------
+        pattern_list: List[Pattern]
+            list of all patterns that apply
+        """
+        return [p for p in self.pattern_structure.topological_order if p.applies]
+
+    def _check_attributes(self, event):
+        """
+        checks the conditions that only depend on the attributes of the event itself (the needed attributes exist and the job has a machine and a resource)
+        """
+        violations = []
+        row_id = event.get("Row_ID", "?")
+        for attr, message in [("Job", "no Job attribute existing"), ("Machine", "no Machine attribute existing"), ("Transaction_Type", "no Transaction Type existing in atomic event log representation")]:
+            if attr not in event:
+                violations += self._violate(ManufacturingScheduling, None, row_id, message)
+        if "Machine" in event and pd.isna(event["Machine"]):
+            violations += self._violate(JobShop, "cond_a", row_id, f"""No machine is assigned to job "{event.get("Job")}"!""")
+        if "Resource" not in event:
+            violations += self._violate(DistinguishableResource, None, row_id, "No resource column is specified!")
+            violations += self._violate(IndistinguishableResource, None, row_id, "No resource column is specified!")
+        elif pd.isna(event["Resource"]):
+            violations += self._violate(DistinguishableResource, None, row_id, f"""No resource is assigned to job "{event.get("Job")}" at machine "{event.get("Machine")}"!""")
+        return violations
+
+    def _check_resource(self, event):
+        """
+        checks that the event of a resource either follows no start event or is the complete event of the operation that has been started by the previous event of the resource 
+        (the same state machine as on the atomic event log, see sequence_checks.simultaneous_operations())
+        """
+        if "Resource" not in event or pd.isna(event["Resource"]):
+            return []
+        violations = []
+        key = self._operation_key(event)
+        started = self._resource_starts.get(event["Resource"])
+        if started is not None and not (event["Transaction_Type"] == "complete" and key == started):
+            violations += self._violate(DistinguishableResource, None, event.get("Row_ID", "?"), f"""Resource "{event["Resource"]}" processes two operations at the same time!""")
+        self._resource_starts[event["Resource"]] = key if event["Transaction_Type"] == "start" else None
+        return violations
+
+    def _operation_key(self, event):
+        """
+        returns the key of the operation of the event (its activity instance or the values of the group attributes)
+        """
+        activity_instance = event.get("Activity_Instance")
+        if activity_instance is not None and not pd.isna(activity_instance):
+            return ("Activity_Instance", activity_instance)
+        return tuple(event.get(attr) for attr in self.group_attributes)
+
+    def _sequence_keys(self, event):
+        """
+        returns the keys of the job and machine sequences of the event (missing values do not form a sequence)
+        """
+        return [(attr, event[attr]) for attr in ["Job", "Machine"] if attr in event and not pd.isna(event[attr])]
+
+    def _process_event(self, event):
+        """
+        updates the state of the sequences of the job and the machine of the event
+        """
+        if event["Transaction_Type"] == "start":
+            return self._start_operation(event)
+        elif event["Transaction_Type"] == "complete":
+            operation = self._operations.pop(self._operation_key(event), None)
+            if operation is not None:       #the operation may have been started before the monitoring
+                for key in operation:
+                    self._running[key] -= 1
+                job, machine = dict(operation).get("Job"), dict(operation).get("Machine")
+                if job is not None and self._job_last_operations.get(job) == (machine, None):
+                    self._job_last_operations[job] = (machine, event["Timestamp"])
+        return []
+
+    def _start_operation(self, event):
+        """
+        checks all conditions that are violated if the operation of the start event begins now
+        """
+        violations = []
+        row_id, job, machine = event.get("Row_ID", "?"), event["Job"], event["Machine"]
+        sequence_keys = self._sequence_keys(event)
+        running = {attr: self._running.get((attr, value), 0) > 0 for attr, value in sequence_keys}
+
+        if running.get("Job"):
+            violations += self._violate(JobShop, "cond_b", row_id, f"""Job "{job}" runs two operations at the same time!""")
+        if running.get("Machine"):
+            violations += self._violate(JobShop, "cond_c", row_id, f"""Machine "{machine}" processes two operations at the same time!""")
+
+        if not pd.isna(job):
+            if "Resource" in event:
+                if pd.isna(event["Resource"]):
+                    violations += self._violate(IndistinguishableResource, None, row_id, "Not all jobs are assigned to a resource!")
+                elif self._resource is None:
+                    self._resource = event["Resource"]
+                elif event["Resource"] != self._resource:
+                    violations += self._violate(IndistinguishableResource, None, row_id, "The resources are not indistinguishable (they differ)!")
+
+            machines = self._job_machines.setdefault(job, [])
+            machine_set = self._job_machine_sets.setdefault(job, set())
+            position = len(machines)
+            if machine in machine_set:
+                violations += self._violate(FlowShop, "cond_a", row_id, f"""Job "{job}" is processed on machine(s) {[machine]} more than once!""")
+            if position == len(self._route):
+                self._route.append(machine)
+            elif self._route[position] != machine:
+                violations += self._violate(FlowShop, "cond_c", row_id, f"""The route of job "{job}" differs from the routes of the other jobs at position {position} (machine "{machine}" instead of "{self._route[position]}")!""")
+            machines.append(machine)
+            machine_set.add(machine)
+
+            if job in self._job_last_operations:
+                last_machine, last_complete = self._job_last_operations[job]
+                if last_complete != event["Timestamp"]:
+                    violations += self._violate(NoWait, None, row_id, f"""Job "{job}" has a break between machine "{last_machine}" and machine "{machine}" """)
+            self._job_last_operations[job] = (machine, None)
+
+        self._machines.add(None if pd.isna(machine) else machine)      #a missing machine counts as one machine (like in the Flow Shop Pattern)
+        if not pd.isna(machine) and not pd.isna(job):
+            position = self._machine_lengths.get(machine, 0)
+            if position == len(self._job_order):
+                self._job_order.append(job)
+            elif self._job_order[position] != job:
+                violations += self._violate(Permutation, None, row_id, f"""On Machine "{machine}" the jobs are processed in a different order than on the other machines, the orders differ first at position {position} (job "{job}" instead of "{self._job_order[position]}")!""")
+            self._machine_lengths[machine] = position + 1
+
+        self._operations[self._operation_key(event)] = tuple(sequence_keys)
+        for key in sequence_keys:
+            self._running[key] = self._running.get(key, 0) + 1
+        return violations
+
+    def _violate(self, pattern_class, condition, row_id, message):
+        """
+        reports the violation of a pattern (if it has not been excluded before) and excludes the patterns that it enables, further violations of the pattern are only reported if explain_all is set
+        """
+        p = self._patterns.get(pattern_class)
+        if p is None or (p.applies is False and not (self.explain_all and p in self._violated)):
+            return []
+        name = p.name.replace("_Pattern", "").replace("_", " ")
+        header = f"{name} Condition {condition[-1]})" if condition is not None else name
+        if p.applies:
+            pattern_logger.info(f"\t>>>\t{header} does not hold!!!")
+        pattern_logger.info(f"\t\tRow {row_id}: {message}")
+        if p.applies:
+            p.applies = False
+            self._violated.add(p)
+            pattern_logger.info(f"❌ \tThe {p.name} does not apply!")
+            logger.info(f"streaming monitor: {p.name} violated at Row ID {row_id}")
+            self._exclude_successors(p)
+        return [Violation(p.name, condition, row_id, self._time, message)]
+
+    def _exclude_successors(self, p):
+        """
+        excludes all patterns that are enabled by the pattern (recursively)
+        """
+        for _, successor, edge_type in self.pattern_structure.dependency_graph.out_edges(p, data="type"):
+            if edge_type == "enables" and successor.applies is not False:
+                pattern_logger.info(f"\t--> excludes {successor.name}")
+                successor.applies = False
+                self._exclude_successors(successor)
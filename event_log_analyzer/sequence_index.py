@@ -0,0 +1,125 @@
+"""
+This module contains the sequence index, which sorts a log once by a grouping attribute (for example the job or the machine) and then provides every sequence as a slice of the sorted arrays.
+"""
+import numpy as np
+import pandas as pd
+
+
+class SequenceIndex:
+    """
+    A SequenceIndex stores the order of the operations of a log sorted by their sequence and by time (similar to the compressed sparse row format), so that the log only needs to be grouped once per attribute.
+
+    Attributes
+    -----------
+    attr : str
+        the attribute by which the log is grouped
+
+    keys : numpy.ndarray
+        the sorted unique keys of the sequences (operations without key are not part of any sequence)
+
+    order : numpy.ndarray
+        the positions of the operations of the log in the sorted order (by key and then by time, operations with the same time keep the order of the log)
+
+    codes : numpy.ndarray
+        the integer code of the key of every operation in the sorted order (the position of the key in keys)
+
+    offsets : numpy.ndarray
+        the position of the first operation of every sequence in the sorted order, the last entry is the number of sorted operations, so sequence i consists of the sorted operations offsets[i] to offsets[i+1]
+    """
+    def __init__(self, keys, times, attr=None):
+        """
+        Parameters
+        ----------
+        keys : pandas.Series
+            the key of the sequence of every operation (for example the job)
+        times : numpy.ndarray
+            the time by which the operations of a sequence are ordered (for example the start timestamp)
+        attr : str, optional
+            the name of the grouping attribute, by default the name of the keys
+        """
+        self.attr = keys.name if attr is None else attr
+        codes, keys = pd.factorize(keys, sort=True)
+        self.keys = np.asarray(keys)
+        order = np.lexsort((times, codes))
+        self.order = order[codes[order] >= 0]
+        self.codes = codes[self.order]
+        self.offsets = np.searchsorted(self.codes, np.arange(len(self.keys) + 1))
+
+    @classmethod
+    def from_dataframe(cls, df, attr, time_attr):
+        """
+        builds the sequence index of the given attribute of a log, ordered by the given time attribute
+        """
+        return cls(df[attr], df[time_attr].to_numpy(), attr)
+
+    def __len__(self):
+        """
+        returns the number of sequences
+        """
+        return len(self.keys)
+
+    @property
+    def lengths(self):
+        """
+        the number of operations of every sequence
+        """
+        return np.diff(self.offsets)
+
+    @property
+    def first_positions(self):
+        """
+        the position of the first operation of every sequence in the sorted order
+        """
+        return self.offsets[:-1]
+
+    def take(self, values):
+        """
+        sorts the values of a column of the log (that has the same row order as the log the index is built on) into the sequence order
+
+        Parameters
+        ----------
+        values : pandas.Series or numpy.ndarray
+            the column of the log
+
+        Returns
+        -------
+        numpy.ndarray
+            the values of all sequences one after the other, every sequence is a contiguous slice of this array
+        """
+        return np.asarray(values)[self.order]
+
+    def take_codes(self, values):
+        """
+        sorts the integer codes of the values of a column into the sequence order (like take()), the codes of categorical columns are used directly, all other columns are factorized first
+
+        Parameters
+        ----------
+        values : pandas.Series or numpy.ndarray
+            the column of the log
+
+        Returns
+        -------
+        codes : numpy.ndarray
+            the codes of the values of all sequences one after the other (-1 for missing values)
+        categories : numpy.ndarray
+            the value of every code
+        """
+        if pd.api.types.is_categorical_dtype(values):
+            categorical = pd.Categorical(values)
+            codes, categories = categorical.codes, categorical.categories
+        else:
+            codes, categories = pd.factorize(values)
+        return np.asarray(codes)[self.order], np.asarray(categories)
+
+    def sequence(self, sorted_values, i):
+        """
+        returns the values of the i-th sequence as a view (without copying) of an array that has been sorted with take()
+        """
+        return sorted_values[self.offsets[i]:self.offsets[i + 1]]
+
+    def sequences(self, sorted_values):
+        """
+        yields the key and the values (as a view) of every sequence of an array that has been sorted with take()
+        """
+        for i, key in enumerate(self.keys):
+            yield key, sorted_values[self.offsets[i]:self.offsets[i + 1]]
@@ -6,6 +6,7 @@ import os
 import time
 import logging
 from pathlib import Path
+from event_log_analyzer.metrics import registry, rows_of
 
 #Logging for Monitoring Program Flow
 logger = logging.getLogger(__name__)
@@ -25,15 +26,42 @@ pattern_logger.setLevel(logging.INFO)
 
 pattern_formatter = logging.Formatter("%(message)s")
 
-Path(f'{os.getcwd()}/output').mkdir(parents=True, exist_ok=True)
-pattern_file_handler = logging.FileHandler(f'{os.getcwd()}/output/patterns.log', mode='w')
+class OutputFileHandler(logging.FileHandler):
+    """
+    a file handler that creates the folder of the file and opens (and truncates) the file only when the first record is written, so that importing the package has no side effects on the file system,
+    a relative path is resolved in the current working directory at the time the file is opened (like the other files in the output folder)
+    """
+    def __init__(self, filename, mode='w'):
+        super().__init__(filename, mode=mode, delay=True)
+        self._filename = filename
+
+    def _open(self):
+        self.baseFilename = os.path.abspath(self._filename)
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+pattern_file_handler = OutputFileHandler('output/patterns.log', mode='w')
 pattern_file_handler.setLevel(logging.INFO)
 pattern_file_handler.setFormatter(pattern_formatter)
 
 pattern_logger.addHandler(pattern_file_handler)
 
+def output_file(file_name):
+    """
+    returns the path of a file in the output folder of the current working directory, the folder is created if it does not exist yet
+
+    Parameters
+    ----------
+    file_name : str
+        the name of the file in the output folder
+    """
+    directory = Path(f'{os.getcwd()}/output')
+    directory.mkdir(parents=True, exist_ok=True)
+    return f'{directory}/{file_name}'
+
 def log_time(logger, text):
-    """this function can be used as a decorator, which writes the time needed for the decorated function together with a text to the specified logger
+    """this function can be used as a decorator, which writes the time needed for the decorated function together with a text to the specified logger,
+    if the metrics registry is enabled (see metrics.registry) the decorated function is additionally recorded as a span named by the text (with the number of rows of the returned dataframe or otherwise of the first dataframe argument)
 
 
     Parameters
@@ -45,10 +73,16 @@ def log_time(logger, text):
     """
     @functools.wraps(logger)
     def timer(func):
+        category = func.__module__.rsplit(".", 1)[-1]
         @functools.wraps(func)
         def wrapper_timer(*args, **kwargs):
             start = time.perf_counter()
-            value = func(*args, **kwargs)
+            if registry.enabled:
+                with registry.span(text, category, function=func.__qualname__) as span:
+                    value = func(*args, **kwargs)
+                    span.add_rows(next((rows for rows in map(rows_of, (value,) + args) if rows is not None), None))
+            else:
+                value = func(*args, **kwargs)
             elapsed_time = time.perf_counter() - start
             logger.info(f"{text}: {elapsed_time:0.4f} seconds")
             return value
@@ -3,7 +3,6 @@ This module is responsible for validating event logs before storing them in the
 """
 import pandas as pd
 import json
-import jsonschema
 
 def validate(event_log):   
     """
@@ -43,6 +42,7 @@ def validate_config(json_schema_path, config_file):
     with open(json_schema_path) as json_schema:
         schema = json.load(json_schema)   
         
+    import jsonschema
     try:
         jsonschema.validate(config_file, schema)
     except:   
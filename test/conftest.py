@@ -0,0 +1,28 @@
+import os
+import json
+import pytest
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+
+@pytest.fixture(autouse=True)
+def working_directory(tmp_path, monkeypatch):
+    """
+    runs every test in its own temporary working directory, so that the databases, the memory-mapped column store and the output files are not written into the repository,
+    the test data stays reachable under the relative path test/data used in the config files
+    """
+    os.symlink(currentdir, tmp_path / "test")
+    monkeypatch.chdir(tmp_path)
+
+@pytest.fixture
+def write_log(tmp_path):
+    """
+    returns a function that writes the rows of a dataframe into tmp_path/<name>.csv together with a config file tmp_path/<name>.json (a copy of the given config file with the new path) and returns the path of the config file
+    """
+    def write(name, df, config_file="test/data/interval_log.json"):
+        with open(config_file) as json_config_file:
+            config = json.load(json_config_file)
+        df.to_csv(tmp_path / f"{name}.csv", sep=config["separator"], index=False)
+        with open(tmp_path / f"{name}.json", "w") as json_config_file:
+            json.dump(dict(config, path=str(tmp_path / f"{name}.csv")), json_config_file)
+        return str(tmp_path / f"{name}.json")
+    return write
@@ -0,0 +1,103 @@
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import json
+import pandas as pd
+import pytest
+from event_log_analyzer import importer as event_log_importer
+from event_log_analyzer.adapter import ActivityInstanceAdder, CategoricalEncoder, ColumnRenamer, EventToIntervalLog, IntervalToEventLogTransformer, RowIDAdder, Sorter, TimestampModifier, TimestampRenamer
+
+def test_timestamp_modifier_relative_time():
+    cfg = {"time_attributes": ["Timestamp"], "relative_time": True, "time_format": "%H:%M:%S"}
+    df = pd.DataFrame({"Timestamp": ["00:00:00", "00:01:30", "00:01:30", "25:00:10"]})
+    
+    df = TimestampModifier().transform(cfg, df)
+    expected = pd.to_datetime(["1970-01-01 00:00:00", "1970-01-01 00:01:30", "1970-01-01 00:01:30", "1970-01-02 01:00:10"])
+    assert (df["Timestamp"].values == expected.values).all(), "durations should be converted to timestamps relative to 1970-01-01"
+    
+@pytest.mark.filterwarnings("error::RuntimeWarning")     #the invalid durations should become NaT without casting NaN
+def test_timestamp_modifier_reports_first_invalid_row():
+    cfg = {"time_attributes": ["Timestamp"], "relative_time": True, "time_format": "%H:%M:%S"}
+    df = pd.DataFrame({"Timestamp": ["00:00:00", "00:61:00", "00:00:99"]})
+    with pytest.raises(ValueError, match="row 1"):
+        TimestampModifier().transform(cfg, df)
+    
+    cfg = {"time_attributes": ["Timestamp"], "relative_time": False, "time_format": "%Y-%m-%d %H:%M:%S"}
+    df = pd.DataFrame({"Timestamp": ["2013-09-20 13:03:00", "2013-09-20 13:07:00", "20.09.2013 13:07"]})
+    with pytest.raises(ValueError, match="row 2"):
+        TimestampModifier().transform(cfg, df)
+    
+def test_timestamp_modifier_reports_missing_timestamps():
+    for cfg, timestamp in [({"time_attributes": ["Timestamp"], "relative_time": True, "time_format": "%H:%M:%S"}, "00:00:00"), 
+                           ({"time_attributes": ["Timestamp"], "relative_time": False, "time_format": "%Y-%m-%d %H:%M:%S"}, "2013-09-20 13:03:00")]:
+        df = pd.DataFrame({"Timestamp": [timestamp, None, timestamp]})
+        with pytest.raises(ValueError, match="row 1"):
+            TimestampModifier().transform(cfg, df)
+    
+def test_event_to_interval_log_engines():
+    for config_file in ["test/data/event_log.json", "test/data/gen_event_log.json"]:
+        with open(config_file) as json_config_file:
+            cfg = json.load(json_config_file)
+        df = event_log_importer.import_event_log(config_file).get_event_log()
+        
+        native_df = EventToIntervalLog().transform(cfg, df).sort_values("Row_ID", ignore_index=True)
+        pm4py_df = EventToIntervalLog("pm4py").transform(cfg, df).sort_values("Row_ID", ignore_index=True)
+        pm4py_df = CategoricalEncoder().transform(cfg, pm4py_df[native_df.columns].copy())     #pm4py returns the categorical attributes as strings
+        pd.testing.assert_frame_equal(native_df, pm4py_df, check_dtype=False)
+
+def test_event_to_interval_log_pairs_by_activity_instance():
+    with open("test/data/production_data.json") as json_config_file:
+        cfg = json.load(json_config_file)
+    raw_df = event_log_importer.import_csv_file(cfg).set_index("Row_ID")
+    df = event_log_importer.import_event_log("test/data/production_data.json").get_event_log()
+    
+    interval_df = EventToIntervalLog().transform(cfg, df).set_index("Row_ID")
+    assert len(interval_df) == len(raw_df), "every operation of the interval log should be restored"
+    assert (interval_df["Start"] == raw_df.loc[interval_df.index, "Start Timestamp"]).all(), "operations on the same machine that overlap should not be mixed up"
+    assert (interval_df["Complete"] == raw_df.loc[interval_df.index, "Complete Timestamp"]).all()
+    
+def test_event_to_interval_log_unmatched_events():
+    df = pd.DataFrame({"Job": ["j1"]*6, "Machine": ["m1"]*6, "Activity_Instance": [0]*6, "Row_ID": range(6),
+                       "Transaction_Type": ["complete", "start", "complete", "start", "complete", "start"],
+                       "Timestamp": pd.to_datetime(["2020-01-01 00:00", "2020-01-01 00:01", "2020-01-01 00:02", "2020-01-01 00:03", "2020-01-01 00:04", "2020-01-01 00:05"])})
+    
+    interval_df = EventToIntervalLog().transform({}, df)
+    assert list(interval_df["Row_ID"]) == [0, 2, 4], "every complete event should result in an interval, the last start event has no complete event"
+    assert list(interval_df["Start"]) == [df["Timestamp"][0], df["Timestamp"][1], df["Timestamp"][3]], "start events should be paired first in first out"
+    
+def test_interval_to_event_log_engines():
+    for config_file in ["test/data/interval_log.json", "test/data/production_data.json"]:
+        with open(config_file) as json_config_file:
+            cfg = json.load(json_config_file)
+        
+        event_logs = []
+        for engine in ["native", "pm4py"]:
+            df = event_log_importer.import_csv_file(cfg)
+            for adapter in [RowIDAdder(), ColumnRenamer(), TimestampRenamer(), IntervalToEventLogTransformer(engine=engine), Sorter()]:
+                df = adapter.transform(cfg, df)
+            event_logs.append(df)
+            
+        native_df, pm4py_df = event_logs
+        pd.testing.assert_frame_equal(native_df, pm4py_df[native_df.columns])
+    
+def test_activity_instance_adder():
+    cfg = {"group_attributes": ["Job", "Machine"]}
+    df = pd.DataFrame({"Job": ["j1", "j2", "j1", "j2", "j1", "j3"], "Machine": ["m1", "m1", "m1", "m1", "m2", "m2"],
+                       "Transaction_Type": ["start", "start", "complete", "complete", "start", "complete"]})
+    
+    with pytest.raises(ValueError) as error:
+        ActivityInstanceAdder().transform(cfg, df.copy())
+    assert "('j1', 'm2')" in str(error.value) and "('j3', 'm2')" in str(error.value), "all malformed operations should be reported"
+    
+    df = ActivityInstanceAdder().transform(cfg, df.iloc[:4].copy())
+    assert list(df["Activity_Instance"]) == [0, 1, 0, 1], "events of the same job and machine should belong to the same activity instance"
+    
+def test_categorical_encoder():
+    df = pd.DataFrame({"Job": ["j2", "j1", None, "j2"], "Machine": [1, 2, 1, 2], "Transaction_Type": ["start", "start", "complete", "complete"]})
+    
+    df = CategoricalEncoder().transform({}, df)
+    assert list(df["Job"].cat.categories) == ["j1", "j2"] and list(df["Job"].cat.codes) == [1, 0, -1, 1], "the categories should be sorted and missing values should get the code -1"
+    assert df["Machine"].dtype == "int64", "numerical attributes should not be encoded"
+    assert list(df["Transaction_Type"] == "start") == [True, True, False, False]
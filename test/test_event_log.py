@@ -0,0 +1,128 @@
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import numpy as np
+import pytest
+import pandas as pd
+from event_log_analyzer import importer as event_log_importer
+from event_log_analyzer.column_store import ColumnStore
+from event_log_analyzer.event_log import FrameCache, StorageType
+
+def test_frame_cache_evicts_least_recently_used():
+    df = pd.DataFrame({"a": range(100)})
+    df_size = df.memory_usage(deep=True).sum()
+    cache = FrameCache(2 * df_size)
+    
+    cache.put(("t", 0, ()), df)
+    cache.put(("t", 0, ("a",)), df)
+    cache.get(("t", 0, ()))
+    cache.put(("u", 0, ()), df)
+    assert cache.get(("t", 0, ("a",))) is None, "the least recently used dataframe should be evicted"
+    assert cache.get(("t", 0, ())) is df and cache.get(("u", 0, ())) is df
+    
+    cache.invalidate("t")
+    assert cache.get(("t", 0, ())) is None and cache.size == df_size, "all dataframes of an invalidated table should be removed"
+
+def test_cache_is_invalidated_by_new_data():
+    for storage_type in [StorageType.ROW_BASED, StorageType.COLUMN_BASED]:
+        log = event_log_importer.import_event_log("test/data/event_log.json", storage_type)
+        df = log.get_event_log()
+        assert log.get_event_log() is df, "the event log should only be loaded once from the database"
+        
+        log.add_new_dataframe(df.iloc[:4])
+        assert len(log.get_event_log()) == 4, "the cached event log should be replaced when a new dataframe is added"
+        
+        log.create_interval_log()
+        assert len(log.get_interval_log()) == 1, "only the first operation is completed in the first four events"
+        log.add_new_dataframe(df)
+        log.create_interval_log()
+        assert len(log.get_interval_log()) == 9, "the cached interval log should be replaced when a new interval log is created"
+    
+def test_projection():
+    for storage_type in StorageType:
+        log = event_log_importer.import_event_log("test/data/event_log.json", storage_type)
+        log.create_interval_log()
+        
+        assert list(log.get_event_log(["Job", "Timestamp", "Unknown"]).columns) == ["Job", "Timestamp"], "only the needed columns should be loaded, unknown columns are ignored"
+        assert list(log.get_interval_log(["Machine", "Start"]).columns) == ["Machine", "Start"]
+        for df in log.get_interval_sequence("Job", ["Start", "Complete"]):
+            assert list(df.columns) == ["Start", "Complete"], "sequences should only contain the needed columns"
+        assert "Resource" in log.get_columns()
+        
+def test_sequence_index():
+    for storage_type in StorageType:
+        log = event_log_importer.import_event_log("test/data/event_log.json", storage_type)
+        log.create_interval_log()
+        
+        index = log.get_sequence_index("Job")
+        assert log.get_sequence_index("Job") is index, "the sequence index should only be built once per attribute"
+        df = log.get_interval_log(["Job", "Start"])
+        jobs, starts = index.take(df["Job"]), index.take(df["Start"])
+        for i, (key, sequence) in enumerate(index.sequences(jobs)):
+            assert (sequence == key).all() and len(sequence) == index.lengths[i], "every sequence should be a contiguous slice of the sorted array"
+            assert (pd.Series(index.sequence(starts, i)).is_monotonic_increasing), "the operations of every sequence should be ordered by time"
+        assert sum(index.lengths) == df["Job"].notna().sum()
+        
+        log.create_interval_log()
+        assert log.get_sequence_index("Job") is not index, "the sequence index should be rebuilt when the interval log is replaced"
+        
+def test_column_store(tmp_path):
+    df = pd.DataFrame({"Job": ["j2", "j1", None, "j2"],
+                       "Timestamp": pd.to_datetime(["2020-01-01 00:00", "2020-01-01 00:01", "2020-01-01 00:02", "2020-01-01 00:03"]).tz_localize("Europe/Berlin"),
+                       "Row_ID": range(4),
+                       "Duration": [1.5, None, 2.0, 3.0]})
+    store = ColumnStore(str(tmp_path))
+    writer = store.writer("log")
+    writer.write_batch(df.iloc[:2])
+    writer.write_batch(df.iloc[2:])
+    writer.finish()
+    store.commit("log")
+    
+    stored_df = ColumnStore(str(tmp_path)).read_table("log")
+    assert list(stored_df["Job"].cat.categories) == ["j1", "j2"], "the dictionary should be sorted over all batches"
+    assert list(stored_df["Job"].cat.codes) == [1, 0, -1, 1]
+    pd.testing.assert_frame_equal(stored_df.astype({"Job": object}), df)
+    assert isinstance(stored_df["Row_ID"].to_numpy().base, np.memmap), "the columns should be backed by the mapped files"
+    assert list(store.read_table("log", ["Row_ID", "Unknown"]).columns) == ["Row_ID"]
+        
+def test_dictionary_encoding():
+    for storage_type in StorageType:
+        for chunk_size in [None, 5]:
+            log = event_log_importer.import_event_log("test/data/event_log.json", storage_type, chunk_size=chunk_size)
+            log.create_interval_log()
+            
+            for df in [log.get_event_log(), log.get_interval_log(), next(log.get_sequence("Machine"))]:
+                for attr in ["Job", "Machine", "Resource"]:
+                    assert isinstance(df[attr].dtype, pd.CategoricalDtype), "the categorical attributes should be dictionary encoded in all storage types"
+                    assert list(df[attr].cat.categories) == sorted(df[attr].cat.categories)
+            assert set(log.get_event_log()["Transaction_Type"]) == {"start", "complete"}
+
+def test_append_dataframe():
+    for storage_type in StorageType:
+        full_log = event_log_importer.import_event_log("test/data/event_log.json", storage_type)
+        full_log.create_interval_log()
+        df = full_log.get_event_log()
+        
+        log = event_log_importer.import_event_log("test/data/event_log.json", storage_type)
+        log.add_new_dataframe(df.iloc[:6].reset_index(drop=True))
+        log.create_interval_log()
+        generation = log.get_generation()
+        log.append_dataframe(df.iloc[6:11].reset_index(drop=True))
+        log.append_dataframe(df.iloc[11:].reset_index(drop=True))
+        assert log.get_generation() == generation, "appending rows should not replace the stored log"
+        assert log.get_number_of_rows() == 18 and log.get_number_of_rows(interval=True) == 9
+        
+        for table, full_table, key in [(log.get_event_log(), full_log.get_event_log(), ["Row_ID", "Timestamp"]), (log.get_interval_log(), full_log.get_interval_log(), ["Row_ID", "Start"])]:
+            assert isinstance(table["Job"].dtype, pd.CategoricalDtype), "the appended rows should be dictionary encoded as well"
+            table, full_table = [t.astype({c: object for c in ["Job", "Machine", "Resource"]}).drop(columns=["Interval_ID"], errors="ignore").sort_values(key, ignore_index=True) for t in [table, full_table]]
+            pd.testing.assert_frame_equal(table, full_table, check_dtype=False)
+        assert sorted(log.get_interval_log()["Interval_ID"]) == list(range(9)), "the appended operations should get the next interval ids"
+        
+        assert len(log.get_events_of("Job", ["j1", "unknown"])) == 6 and len(log.get_events_of("Job", [])) == 0
+        assert set(log.get_intervals_of("Machine", ["m2"])["Machine"]) == {"m2"}
+        assert len(log.get_event_log(first_row=12)) == 6, "only the rows after the first 12 rows should be returned"
+        
+        with pytest.raises(ValueError):
+            log.append_dataframe(df.drop(columns=["Resource"]))
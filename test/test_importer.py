@@ -3,7 +3,12 @@ currentdir = os.path.dirname(os.path.realpath(__file__))
 parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
+import subprocess
 from event_log_analyzer import importer as event_log_importer
+import pandas as pd
+import pytest
+from event_log_analyzer import event_log, log_cache
+from event_log_analyzer.event_log import StorageType
 
 def test_import_event_log():
     log = event_log_importer.import_event_log("test/data/event_log.json")
@@ -48,4 +53,121 @@ def test_import_log_in_xes_format():
     
     log.create_interval_log()
     job_interval_sequence = log.get_interval_sequence("Job")
-    assert len(list(job_interval_sequence)) == 50, "there are three different jobs, therefore the job sequence should be of length 3"
\ No newline at end of file
+    assert len(list(job_interval_sequence)) == 50, "there are three different jobs, therefore the job sequence should be of length 3"
+    
+def test_chunked_import():
+    for config_file in ["test/data/event_log.json", "test/data/interval_log.json"]:
+        for storage_type in StorageType:
+            log_df = event_log_importer.import_event_log(config_file, storage_type).get_event_log()
+            chunked_log_df = event_log_importer.import_event_log(config_file, storage_type, chunk_size=5).get_event_log()
+            
+            assert len(chunked_log_df) == 18, "the chunked import should contain all 18 atomic events"
+            assert list(chunked_log_df["Row_ID"]) == list(log_df["Row_ID"]), "the chunked import should result in the same order as the import at once"
+            assert list(chunked_log_df["Activity_Instance"]) == list(log_df["Activity_Instance"]), "the chunked import should result in the same activity instances as the import at once"
+    
+def test_unsorted_chunked_import_keeps_the_stored_log(write_log):
+    raw_df = pd.read_csv("test/data/event_log.csv", sep=";")
+    unsorted_config_file = write_log("unsorted", raw_df.iloc[::-1], "test/data/event_log.json")
+    for storage_type in StorageType:
+        log = event_log_importer.import_event_log("test/data/event_log.json", storage_type, chunk_size=5)
+        row_ids = list(log.get_event_log(["Row_ID"])["Row_ID"])
+        with pytest.raises(ValueError):
+            event_log_importer.import_event_log(unsorted_config_file, storage_type, chunk_size=5)
+        
+        log_df = log.get_event_log(["Row_ID", "Timestamp"])     #not cached yet, so the stored event log is read again
+        assert list(log_df["Row_ID"]) == row_ids and log_df["Timestamp"].is_monotonic_increasing, "the rejected log should not replace the stored event log"
+    
+def test_sequences_are_equal_for_all_storage_types(monkeypatch):
+    monkeypatch.setattr(event_log, "SEQUENCE_BATCH_SIZE", 4)     #sequences need to be put together from several batches
+    
+    sequences = {}
+    for storage_type in StorageType:
+        log = event_log_importer.import_event_log("test/data/event_log.json", storage_type)
+        log.create_interval_log()
+        sequences[storage_type] = list(log.get_sequence("Job")) + list(log.get_interval_sequence("Machine", ["Machine", "Start", "Row_ID"]))
+    
+    for storage_type in StorageType:
+        assert len(sequences[storage_type]) == 6, "there are three jobs and three machines"
+        for df, expected_df in zip(sequences[storage_type], sequences[StorageType.COLUMN_BASED_AT_ONCE]):
+            pd.testing.assert_frame_equal(df, expected_df, check_dtype=False)
+        
+def test_cached_import(tmp_path, monkeypatch):
+    cold_log = event_log_importer.import_event_log("test/data/production_data.json", cache_dir=str(tmp_path))
+    cold_log.create_interval_log()
+    assert len(list(tmp_path.glob("*.parquet"))) == 2, "the adapted event log and the interval log should be cached"
+    
+    def fail(config):
+        raise AssertionError("the cached event log should be used instead of adapting the log again")
+    monkeypatch.setattr(event_log_importer, "adapt_event_log", fail)
+    monkeypatch.setattr(event_log, "EventToIntervalLog", None)
+    warm_log = event_log_importer.import_event_log("test/data/production_data.json", cache_dir=str(tmp_path))
+    warm_log.create_interval_log()
+    
+    pd.testing.assert_frame_equal(cold_log.get_event_log(), warm_log.get_event_log())
+    pd.testing.assert_frame_equal(cold_log.get_interval_log(), warm_log.get_interval_log())
+
+def test_cached_import_detects_changed_content(tmp_path, monkeypatch, write_log):
+    monkeypatch.setattr(log_cache, "BLOCK_SIZE", 16)      #the file is hashed in many blocks
+    config_file = write_log("log", pd.read_csv("test/data/interval_log.csv", sep=";"))
+    event_log_importer.import_event_log(config_file, cache_dir=str(tmp_path / "cache"))
+    
+    path = tmp_path / "log.csv"
+    stat = os.stat(path)
+    content = path.read_text()
+    position = content.index("m2", len(content) // 2)
+    path.write_text(content[:position] + "m4" + content[position + 2:])
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))     #like a copy that keeps the modification time
+    
+    log_df = event_log_importer.import_event_log(config_file, cache_dir=str(tmp_path / "cache")).get_event_log()
+    assert (log_df["Machine"] == "m4").sum() == 2, "a change in the middle of the file should not be hidden by the cache, also if the size and the modification time are the same"
+
+def test_append_event_log(write_log):
+    raw_df = pd.read_csv("test/data/interval_log.csv", sep=";")
+    config_files = [write_log(f"part{i}", part) for i, part in enumerate([raw_df.iloc[:4], raw_df.iloc[4:]])]
+    
+    for storage_type in StorageType:
+        log_df = event_log_importer.import_event_log("test/data/interval_log.json", storage_type).get_event_log()
+        log = event_log_importer.import_event_log(config_files[0], storage_type)
+        event_log_importer.append_event_log(log, config_files[1])
+        appended_log_df = log.get_event_log().sort_values(["Timestamp", "Row_ID"], ignore_index=True)
+        
+        assert len(appended_log_df) == 18, "the appended log should contain all 18 atomic events"
+        assert list(appended_log_df["Row_ID"]) == list(log_df.sort_values(["Timestamp", "Row_ID"])["Row_ID"]), "the appended rows should get the same row ids as in the import at once"
+        assert appended_log_df.groupby("Activity_Instance")["Row_ID"].nunique().eq(1).all() and appended_log_df["Activity_Instance"].nunique() == 9, "every operation should get its own activity instance"
+
+def test_append_to_column_without_values(write_log):
+    raw_df = pd.read_csv("test/data/interval_log.csv", sep=";")
+    config_files = [write_log(f"part{i}", part) for i, part in enumerate([raw_df.iloc[:4].assign(Resource=None), raw_df.iloc[4:].assign(Resource="w1")])]
+
+    for storage_type in StorageType:
+        for chunk_size in [None, 2]:
+            log = event_log_importer.import_event_log(config_files[0], storage_type, chunk_size)
+            log.create_interval_log()
+            event_log_importer.append_event_log(log, config_files[1])
+            log_df = log.get_event_log()
+
+            assert log_df["Resource"].dtype == "category", "a column without any value should be dictionary encoded, so that values can be appended"
+            assert log_df["Resource"].isna().sum() == 8 and (log_df["Resource"] == "w1").sum() == 10
+            assert (log.get_interval_log()["Resource"] == "w1").sum() == 5
+
+def test_stream_event_log():
+    events = list(event_log_importer.stream_event_log("test/data/event_log.json"))
+    log_df = event_log_importer.import_event_log("test/data/event_log.json").get_event_log()
+    
+    assert [e["Row_ID"] for e in events] == list(log_df["Row_ID"]), "the events should be streamed in the order of the log"
+    assert [e["Timestamp"] for e in events] == list(log_df["Timestamp"])
+    assert all(e["Job"] == job for e, job in zip(events, log_df["Job"]))
+    with pytest.raises(ValueError):
+        next(event_log_importer.stream_event_log("test/data/interval_log.json"))
+
+def test_import_without_side_effects(tmp_path):
+    code = "import sys; from event_log_analyzer import importer; from event_log_analyzer.pattern_library import pattern_structure; print(','.join(m for m in ['pm4py', 'matplotlib', 'networkx', 'duckdb', 'jsonschema'] if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=dict(os.environ, PYTHONPATH=parentdir), capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "", "the heavy dependencies should only be imported when they are used"
+    assert not (tmp_path / "output").exists(), "the output folder should only be created when something is written into it"
+
+def test_output_file_in_working_directory_at_first_record(tmp_path):
+    code = "import os; from event_log_analyzer.utils import pattern_logger; os.mkdir('later'); os.chdir('later'); pattern_logger.info('first record')"
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=dict(os.environ, PYTHONPATH=parentdir), capture_output=True, text=True, check=True)
+    assert (tmp_path / "later" / "output" / "patterns.log").read_text() == "first record\n", "the pattern log should be written into the working directory at the time of the first record, not at the time of the import"
+    assert not (tmp_path / "output").exists()
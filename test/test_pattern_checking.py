@@ -3,8 +3,15 @@ currentdir = os.path.dirname(os.path.realpath(__file__))
 parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
+import json
+import pandas as pd
+import pytest
 from event_log_analyzer import importer as event_log_importer
+from event_log_analyzer.event_log import StorageType
+from event_log_analyzer.metrics import registry
 from event_log_analyzer.pattern_library import pattern_structure
+from event_log_analyzer.pattern_library.pattern import ConditionCosts
+from event_log_analyzer.pattern_library.stream_monitor import PatternMonitor
 
 
 def test_check_patterns():
@@ -19,6 +26,7 @@ def test_check_patterns():
     assert "Job_Shop_Pattern" in applying_patterns, "Job Shop Pattern should apply on the event log"
     assert "Flow_Shop_Pattern" in applying_patterns, "Flow Shop Pattern should apply on the event log"
     assert "No_Wait_Pattern" not in applying_patterns, "No Wait Pattern should not apply on this event log"
+    assert not os.path.exists("output/condition_costs.json"), "the costs of the conditions should only be saved if their measuring is enabled"
     
 def test_check_patterns_interval_log():
     log = event_log_importer.import_event_log("test/data/interval_log.json")
@@ -56,3 +64,164 @@ def test_check_patterns_on_real_log():
 
     assert len(applying_patterns) == 1, "only one pattern is valid so far"        
     assert "Manufacturing_Scheduling_Pattern" in applying_patterns, "Manufacturing Scheduling Pattern should apply on the event log"
+    
+def test_check_patterns_in_parallel():
+    for storage_type in StorageType:
+        log = event_log_importer.import_event_log("test/data/xes_gen_event_log.json", storage_type)
+        
+        serial_structure = pattern_structure.PatternStructure()
+        serial_structure.check_all_patterns(log)
+        parallel_structure = pattern_structure.PatternStructure()
+        parallel_structure.check_all_patterns(log, max_workers=4)
+        
+        assert [p.name for p in parallel_structure.applying_pattern_list()] == [p.name for p in serial_structure.applying_pattern_list()], "the patterns should be decided in the same way when independent branches are checked in parallel"
+    
+def test_condition_costs(tmp_path, monkeypatch):
+    costs = ConditionCosts(str(tmp_path / "condition_costs.json"))
+    estimated_costs = {"cond_a": 1, "cond_b": 2, "cond_c": 4}
+    costs.update("Pattern", "cond_c", 1.0)
+    costs.save()
+    assert costs.order("Pattern", estimated_costs) == ["cond_a", "cond_b", "cond_c"] and not os.path.exists(costs.file), "the costs should only be measured and saved if the measuring is enabled"
+    
+    costs.enable()
+    assert costs.order("Pattern", estimated_costs) == ["cond_a", "cond_b", "cond_c"], "without measurements the conditions should be ordered by their estimated costs"
+    costs.update("Pattern", "cond_a", 3.0)
+    costs.update("Pattern", "cond_c", 1.0)
+    assert costs.order("Pattern", estimated_costs) == ["cond_c", "cond_a", "cond_b"], "cond_b should be estimated relative to the measured conditions (2 * 1.625 seconds)"
+    
+    costs.save()
+    loaded_costs = ConditionCosts()
+    loaded_costs.enable(costs.file)
+    assert loaded_costs.order("Pattern", estimated_costs) == ["cond_c", "cond_a", "cond_b"], "the measured costs should be loaded from the file"
+    loaded_costs.disable()
+    assert loaded_costs.order("Pattern", estimated_costs) == ["cond_a", "cond_b", "cond_c"]
+    
+    default_costs = ConditionCosts()
+    default_costs.enable()
+    default_costs.update("Pattern", "cond_a", 1.0)
+    monkeypatch.chdir(tmp_path)
+    default_costs.save()
+    assert (tmp_path / "output" / "condition_costs.json").exists(), "the default file should be resolved in the working directory at the time the costs are saved"
+
+def test_explain_all_violations():
+    log = event_log_importer.import_event_log("test/data/production_data.json")
+    ps = pattern_structure.PatternStructure()
+    ps.check_all_patterns(log)
+    job_shop = next(p for p in ps.topological_order if p.name == "Job_Shop_Pattern")
+    
+    checked = []
+    for c in job_shop.conditions:
+        setattr(job_shop, c, lambda event_log, c=c: checked.append(c) or False)
+    job_shop.applies = None
+    assert not job_shop.pattern_applies(log) and len(checked) == 1, "the checking should stop at the first condition that does not hold"
+    
+    job_shop.explain_all = True
+    checked.clear()
+    assert not job_shop.pattern_applies(log) and sorted(checked) == sorted(job_shop.conditions), "all conditions should be checked to explain all violations"
+
+def test_metrics_registry(tmp_path):
+    log = event_log_importer.import_event_log("test/data/event_log.json")
+    assert registry.to_dict()["spans"] == [], "no spans should be recorded while the registry is disabled"
+
+    registry.enable(memory=True)
+    try:
+        log = event_log_importer.import_event_log("test/data/event_log.json")
+        pattern_structure.PatternStructure().check_all_patterns(log, max_workers=2)
+    finally:
+        registry.disable()
+    spans = {s["name"]: s for s in registry.to_dict()["spans"]}
+    registry.save_json(tmp_path / "metrics.json")
+    registry.save_chrome_trace(tmp_path / "trace.json")
+    registry.reset()
+
+    assert spans["import duration"]["rows"] == log.get_number_of_rows() and spans["import duration"]["rows_per_second"] > 0
+    assert "sort the log" in [s["name"] for s in spans["import duration"]["children"]], "the adapters should be children of the import"
+    job_shop = [s for s in spans["pattern check duration"]["children"] if s["name"] == "Job Shop Pattern checking duration"][0]
+    assert "Job Shop Condition b) (interval log)" in [s["name"] for s in job_shop["children"]], "the conditions should be children of the pattern, also if it is checked in a worker thread"
+    assert all(s["calls"] == 1 and s["peak_memory"] >= 0 for s in job_shop["children"])
+    with open(tmp_path / "metrics.json") as metrics_file, open(tmp_path / "trace.json") as trace_file:
+        assert json.load(metrics_file)["spans"][0]["name"] == "import duration"
+        assert all(event["ph"] == "X" and event["dur"] >= 0 for event in json.load(trace_file)["traceEvents"])
+
+def test_update_patterns_incrementally(tmp_path, monkeypatch, write_log):
+    raw_df = pd.read_csv("test/data/interval_log.csv", sep=";")
+    for storage_type in StorageType:
+        ps = pattern_structure.PatternStructure()
+        for i, end in enumerate([3, 6, len(raw_df)]):
+            part_config_file = write_log(f"part{i}", raw_df.iloc[end - 3 if i > 0 else 0:end])
+            prefix_config_file = write_log(f"prefix{i}", raw_df.iloc[:end])
+            
+            if i == 0:
+                log = event_log_importer.import_event_log(part_config_file, storage_type)
+            else:
+                event_log_importer.append_event_log(log, part_config_file)
+            ps.update_all_patterns(log)
+            
+            (tmp_path / f"reference_{storage_type.name}_{i}").mkdir()
+            monkeypatch.chdir(tmp_path / f"reference_{storage_type.name}_{i}")     #the reference log is stored in its own databases, so that it does not replace the tables of the updated log
+            reference_structure = pattern_structure.PatternStructure()
+            reference_structure.check_all_patterns(event_log_importer.import_event_log(prefix_config_file, storage_type))
+            monkeypatch.chdir(tmp_path)
+            
+            assert [p.name for p in ps.applying_pattern_list()] == [p.name for p in reference_structure.applying_pattern_list()], "the updated verdicts should be the same as the verdicts of a full check"
+        assert "Job_Shop_Pattern" in [p.name for p in ps.applying_pattern_list()]
+
+def test_resource_handoff_at_the_same_time(write_log):
+    handoff_df = pd.DataFrame({"Job": ["j0", "j0"], "Start": ["00:00:00", "00:00:01"], "End": ["00:00:01", "00:00:03"], "Machine": ["m2", "m0"], "Resource": ["w1", "w1"]})
+    config_file = write_log("handoff", handoff_df)
+    part_config_files = [write_log(f"part{i}", handoff_df.iloc[i:i + 1]) for i in range(2)]
+    
+    for storage_type in StorageType:
+        verdicts = []
+        for config_files in [[config_file], part_config_files]:        #the log is imported at once or the second operation is appended
+            log = event_log_importer.import_event_log(config_files[0], storage_type)
+            for appended_config_file in config_files[1:]:
+                event_log_importer.append_event_log(log, appended_config_file)
+            checked_structure = pattern_structure.PatternStructure()
+            checked_structure.check_all_patterns(log)
+            updated_structure = pattern_structure.PatternStructure()
+            updated_structure.update_all_patterns(log)
+            verdicts.append([p.name for p in checked_structure.applying_pattern_list()])
+            monitor = PatternMonitor()
+            list(monitor.watch(log.get_event_log().astype(object).to_dict("records")))
+            assert [p.name for p in updated_structure.applying_pattern_list()] == verdicts[-1], "the events of a resource should be decided in the order of the stored log by the full check and by the summaries"
+            assert [p.name for p in monitor.applying_pattern_list()] == verdicts[-1], "the monitor should decide the events of a resource in the order in which they arrive like the full check"
+        assert "Distinguishable_Resource_Pattern" not in verdicts[0], "the events with the same timestamp are sorted by job and machine, so the start event on m0 precedes the complete event on m2 and the worker processes two operations at the same time"
+
+def test_monitor_patterns():
+    for config_file in ["test/data/event_log.json", "test/data/interval_log.json", "test/data/xes_gen_event_log.json"]:
+        log = event_log_importer.import_event_log(config_file)
+        ps = pattern_structure.PatternStructure()
+        ps.check_all_patterns(log)
+        
+        monitor = PatternMonitor()
+        list(monitor.watch(log.get_event_log().astype(object).to_dict("records")))
+        assert [p.name for p in monitor.applying_pattern_list()] == [p.name for p in ps.applying_pattern_list()], "the monitored patterns should apply like the checked patterns"
+
+def test_monitor_reports_violations_on_time():
+    def event(job, machine, transaction_type, minute):
+        return {"Job": job, "Machine": machine, "Resource": "worker", "Transaction_Type": transaction_type, "Timestamp": pd.Timestamp(2020, 1, 1, 0, minute)}
+    monitor = PatternMonitor()
+    assert monitor.process(event("j1", "m1", "start", 0)) == []
+    violations = monitor.process(event("j2", "m1", "start", 2))
+    assert [(v.pattern, v.condition) for v in violations] == [("Distinguishable_Resource_Pattern", None)], "the worker starts the operation of j2 before the operation of j1 is completed (the events of a resource are checked in the order of their arrival)"
+    assert monitor.process(event("j1", "m1", "complete", 2)) == [], "the operation of j2 does not overlap with the operation of j1 on m1, which is completed at the same time"
+    assert monitor.process(event("j1", "m2", "start", 3)) == []
+    
+    violations = monitor.process(event("j2", "m2", "start", 4))
+    assert [(v.pattern, v.condition) for v in violations] == [("No_Wait_Pattern", None)], "j1 waits between its operations, this is certain when the next timestamp arrives"
+    violations = monitor.process(event("j2", "m1", "complete", 5))
+    assert [(v.pattern, v.condition) for v in violations] == [("Job_Shop_Pattern", "cond_b")], "j2 runs two operations at the same time"
+    assert [p.name for p in monitor.applying_pattern_list()] == ["Manufacturing_Scheduling_Pattern", "Indistinguishable_Resource_Pattern"], "the Job Shop Pattern excludes all patterns it enables"
+    
+    with pytest.raises(ValueError):
+        monitor.process(event("j2", "m2", "complete", 1))
+
+def test_monitor_resource_handoff_at_the_same_time():
+    def event(machine, transaction_type, second):
+        return {"Job": "j0", "Machine": machine, "Resource": "w1", "Transaction_Type": transaction_type, "Timestamp": pd.Timestamp(2020, 1, 1, 0, 0, second)}
+    for order, expected_violations in [(["complete", "start"], []), (["start", "complete"], ["Distinguishable_Resource_Pattern"])]:
+        handoff = {"complete": event("m2", "complete", 1), "start": event("m0", "start", 1)}
+        monitor = PatternMonitor()
+        violations = list(monitor.watch([event("m2", "start", 0)] + [handoff[transaction_type] for transaction_type in order] + [event("m0", "complete", 3)]))
+        assert [v.pattern for v in violations] == expected_violations, "the events of the worker are checked in the order of their arrival like in the atomic event log, it processes two operations if the operation on m0 starts before the operation on m2 is completed"
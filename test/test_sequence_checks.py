@@ -0,0 +1,89 @@
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import numpy as np
+import pandas as pd
+from event_log_analyzer.sequence_index import SequenceIndex
+from event_log_analyzer.pattern_library import sharding
+from event_log_analyzer.pattern_library.sequence_checks import find_divergent_sequences, find_overlapping_operations, find_simultaneous_operations, find_waiting_operations, summarize_sequences, waiting_time_statistics
+
+def test_find_overlapping_operations():
+    interval_df = pd.DataFrame({"Job": ["j1", "j2", "j1", "j1", "j2", None],
+                                "Start": pd.to_datetime(["2020-01-01 00:00", "2020-01-01 00:00", "2020-01-01 00:05", "2020-01-01 00:08", "2020-01-01 00:01", "2020-01-01 00:00"]),
+                                "Complete": pd.to_datetime(["2020-01-01 00:10", "2020-01-01 00:01", "2020-01-01 00:06", "2020-01-01 00:09", "2020-01-01 00:02", "2020-01-01 00:10"]),
+                                "Row_ID": range(6)})
+    
+    overlaps = find_overlapping_operations(interval_df, "Job")
+    assert list(overlaps["Row_ID"]) == [2, 3], "both operations of j1 that start while the first operation runs should be found (also when they are not adjacent)"
+    assert list(overlaps["Overlapping_Row_ID"]) == [0, 0]
+    assert list(overlaps["Job"]) == ["j1", "j1"], "operations that directly follow each other or do not belong to a job do not overlap"
+    
+def test_find_simultaneous_operations():
+    event_df = pd.DataFrame({"Machine": ["m1", "m1", "m2", "m1", "m2", "m1", "m1", "m1"],
+                             "Timestamp": pd.to_datetime(["2020-01-01 00:00", "2020-01-01 00:01", "2020-01-01 00:01", "2020-01-01 00:02", "2020-01-01 00:03", "2020-01-01 00:04", "2020-01-01 00:05", "2020-01-01 00:06"]),
+                             "Transaction_Type": ["start", "complete", "start", "start", "complete", "start", "complete", "complete"],
+                             "Activity_Instance": [0, 0, 1, 2, 1, 3, 2, 3],
+                             "Row_ID": range(8)})
+    
+    violations = find_simultaneous_operations(event_df, "Machine")
+    assert list(violations["Row_ID"]) == [5, 6], "m1 starts operation 3 before operation 2 is completed and then completes operation 2 while operation 3 is running"
+    assert list(violations["Machine"]) == ["m1", "m1"]
+    
+def test_summarize_sequences():
+    interval_df = pd.DataFrame({"Job": ["j2", "j1", "j1", "j2", "j3", "j3", "j3"],
+                                "Machine": ["m1", "m1", "m2", "m2", "m2", "m1", "m1"],
+                                "Start": pd.to_datetime(["2020-01-01 00:00", "2020-01-01 00:00", "2020-01-01 00:05", "2020-01-01 00:08", "2020-01-01 00:03", "2020-01-01 00:01", "2020-01-01 00:09"])})
+    
+    summary = summarize_sequences(interval_df, "Job", "Machine")
+    assert list(summary.index) == ["j1", "j2", "j3"], "the summary should be ordered by the key"
+    assert list(summary["Length"]) == [2, 2, 3]
+    assert list(summary["Distinct_Values"]) == [2, 2, 2], "j3 is processed twice on m1"
+    assert summary.at["j1", "Fingerprint"] == summary.at["j2", "Fingerprint"], "j1 and j2 have the same route m1 -> m2"
+    
+    swapped_df = interval_df[interval_df["Job"] != "j3"].assign(Start=lambda df: df["Start"].where(df["Job"] != "j2", df["Start"][::-1].values))
+    swapped_summary = summarize_sequences(swapped_df, "Job", "Machine")
+    assert swapped_summary.at["j1", "Fingerprint"] != swapped_summary.at["j2", "Fingerprint"], "j2 now has the route m2 -> m1"
+    
+def test_find_divergent_sequences():
+    interval_df = pd.DataFrame({"Machine": ["m1", "m1", "m1", "m2", "m2", "m2", "m3", "m3", "m4", "m4", "m4"],
+                                "Job": ["a", "b", "c", "a", "c", "b", "a", "b", "a", "b", "c"],
+                                "Start": pd.to_datetime(range(11), unit="m")})
+    
+    divergent = find_divergent_sequences(interval_df, "Machine", "Job")
+    assert list(divergent["Machine"]) == ["m1", "m2", "m3"], "the reference machine m1 is followed by all machines that process the jobs in another order"
+    assert list(divergent["Divergence"]) == [-1, 1, 2], "m2 swaps the jobs b and c, on m3 job c is missing"
+    assert list(divergent["Values"].iat[1]) == ["a", "c", "b"]
+    
+def test_find_waiting_operations():
+    interval_df = pd.DataFrame({"Job": ["a", "a", "a", "b", "b", None],
+                                "Start": pd.to_datetime([0, 5, 9, 5, 10, 0], unit="m"),
+                                "Complete": pd.to_datetime([5, 7, 10, 10, 12, 3], unit="m"),
+                                "Row_ID": range(6)})
+    
+    waiting_operations = find_waiting_operations(interval_df, "Job")
+    assert list(waiting_operations["Row_ID"]) == [1] and list(waiting_operations["Next_Row_ID"]) == [2], "only job a waits between its second and third operation"
+    assert list(waiting_operations["Waiting_Time"]) == [pd.Timedelta(minutes=2)]
+    
+    statistics = waiting_time_statistics(waiting_operations, "Job")
+    assert statistics.loc["a", "Breaks"] == 1 and statistics.loc["a", "Maximum_Waiting_Time"] == pd.Timedelta(minutes=2)
+    
+def test_sharded_checks_are_equal_to_serial_checks(monkeypatch):
+    rng = np.random.default_rng(0)
+    interval_df = pd.DataFrame({"Job": rng.integers(0, 50, 1000), 
+                                "Machine": rng.integers(0, 5, 1000),
+                                "Start": pd.to_datetime(rng.integers(0, 10**6, 1000), unit="s"),
+                                "Row_ID": range(1000)})
+    interval_df["Complete"] = interval_df["Start"] + pd.to_timedelta(rng.integers(0, 10**4, 1000), unit="s")
+    index = SequenceIndex.from_dataframe(interval_df, "Job", "Start")
+    
+    serial_results = [find_overlapping_operations(interval_df, "Job", index), find_waiting_operations(interval_df, "Job", index), summarize_sequences(interval_df, "Job", "Machine", index)]
+    monkeypatch.setattr(sharding, "MAX_PROCESSES", 3)
+    monkeypatch.setattr(sharding, "MIN_ROWS_PER_SHARD", 100)
+    sharded_results = [find_overlapping_operations(interval_df, "Job", index), find_waiting_operations(interval_df, "Job", index), summarize_sequences(interval_df, "Job", "Machine", index)]
+    sharding.shutdown()
+    
+    assert len(sharding.shard_bounds(index.offsets, 3)) == 4, "the log should be split into three shards"
+    for serial_result, sharded_result in zip(serial_results, sharded_results):
+        pd.testing.assert_frame_equal(serial_result, sharded_result)